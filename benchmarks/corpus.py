@@ -0,0 +1,145 @@
+"""
+Synthetic rules documents for the benchmarks: headings and prose with
+lists of directives, in a chosen mix, nesting depth and error density.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# a valid and an invalid example of each kind of directive
+DIRECTIVES = {
+    "ability_score": (
+        ["- Ability Score", "    - *ability* Dexterity", "    - *value* 15"],
+        ["- Ability Score", "    - *value* 15"],
+    ),
+    "action": (
+        [
+            "- Action",
+            "    - *name* Unarmed Strike",
+            "    - *description* Make a melee attack with your elbow, knee, etc.",
+        ],
+        ["- Action", "    - *name* Unarmed Strike"],
+    ),
+    "choice": (
+        ["- Choice _First Equipment Choice_ chain mail"],
+        ["- Choice"],
+    ),
+    "featureless": (
+        ["- Featureless _why_ unnecessary"],
+        ["- Featureless", "    - unnecessary"],
+    ),
+    "hit_die": (["- Hit Die", "    - _die_ d10"], ["- Hit Die _d7_"]),
+    "inventory": (["- Inventory _add_ Chain Mail"], ["- Inventory _steal_ Gold"]),
+    "language": (["- Language _Sylvan_"], ["- Language"]),
+    "proficiency": (
+        ["- Proficiency", "    - _type_ weapon", "    - _value_ Martial"],
+        ["- Proficiency _saving throw_"],
+    ),
+    "register": (["- Register _Skill_ Acrobatics (Dexterity)"], ["- Register"]),
+    "resource": (
+        ["- Resource", "    - _Name_ Second Wind", "    - _Uses_ 1"],
+        ["- Resource _Charm of the Storm_"],
+    ),
+    "set": (["- Set *Name* Shade of the Mountain"], ["- Set"]),
+    "unknown": (["- Comment not a directive"], ["- Teleport _anywhere_"]),
+}
+
+# relative weights of each kind of directive, or of a Choose block
+DEFAULT_MIX = {name: 1.0 for name in DIRECTIVES}
+DEFAULT_MIX["choose"] = 1.0
+
+PROSE = [
+    "As a fighter, you gain the following class features.",
+    "You start with the following equipment, in addition to the equipment "
+    "granted by your background.",
+    "Choose one of the options above.",
+]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """
+    Reads a mix given as "name=weight,..." (eg "choose=5,hit_die=1"),
+    where any kind of directive not named is left out.
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown directive in mix: {name}")
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+class CorpusGenerator:
+    def __init__(
+        self,
+        mix: Optional[Dict[str, float]] = None,
+        choose_depth: int = 1,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.mix = mix or DEFAULT_MIX
+        self.choose_depth = choose_depth
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.names = list(self.mix)
+        self.weights = [self.mix[name] for name in self.names]
+
+    def directive(self, depth: int = 0) -> List[str]:
+        name = self.random.choices(self.names, self.weights)[0]
+        if name == "choose":
+            if depth < self.choose_depth:
+                return self.choose(depth)
+            # too deep to nest another Choose, so use anything else
+            name = self.random.choice(list(DIRECTIVES))
+        if name == "unknown" and depth:
+            # an option of only comments is an error in itself
+            name = "language"
+
+        valid, invalid = DIRECTIVES[name]
+        if self.random.random() < self.error_rate:
+            return invalid
+        return valid
+
+    def choose(self, depth: int) -> List[str]:
+        options = self.random.randint(2, 4)
+        count = 1
+        if self.random.random() < self.error_rate:
+            count = options + 1
+        lines = [f"- Choose _{count}_ Option {depth}"]
+        for option in range(options):
+            lines.append(f"    - _Option_ option {option}")
+            for _ in range(self.random.randint(1, 2)):
+                for line in self.directive(depth + 1):
+                    lines.append(f"        {line}")
+        return lines
+
+    def document(self, lines: int) -> str:
+        content = []
+        section = 0
+        while len(content) < lines:
+            section += 1
+            content.append(f"## Section {section}")
+            content.append("")
+            # directives are only read from lists straight after a heading
+            for _ in range(self.random.randint(3, 12)):
+                content.extend(self.directive())
+            content.append("")
+            content.append(self.random.choice(PROSE))
+            content.append("")
+        return "\n".join(content) + "\n"
+
+    def write(self, directory: Path, files: int, lines: int) -> List[Path]:
+        """
+        Writes a number of documents into nested directories, the way
+        a set of rules files would usually be kept.
+        """
+        paths = []
+        for number in range(files):
+            path = Path(directory) / f"group-{number % 8}" / f"rules-{number}.md"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(self.document(lines))
+            paths.append(path)
+        return paths
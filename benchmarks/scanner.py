@@ -0,0 +1,65 @@
+"""
+Times finding directive blocks in list-heavy documents of doubling size.
+The time per line should stay roughly flat as the documents grow.
+
+    python -m benchmarks.scanner
+"""
+
+import argparse
+import time
+
+from your5e.rules import DirectiveExtract, RuleParser
+
+
+def list_heavy_document(lines: int) -> str:
+    # one long run of directives under a single heading is the worst case
+    # for anything that has to look back to the start of the section
+    content = ["# Equipment", ""]
+    while len(content) < lines:
+        content.append("- Inventory _add_ Javelin")
+        content.append("- Language _Common_")
+        content.append("- Hit Die")
+        content.append("    - _die_ d10")
+    return "\n".join(content[:lines]) + "\n"
+
+
+def best_time(function, content: str, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(content)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--start", type=int, default=1000, help="smallest document")
+    parser.add_argument("--steps", type=int, default=6, help="number of doublings")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size")
+    args = parser.parse_args()
+
+    rule_parser = RuleParser()
+    scenarios = {
+        "blocks": lambda content: sum(
+            1 for _ in rule_parser.directive_blocks(content.split("\n"))
+        ),
+        "parse": rule_parser.parse_rules,
+        "extract": DirectiveExtract().extract,
+    }
+
+    print(f"{'scenario':10s} {'lines':>8s} {'seconds':>10s} {'usec/line':>10s}")
+    for name, function in scenarios.items():
+        lines = args.start
+        for _ in range(args.steps):
+            content = list_heavy_document(lines)
+            elapsed = best_time(function, content, args.repeat)
+            per_line = elapsed / lines * 1_000_000
+            print(f"{name:10s} {lines:8d} {elapsed:10.4f} {per_line:10.2f}")
+            lines *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Times splitting directives in shorthand into their name, key and value,
+with the regular expression and with split_shorthand, on ordinary lines,
+long item lines and lines made to make the regular expression backtrack.
+
+    python -m benchmarks.shorthand
+"""
+
+import argparse
+import time
+
+from your5e.rules.shorthand import SHORTHAND_FORMAT, split_shorthand
+
+ITEM = "Ornate silver longsword of the northern reaches"
+
+LINES = {
+    "plain": "Hit Die",
+    "asterisks": "Ability Score *strength* 15",
+    "underscores": "Inventory _add_ Longsword",
+    "long item *": "Inventory *add* " + " ".join([ITEM] * 8),
+    "long item _": "Inventory _add_ " + " ".join([ITEM] * 8),
+    "many words": "a " * 200 + "_x",
+    "unclosed": "Inventory _" + "word " * 200,
+    "many markers": "a _" * 100,
+    "doubled": "x __" + "a_" * 200,
+}
+
+
+def regex_split(text: str):
+    match = SHORTHAND_FORMAT.match(text)
+    if match is None:
+        return None
+    return match.group("directive"), match.group("key"), match.group("value")
+
+
+def best_time(function, text: str, number: int, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function(text)
+        elapsed = (time.perf_counter() - start) / number
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--number", type=int, default=1000, help="calls per run")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per line")
+    args = parser.parse_args()
+
+    print(f"{'line':14s} {'chars':>6s} {'regex us':>10s} {'split us':>10s}")
+    for name, text in LINES.items():
+        assert split_shorthand(text) == regex_split(text), name
+        regex = best_time(regex_split, text, args.number, args.repeat)
+        split = best_time(split_shorthand, text, args.number, args.repeat)
+        print(
+            f"{name:14s} {len(text):6d} {regex * 1_000_000:10.2f} "
+            f"{split * 1_000_000:10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
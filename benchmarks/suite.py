@@ -0,0 +1,198 @@
+"""
+Times the rules parser and the check-rules command over a synthetic corpus,
+and optionally compares the results with those saved from another run.
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --compare before.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from your5e import __version__
+from your5e.cli import main as cli_main
+from your5e.rules import DirectiveExtract, RuleParser
+from your5e.rules.incremental import IncrementalParser
+
+from .corpus import CorpusGenerator, parse_mix
+
+
+def best_time(function, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def round_trip(parser: RuleParser, content: str):
+    result, _ = parser.parse_rules(content)
+    markdown = "\n".join(directive.to_markdown() for directive in result)
+    return parser.parse_rules(markdown)
+
+
+def edit_middle(incremental: IncrementalParser):
+    # as an editor would, retyping one line in the middle of the document
+    middle = len(incremental) // 2
+    incremental.edit(middle, middle + 1, incremental.lines[middle] + "\n")
+
+
+def check_rules(directory: str, jobs: int):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        cli_main(
+            ["check-rules", directory, "--no-cache", "--no-daemon", "--jobs", str(jobs)]
+        )
+
+
+def run(args) -> dict:
+    generator = CorpusGenerator(
+        mix=parse_mix(args.mix) if args.mix else None,
+        choose_depth=args.choose_depth,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    content = generator.document(args.lines)
+    lines = content.count("\n")
+    parser = RuleParser()
+    extract = DirectiveExtract()
+    incremental = IncrementalParser(parser)
+    incremental.parse(content)
+
+    scenarios = {
+        "parse": lambda: parser.parse_rules(content),
+        "extract": lambda: extract.extract(content),
+        "to_markdown": lambda: round_trip(parser, content),
+        "incremental": lambda: edit_middle(incremental),
+    }
+
+    results = {}
+    for name, function in scenarios.items():
+        if args.scenario and name not in args.scenario:
+            continue
+        elapsed = best_time(function, args.repeat)
+        results[name] = {"lines": lines, "seconds": elapsed}
+
+    if not args.scenario or "check_rules" in args.scenario:
+        with tempfile.TemporaryDirectory() as directory:
+            generator.write(directory, args.files, args.lines)
+            elapsed = best_time(lambda: check_rules(directory, args.jobs), args.repeat)
+        results["check_rules"] = {"lines": lines * args.files, "seconds": elapsed}
+
+    for result in results.values():
+        result["usec_per_line"] = result["seconds"] / result["lines"] * 1_000_000
+
+    return {
+        "version": __version__,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": {
+            "lines": args.lines,
+            "files": args.files,
+            "mix": args.mix,
+            "choose_depth": args.choose_depth,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, previous: dict, tolerance: float) -> bool:
+    """
+    Prints how each scenario changed since a previous run, returning
+    whether any became slower by more than the tolerance.
+    """
+    if current["corpus"] != previous["corpus"]:
+        print("warning: the runs used different corpus settings", file=sys.stderr)
+
+    print(f"{'scenario':12s} {'before':>10s} {'after':>10s} {'change':>8s}")
+    slower = False
+    for name, result in current["results"].items():
+        if name not in previous["results"]:
+            continue
+        before = previous["results"][name]["usec_per_line"]
+        after = result["usec_per_line"]
+        change = after / before - 1
+        if change > tolerance:
+            slower = True
+        print(f"{name:12s} {before:10.2f} {after:10.2f} {change:+8.1%}")
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--lines", type=int, default=5000, help="lines per document")
+    parser.add_argument("--files", type=int, default=20, help="files for check-rules")
+    parser.add_argument(
+        "--mix", help='directive weights, eg "choose=5,hit_die=1" (default: even)'
+    )
+    parser.add_argument("--choose-depth", type=int, default=1, help="Choose nesting")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.05, help="fraction of invalid directives"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario")
+    parser.add_argument("--jobs", type=int, default=1, help="check-rules --jobs")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["parse", "extract", "to_markdown", "incremental", "check_rules"],
+        help="only run these scenarios (default: all)",
+    )
+    parser.add_argument("--output", help="save the results as JSON")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="slowdown allowed by --compare before failing (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+
+    current = run(args)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        return 1 if compare(current, previous, args.tolerance) else 0
+
+    print(f"{'scenario':12s} {'lines':>8s} {'seconds':>10s} {'usec/line':>10s}")
+    for name, result in current["results"].items():
+        print(
+            f"{name:12s} {result['lines']:8d} {result['seconds']:10.4f} "
+            f"{result['usec_per_line']:10.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,3 +12,32 @@
     [[ "$output" == *"usage:"* ]]
     [[ "$output" == *"invalid choice: 'unknown-command'"* ]]
 }
+
+@test "your5e --help imports no commands" {
+    run python -c '
+import sys
+from your5e.cli import main
+try:
+    main(["--help"])
+except SystemExit:
+    pass
+loaded = [name for name in sys.modules if name.startswith("your5e.commands.")]
+assert loaded == [], loaded
+'
+    [ "$status" -eq 0 ]
+}
+
+@test "your5e imports only the command it runs" {
+    run python -c '
+import sys
+from your5e.cli import main
+try:
+    main(["lsp", "--help"])
+except SystemExit:
+    pass
+assert "your5e.commands.lsp" in sys.modules
+assert "your5e.commands.daemon" not in sys.modules
+assert "your5e.commands.check_rules" not in sys.modules
+'
+    [ "$status" -eq 0 ]
+}
@@ -0,0 +1,39 @@
+import os
+import stat
+import tempfile
+
+import pytest
+
+from your5e.commands.daemon import default_socket_path
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path))
+    return tmp_path / f"your5e-{os.getuid()}"
+
+
+class TestDefaultSocketPath:
+    def test_runtime_dir(self, monkeypatch):
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert default_socket_path() == "/run/user/1000/your5e.sock"
+
+    def test_creates_a_private_dir(self, temp_dir):
+        assert default_socket_path() == str(temp_dir / "your5e.sock")
+        assert stat.S_IMODE(temp_dir.stat().st_mode) == 0o700
+        # and uses it again
+        assert default_socket_path() == str(temp_dir / "your5e.sock")
+
+    def test_refuses_a_dir_others_can_use(self, temp_dir):
+        temp_dir.mkdir(mode=0o700)
+        temp_dir.chmod(0o777)
+        with pytest.raises(PermissionError):
+            default_socket_path()
+
+    def test_refuses_a_link(self, temp_dir, tmp_path):
+        target = tmp_path / "elsewhere"
+        target.mkdir(mode=0o700)
+        temp_dir.symlink_to(target)
+        with pytest.raises(PermissionError):
+            default_socket_path()
@@ -0,0 +1,185 @@
+import json
+import subprocess
+import sys
+import textwrap
+
+from your5e.commands.lsp import Document, utf16_index
+from your5e.rules import RuleParser
+
+
+CONTENT = textwrap.dedent(
+    """\
+    # Fighter
+
+    - Hit Die _d10_
+    - Language _Common_
+    """
+)
+
+
+def change(start, end, text):
+    return {
+        "range": {
+            "start": {"line": start[0], "character": start[1]},
+            "end": {"line": end[0], "character": end[1]},
+        },
+        "text": text,
+    }
+
+
+class LanguageServerProcess:
+    def __init__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "your5e.cli", "lsp"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    def send(self, message):
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        self.send_raw(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+
+    def send_raw(self, data):
+        self.process.stdin.write(data)
+        self.process.stdin.flush()
+
+    def receive(self):
+        header = b""
+        while not header.endswith(b"\r\n\r\n"):
+            header += self.process.stdout.read(1)
+        length = int(header.split(b":")[1])
+        return json.loads(self.process.stdout.read(length))
+
+
+class TestDocument:
+    def test_changes_match_full_parse(self):
+        document = Document("file:///fighter.md", CONTENT)
+        document.validate()
+
+        document.change(change((2, 11), (2, 14), "d7"))
+        document.change(change((3, 0), (3, 0), "- Choose _1_\n    - _Option_ a\n"))
+        document.change(change((4, 15), (4, 16), "b\n        - Hit Die _d3_"))
+        assert "\n".join(document.lines) == textwrap.dedent(
+            """\
+            # Fighter
+
+            - Hit Die _d7_
+            - Choose _1_
+                - _Option_ b
+                    - Hit Die _d3_
+            - Language _Common_
+            """
+        )
+
+        errors = document.validate()
+        assert errors == RuleParser().parse_rules("\n".join(document.lines))[1]
+        assert errors == [
+            {"line": 1, "text": 'Die "d3" is not a standard die.'},
+            {"line": 3, "text": 'Die "d7" is not a standard die.'},
+        ]
+
+        diagnostics = document.diagnostics()
+        assert [diagnostic["range"]["start"]["line"] for diagnostic in diagnostics] == [
+            0,
+            2,
+        ]
+
+    def test_utf16_positions(self):
+        assert utf16_index("- Language _Common_", 4) == 4
+        # the dragon is two UTF-16 code units
+        assert utf16_index("- 🐉 Hit Die", 5) == 4
+        assert utf16_index("- 🐉", 10) == 3
+
+
+class TestLanguageServer:
+    def test_session(self):
+        server = LanguageServerProcess()
+
+        server.send({"id": 1, "method": "initialize", "params": {}})
+        response = server.receive()
+        assert response["id"] == 1
+        assert response["result"]["capabilities"]["textDocumentSync"]["change"] == 2
+
+        uri = "file:///fighter.md"
+        server.send(
+            {
+                "method": "textDocument/didOpen",
+                "params": {
+                    "textDocument": {"uri": uri, "version": 1, "text": CONTENT}
+                },
+            }
+        )
+        notification = server.receive()
+        assert notification["method"] == "textDocument/publishDiagnostics"
+        assert notification["params"]["diagnostics"] == []
+
+        server.send(
+            {
+                "method": "textDocument/didChange",
+                "params": {
+                    "textDocument": {"uri": uri, "version": 2},
+                    "contentChanges": [change((2, 12), (2, 14), "7")],
+                },
+            }
+        )
+        notification = server.receive()
+        assert notification["params"]["version"] == 2
+        assert notification["params"]["diagnostics"] == [
+            {
+                "range": {
+                    "start": {"line": 2, "character": 11},
+                    "end": {"line": 2, "character": 13},
+                },
+                "severity": 1,
+                "source": "your5e",
+                "message": 'Die "d7" is not a standard die.',
+                "code": "non-standard-die",
+            }
+        ]
+
+        server.send({"id": 2, "method": "textDocument/hover", "params": {}})
+        assert server.receive()["error"]["code"] == -32601
+
+        server.send({"id": 3, "method": "shutdown"})
+        assert server.receive() == {"jsonrpc": "2.0", "id": 3, "result": None}
+        server.send({"method": "exit"})
+        assert server.process.wait(timeout=5) == 0
+
+    def test_survives_bad_messages(self):
+        server = LanguageServerProcess()
+
+        # a notification that fails is only logged
+        server.send(
+            {
+                "method": "textDocument/didOpen",
+                "params": {"textDocument": {"uri": "file:///fighter.md"}},
+            }
+        )
+        # a request that fails is answered with an error
+        server.send(
+            {
+                "id": 1,
+                "method": "textDocument/didOpen",
+                "params": {"textDocument": {"uri": "file:///fighter.md"}},
+            }
+        )
+        response = server.receive()
+        assert response["id"] == 1
+        assert response["error"]["code"] == -32603
+        assert "KeyError" in response["error"]["message"]
+
+        server.send_raw(b"Content-Length: many\r\n\r\n")
+        response = server.receive()
+        assert response["id"] is None
+        assert response["error"]["code"] == -32700
+
+        server.send({"id": 2, "method": "initialize", "params": {}})
+        assert server.receive()["id"] == 2
+
+        server.send({"id": 3, "method": "shutdown"})
+        assert server.receive()["id"] == 3
+        server.send({"method": "exit"})
+        assert server.process.wait(timeout=5) == 0
+        log = server.process.stderr.read().decode()
+        assert "Error handling textDocument/didOpen: KeyError('text')" in log
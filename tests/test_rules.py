@@ -1,9 +1,154 @@
+import random
+import subprocess
+import sys
 import textwrap
 
-from your5e.rules import RuleParser, DirectiveExtract
+from your5e.rules import DirectiveExtract, DirectivePosition, RuleParser
+from your5e.rules.directives import (
+    DIRECTIVES,
+    MANIFEST,
+    DirectivePool,
+    DirectiveRegistry,
+    HitDie,
+    directive_metadata,
+    discover_directives,
+)
+from your5e.rules.lines import classify
 from .utils import into_dicts
 
 
+# lines of every kind, and the ways of indenting them, that decide where
+# directive blocks start and end
+PIECES = [
+    "",
+    "   ",
+    "# Fighter",
+    "## Equipment",
+    "  ### Indented heading",
+    "#",
+    "Some text.",
+    "  Indented text.",
+    "- ",
+    "-",
+    "-text",
+    "- Hit Die _d10_",
+    "- Hit Die",
+    "    - _Die_ d8",
+    "\t- _Value_ 5",
+    "  - Argument",
+    "- Proficiency _Weapon_ Longbow",
+    "- Ability Score _Strength_ 13",
+    "- Choose _1_ Fighting Style",
+    "    - _Option_ Archery",
+    "        - Proficiency _Weapon_ Longbow",
+    "- Unknown _thing_",
+    "- Comment on this",
+    "- # comment",
+    "    - comment on an argument",
+    "    - # comment",
+    "- Break",
+    "- break here",
+    "  - Break",
+]
+
+
+def documents():
+    """The parser fixtures, and documents made of random lines."""
+    for fixture in [
+        "after_header",
+        "after_text",
+        "break",
+        "indentation",
+        "skips_comments",
+        "top_of_file",
+        "unknown_directives",
+    ]:
+        with open(f"tests/rules/parser/{fixture}.md", "r") as handle:
+            yield handle.read()
+    for fixture in ["all_good", "example"]:
+        with open(f"tests/rules/{fixture}.md", "r") as handle:
+            yield handle.read()
+
+    generator = random.Random(5)
+    for _ in range(2000):
+        yield "\n".join(
+            generator.choice(PIECES) for _ in range(generator.randint(0, 12))
+        )
+
+
+def next_block_looking_backwards(lines, index):
+    """
+    The next directive block of `lines` from `index`, found as it was before
+    blocks were found in a single pass: by looking backwards from every
+    list item to see whether a directive can start there.
+    """
+    position = DirectivePosition()
+    while index < len(lines):
+        line = lines[index]
+        if not line.startswith("- ") or not position.directive_position(lines, index):
+            index += 1
+            continue
+
+        directive_name = line[2:].strip().lower()
+        if directive_name.startswith("comment") or directive_name.startswith("#"):
+            index += 1
+            continue
+        if directive_name.startswith("break"):
+            while index < len(lines) and not lines[index].strip().startswith("#"):
+                index += 1
+            continue
+
+        start_index = index
+        index += 1
+        while index < len(lines):
+            line = lines[index]
+            stripped = line.strip()
+            if stripped == "" or line.startswith("- ") or not stripped.startswith("- "):
+                break
+            index += 1
+        return start_index, lines[start_index:index]
+    return None
+
+
+def blocks_looking_backwards(lines):
+    blocks = []
+    index = 0
+    while True:
+        block = next_block_looking_backwards(lines, index)
+        if block is None:
+            return blocks
+        blocks.append(block)
+        index = block[0] + len(block[1])
+
+
+def extract_looking_backwards(content):
+    lines = content.split("\n")
+    markdown_lines = []
+    directive_lines = []
+    last_index = 0
+    for index, block_lines in blocks_looking_backwards(lines):
+        directive_lines.extend(block_lines)
+        section_start = 0
+        for lookback in range(index, -1, -1):
+            if lines[lookback].strip().startswith("#"):
+                section_start = lookback
+                break
+        for copy in range(last_index, index):
+            if section_start <= copy and lines[copy].strip() == "":
+                continue
+            markdown_lines.append(lines[copy])
+        last_index = index + len(block_lines)
+    markdown_lines.extend(lines[last_index:])
+
+    markdown = "\n".join(markdown_lines)
+    if markdown and not markdown.endswith("\n"):
+        markdown += "\n"
+    directives = "\n".join(directive_lines)
+    if directives and not directives.endswith("\n"):
+        directives += "\n"
+    return markdown, directives
+
+
 class TestDirectivePosition:
     hit_die = ["- Hit Die _d12_ 12\n"]
     proficiencies = [
@@ -80,8 +225,58 @@ class TestDirectivePosition:
         result = self.parser.next_directive_block(lines, 3)
         assert result == (20, ["- Inventory _add_ explorer's pack\n"])
 
+    def test_same_blocks_as_looking_backwards(self):
+        for content in documents():
+            lines = content.split("\n")
+            expected = blocks_looking_backwards(lines)
+
+            assert list(self.parser.directive_blocks(lines)) == expected, content
+            for index in range(len(lines)):
+                assert self.parser.next_directive_block(
+                    lines, index
+                ) == next_block_looking_backwards(lines, index), (content, index)
+
+    def test_directive_blocks_ignores_text_lists(self):
+        lines = textwrap.dedent(
+            """\
+            # Fighter
+            - Hit Die _d10_
+            Fighters get a d10 hit die.
+            - Hit Die _d12_
+            ## Equipment
+
+            - Comment one
+            - Inventory _add_ Javelin
+            """
+        ).split("\n")
+
+        assert list(self.parser.directive_blocks(lines)) == [
+            (1, ["- Hit Die _d10_"]),
+            (7, ["- Inventory _add_ Javelin"]),
+        ]
+
 
 class TestParseRules:
+    def test_parses_the_blocks_found_looking_backwards(self):
+        parser = RuleParser()
+        for content in documents():
+            result = []
+            errors = []
+            for index, lines in blocks_looking_backwards(content.split("\n")):
+                records = [(line, *classify(line)) for line in lines]
+                directive, block_errors = parser.parse_block(index + 1, records)
+                if directive is not None:
+                    result.append(directive)
+                errors.extend(block_errors)
+            errors.sort(key=lambda e: e["line"])
+
+            assert parser.parse_rules(content) == (result, errors), content
+            # which classifies lines as it scans them
+            assert parser.parse_rules(content, max_errors=1000) == (
+                result,
+                errors,
+            ), content
+
     def test_empty_content(self):
         result, errors = RuleParser().parse_rules("")
         assert result == []
@@ -624,6 +819,148 @@ class TestParseRules:
         assert errors == []
 
 
+class TestIterRules:
+    def test_matches_parse_rules(self):
+        for path in [
+            "docs/rules/directives/choose.md",
+            "docs/rules/directives/hit_die.md",
+            "tests/rules/example.md",
+        ]:
+            result, errors = RuleParser().parse_rules_file(path)
+
+            streamed = []
+            streamed_errors = []
+            with open(path, "r") as handle:
+                for directive, block_errors in RuleParser().iter_rules(handle):
+                    if directive is not None:
+                        streamed.append(directive)
+                    streamed_errors.extend(block_errors)
+
+            assert into_dicts(streamed) == into_dicts(result)
+            assert sorted(streamed_errors, key=lambda e: e["line"]) == errors
+
+    def test_yields_blocks_as_they_complete(self):
+        lines_read = []
+
+        def stream():
+            for line in [
+                "- Hit Die _d10_\n",
+                "- Hit Die\n",
+                "    - _die_ d3\n",
+                "# Equipment\n",
+                "- Inventory _add_ Javelin\n",
+            ]:
+                lines_read.append(line)
+                yield line
+
+        blocks = RuleParser().iter_rules(stream())
+
+        directive, errors = next(blocks)
+        assert into_dicts([directive]) == [
+            {"id": "hitdie_1", "name": None, "comment": None, "die": 10, "value": 6}
+        ]
+        assert errors == []
+        assert len(lines_read) == 2
+
+        directive, errors = next(blocks)
+        assert directive is None
+        assert errors == [{"line": 3, "text": 'Die "d3" is not a standard die.'}]
+        assert len(lines_read) == 4
+
+        directive, errors = next(blocks)
+        assert str(directive) == "Inventory: add Javelin"
+        assert next(blocks, None) is None
+
+
+class TestMaxErrors:
+    def test_stops_after_the_block_reaching_the_limit(self):
+        content = "- Hit Die _d3_\n- Hit Die _d12_\n- Set\n- Hit Die _d7_\n"
+        result, errors = RuleParser().parse_rules(content, max_errors=2)
+        assert into_dicts(result) == [
+            {"id": "hitdie_2", "name": None, "comment": None, "die": 12, "value": 7}
+        ]
+        assert errors == [
+            {"line": 1, "text": 'Die "d3" is not a standard die.'},
+            {"line": 3, "text": 'Required "key" argument is missing.'},
+            {"line": 3, "text": 'Required "value" argument is missing.'},
+        ]
+        assert RuleParser().parse_rules(content)[1][:3] == errors
+
+
+class TestBatches:
+    def test_matches_parsing_block_by_block(self):
+        parser = RuleParser()
+        contents = list(documents())
+        for path in [
+            "docs/rules/directives/ability_score.md",
+            "docs/rules/directives/choose.md",
+            "docs/rules/directives/proficiency.md",
+            "docs/rules/directives/register.md",
+        ]:
+            with open(path) as handle:
+                contents.append(handle.read())
+
+        for content in contents:
+            records = [(line, *classify(line)) for line in content.split("\n")]
+            blocks = list(parser.scan_blocks(records))
+            assert parser.parse_batch(blocks) == [
+                parser.parse_block(index + 1, block) for index, block in blocks
+            ], content
+
+    def test_directives_of_a_type_are_validated_together(self, monkeypatch):
+        batches = []
+        new_many = HitDie.new_many.__func__
+
+        def counting_new_many(cls, records):
+            batches.append([line for line, _ in records])
+            return new_many(cls, records)
+
+        monkeypatch.setattr(HitDie, "new_many", classmethod(counting_new_many))
+        content = "- Hit Die _d6_\n- Language _Common_\n- Hit Die _d3_\n"
+        result, errors = RuleParser().parse_rules(content)
+
+        assert batches == [[1, 3]]
+        assert [str(directive) for directive in result] == [
+            "Hit Die: d6 (4)",
+            "Language: Common",
+        ]
+        assert errors == [{"line": 3, "text": 'Die "d3" is not a standard die.'}]
+
+
+class TestSharing:
+    content = textwrap.dedent(
+        """\
+        - Language _Common_
+        - Language _Common_ Tongue
+        - Choose _1_
+            - _Option_ Dwarf
+                - Language _Dwarvish_
+            - _Option_ Elf
+                - Language _Dwarvish_
+        """
+    )
+
+    def test_repeated_values_are_interned(self):
+        first, second = [
+            RuleParser().parse_rules(self.content)[0][0] for _ in range(2)
+        ]
+        assert first.name is second.name
+
+    def test_identical_directives_share_an_instance(self):
+        pool = DirectivePool()
+        result, errors = RuleParser(pool=pool).parse_rules(self.content)
+        again, _ = RuleParser(pool=pool).parse_rules(self.content)
+
+        assert errors == []
+        assert result == RuleParser().parse_rules(self.content)[0]
+        assert again[0] is result[0]
+        assert again[1] is result[1]
+        # a Choose holds other directives, so is never shared
+        assert again[2] is not result[2]
+        first, second = result[2].options
+        assert first.directives[0] is second.directives[0]
+
+
 class TestDirectiveExtract:
     def test_extract_with_example_file(self):
         example_path = "tests/rules/example.md"
@@ -640,3 +977,96 @@ class TestDirectiveExtract:
         with open("tests/rules/example_directives.txt", "r") as f:
             expected_directives = f.read()
         assert directives == expected_directives
+
+    def test_same_as_looking_backwards(self):
+        extractor = DirectiveExtract()
+        for content in documents():
+            assert extractor.extract(content) == extract_looking_backwards(
+                content
+            ), content
+
+
+class TestDirectiveRegistry:
+    def test_metadata_computed_at_registration(self):
+        hit_die = DIRECTIVES["hit die"]
+        assert hit_die["class"] is HitDie
+        assert hit_die["key"] == "hit_die"
+        assert hit_die["wants_content"] is False
+        assert hit_die["fields"] == ("id", "name", "comment", "die", "value")
+        assert hit_die["shorthand_key"] == "die"
+        assert hit_die["shorthand_value"] == "value"
+        assert hit_die["universal_keys"] == {"id", "name", "comment"}
+
+        choose = DIRECTIVES["choose"]
+        assert choose["wants_content"] is True
+        assert choose["shorthand_key"] == "count"
+        assert choose["shorthand_value"] == "name"
+
+    def test_metadata_matches_registry(self):
+        for directive_info in DIRECTIVES.values():
+            metadata = directive_metadata(directive_info["class"])
+            assert {**directive_info, **metadata} == directive_info
+
+    def test_directives_are_slotted(self):
+        for directive_info in DIRECTIVES.values():
+            directive = directive_info["class"]()
+            assert not hasattr(directive, "__dict__")
+            assert list(directive.asdict()) == list(directive_info["fields"])
+
+    def test_manifest_matches_discovery(self):
+        discovered = discover_directives("your5e.rules.directives")
+        assert {
+            name: f"{cls.__module__.rsplit('.', 1)[1]}:{cls.__name__}"
+            for name, cls in discovered.items()
+        } == MANIFEST
+
+    def test_modules_imported_when_first_used(self):
+        code = textwrap.dedent(
+            """\
+            import sys
+            from your5e.rules import RuleParser
+            loaded = lambda: sorted(
+                name.rsplit(".", 1)[1]
+                for name in sys.modules
+                if name.startswith("your5e.rules.directives.")
+            )
+            print(loaded())
+            RuleParser().parse_rules("- Hit Die _d10_")
+            print(loaded())
+            """
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        ).stdout
+        assert output == "[]\n['hit_die']\n"
+
+    def test_plugin_packages_are_discovered(self, tmp_path, monkeypatch):
+        plugins = tmp_path / "your5e_test_plugins"
+        plugins.mkdir()
+        (plugins / "__init__.py").write_text("")
+        (plugins / "teleport.py").write_text(
+            textwrap.dedent(
+                """\
+                from dataclasses import dataclass
+                from your5e.rules.directives import Directive
+
+
+                @dataclass(slots=True)
+                class Teleport(Directive):
+                    DIRECTIVE_NAME = "Teleport"
+                    DIRECTIVE_KEY = "teleport"
+
+                    @classmethod
+                    def new(cls, line, args):
+                        return cls.create_object(args, line), []
+                """
+            )
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+
+        registry = DirectiveRegistry(MANIFEST)
+        assert registry.get("teleport") is None
+        registry.add_plugin_package("your5e_test_plugins")
+        assert registry["teleport"]["class"].__name__ == "Teleport"
+        assert registry["hit die"]["class"] is HitDie
+        assert list(registry) == list(MANIFEST) + ["teleport"]
@@ -0,0 +1,91 @@
+import json
+import marshal
+import textwrap
+
+import pytest
+
+from your5e.rules import RuleParser
+from your5e.rules.bundle import (
+    MAGIC,
+    Bundle,
+    BundleError,
+    StaleBundleError,
+    load_bundle,
+    located_directives,
+)
+
+
+CONTENT = textwrap.dedent(
+    """\
+    # Fighter
+
+    - Hit Die _d10_
+    - Proficiency _Armor_ Heavy
+    - Choose _1_ Fighting Style
+        - _Option_ Archery
+            - Proficiency _Weapon_ Longbow
+        - _Option_ Defense
+            - Ability Score _Constitution_ 13
+    """
+)
+
+
+def compile_bundle(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "fighter.md").write_text(CONTENT)
+    located, errors = located_directives(RuleParser(), CONTENT)
+    assert errors == []
+    Bundle.compile(["fighter.md"], [located]).write("rules.bundle")
+    return tmp_path / "rules.bundle"
+
+
+class TestBundle:
+    def test_restores_the_parsed_directives(self, tmp_path, monkeypatch):
+        path = compile_bundle(tmp_path, monkeypatch)
+        bundle = load_bundle(str(path))
+
+        assert bundle.directives == RuleParser().parse_rules(CONTENT)[0]
+        assert bundle.locations == [
+            ("fighter.md", 3),
+            ("fighter.md", 4),
+            ("fighter.md", 5),
+        ]
+        assert not bundle.is_stale()
+
+    def test_changed_rules_make_it_stale(self, tmp_path, monkeypatch):
+        path = compile_bundle(tmp_path, monkeypatch)
+        (tmp_path / "fighter.md").write_text(CONTENT.replace("d10", "d12"))
+
+        with pytest.raises(StaleBundleError):
+            load_bundle(str(path))
+        bundle = load_bundle(str(path), check=False)
+        assert bundle.is_stale()
+
+    def test_not_a_bundle(self, tmp_path):
+        path = tmp_path / "fighter.md"
+        path.write_text(CONTENT)
+        with pytest.raises(BundleError):
+            load_bundle(str(path))
+
+    def test_header_missing_a_field(self, tmp_path, monkeypatch):
+        path = compile_bundle(tmp_path, monkeypatch)
+        magic, header, payload = path.read_bytes().split(b"\n", 2)
+        header = json.loads(header)
+        del header["files"]
+        path.write_bytes(
+            magic + b"\n" + json.dumps(header).encode("utf-8") + b"\n" + payload
+        )
+
+        with pytest.raises(BundleError):
+            load_bundle(str(path))
+        with pytest.raises(BundleError):
+            load_bundle(str(path), check=False)
+
+    def test_corrupt_directives(self, tmp_path, monkeypatch):
+        path = compile_bundle(tmp_path, monkeypatch)
+        data = path.read_bytes()
+        header = data[: data.index(b"\n", len(MAGIC)) + 1]
+        path.write_bytes(header + marshal.dumps({"directives": [(0, 3, "nope", {})]}))
+
+        with pytest.raises(BundleError):
+            load_bundle(str(path))
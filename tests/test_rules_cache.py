@@ -0,0 +1,67 @@
+import textwrap
+
+from your5e.rules import RuleParser
+from your5e.rules.cache import ParseCache
+from .utils import into_dicts
+
+
+CONTENT = textwrap.dedent(
+    """\
+    - Hit Die _d10_
+    - Hit Die _d3_
+    """
+)
+
+
+class CountingParser(RuleParser):
+    calls = 0
+
+    def parse_rules(self, content):
+        self.calls += 1
+        return super().parse_rules(content)
+
+
+class TestParseCache:
+    def test_unchanged_content_is_not_parsed_again(self, tmp_path):
+        parser = CountingParser()
+        cache = ParseCache(tmp_path)
+
+        result, errors = cache.parse_rules(parser, CONTENT)
+        assert parser.calls == 1
+        cached_result, cached_errors = cache.parse_rules(parser, CONTENT)
+        assert parser.calls == 1
+
+        assert into_dicts(cached_result) == into_dicts(result)
+        assert into_dicts(cached_result) == [
+            {"id": "hitdie_1", "name": None, "comment": None, "die": 10, "value": 6}
+        ]
+        assert cached_errors == errors
+        assert cached_errors == [
+            {"line": 2, "text": 'Die "d3" is not a standard die.'},
+        ]
+
+        cache.parse_rules(parser, CONTENT + "- Hit Die _d8_\n")
+        assert parser.calls == 2
+
+    def test_version_change_invalidates(self, tmp_path):
+        cache = ParseCache(tmp_path)
+        cache.set(CONTENT, ([], []))
+        assert cache.get(CONTENT) == ([], [])
+
+        cache.version = "a different parser"
+        assert cache.get(CONTENT) is None
+
+    def test_corrupt_entries_are_a_miss(self, tmp_path):
+        cache = ParseCache(tmp_path)
+        cache.set(CONTENT, ([], []))
+        cache.path(cache.key(CONTENT)).write_bytes(b"not a pickle")
+
+        assert cache.get(CONTENT) is None
+
+    def test_unwritable_cache_is_ignored(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = ParseCache(blocker / "cache")
+
+        cache.set(CONTENT, ([], []))
+        assert cache.get(CONTENT) is None
@@ -1,11 +1,29 @@
 #!/usr/bin/env bats
 
+setup() {
+    # keep the parse cache, and any daemon's socket, away from the user's own
+    export XDG_CACHE_HOME="$(mktemp -d)"
+    export XDG_RUNTIME_DIR="$(mktemp -d)"
+}
+
+teardown() {
+    rm -rf "$XDG_CACHE_HOME" "$XDG_RUNTIME_DIR"
+}
+
 @test "check-rules reports non-existent files" {
     run your5e check-rules nonexistent.md
     [ "$status" -eq 1 ]
     [[ "$output" == *"Error: 'nonexistent.md' not found"* ]]
 }
 
+@test "check-rules reports non-existent files before checking any" {
+    run your5e check-rules --no-daemon tests/rules/parser nonexistent.md missing.md
+    [ "$status" -eq 1 ]
+    [ "${lines[0]}" = "Error: 'nonexistent.md' not found" ]
+    [ "${lines[1]}" = "Error: 'missing.md' not found" ]
+    [ "${lines[2]}" = "tests/rules/parser/unknown_directives.md: 2 errors" ]
+}
+
 @test "check-rules output matches reference" {
     run your5e check-rules --context 2 docs/rules/directives/hit_die.md
     [ $status -eq 1 ]
@@ -30,8 +48,224 @@
     diff -u tests/rules/directives/multiple-files.txt <(echo "$output")
 }
 
+@test "check-rules --fail-fast stops at the first error" {
+    run your5e check-rules --fail-fast --jobs 2 docs/rules/directives/hit_die.md docs/rules/directives/ability_score.md
+    [ $status -eq 1 ]
+    diff -u <(head -2 tests/rules/directives/hit_die.no-context.txt | sed 's/11 errors/1 errors/'; echo; echo "Stopped after 1 errors.") <(echo "$output")
+}
+
+@test "check-rules --max-errors stops after that many errors" {
+    run your5e check-rules --max-errors 3 docs/rules/directives/hit_die.md
+    [ $status -eq 1 ]
+    diff -u <(head -4 tests/rules/directives/hit_die.no-context.txt | sed 's/11 errors/3 errors/'; echo; echo "Stopped after 3 errors.") <(echo "$output")
+}
+
+@test "check-rules --format ndjson writes a record per error and file" {
+    run your5e check-rules --no-daemon --format ndjson docs/rules/directives/hit_die.md tests/rules/all_good.md
+    [ $status -eq 1 ]
+    [ "$(echo "$output" | grep -c '"type": "error"')" -eq 11 ]
+    echo "$output" | python -c '
+import json, sys
+records = [json.loads(line) for line in sys.stdin]
+files = [record for record in records if record["type"] == "file"]
+assert [(f["file"], f["errors"]) for f in files] == [
+    ("docs/rules/directives/hit_die.md", 11),
+    ("tests/rules/all_good.md", 0),
+]
+assert all(f["seconds"] >= 0 and f["directives"] >= 0 for f in files)
+assert records[0]["code"] == "missing-argument"
+assert records[-1]["type"] == "summary" and records[-1]["errors"] == 11
+'
+}
+
+@test "check-rules --format json writes one document" {
+    run your5e check-rules --no-daemon --format json --max-errors 2 docs/rules/directives/hit_die.md tests/rules/all_good.md
+    [ $status -eq 1 ]
+    echo "$output" | python -c '
+import json, sys
+report = json.load(sys.stdin)
+assert len(report["files"]) == 1
+assert [e["line"] for e in report["files"][0]["errors"]] == [30, 31]
+assert report["summary"]["stopped"] is True
+'
+}
+
+@test "check-rules --profile writes where the time went to stderr" {
+    run bash -c 'your5e check-rules --profile -j2 docs/rules/directives/hit_die.md tests/rules/all_good.md 2>&1 >/dev/null'
+    [ $status -eq 1 ]
+    [ "$(echo "$output" | awk '$1 == "validate" || $1 == "report"' | wc -l)" -eq 2 ]
+    echo "$output" | grep -q "^Hit Die "
+    [ "$(echo "$output" | tail -1 | awk '{ print $1, $2 }')" = "2 files" ]
+}
+
+@test "check-rules --format json reports finding no files" {
+    run bash -c 'your5e check-rules --no-daemon --format json nonexistent.md 2>/dev/null'
+    [ $status -eq 1 ]
+    echo "$output" | python -c '
+import json, sys
+report = json.load(sys.stdin)
+assert report["files"] == [] and report["summary"]["files"] == 0
+'
+    run bash -c 'your5e check-rules --no-daemon --format ndjson nonexistent.md 2>/dev/null'
+    [ $status -eq 1 ]
+    echo "$output" | python -c '
+import json, sys
+records = [json.loads(line) for line in sys.stdin]
+assert [record["type"] for record in records] == ["summary"]
+'
+}
+
+@test "check-rules --include and --exclude choose the files in directories" {
+    run your5e check-rules --no-daemon --jobs 2 --include hit_die.md --include '*.txt' --exclude README.md docs
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/hit_die.no-context.txt <(echo "$output")
+}
+
 @test "check-rules with valid file gives no output" {
     run your5e check-rules tests/rules/all_good.md
     [ $status -eq 0 ]
     [ -z "$output" ]
 }
+
+@test "check-rules parallel output matches reference" {
+    run your5e check-rules --jobs 2 docs/rules/directives/hit_die.md docs/rules/directives/ability_score.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/multiple-files.txt <(echo "$output")
+}
+
+@test "check-rules single job output matches reference" {
+    run your5e check-rules --jobs 1 docs/rules/directives/hit_die.md docs/rules/directives/ability_score.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/multiple-files.txt <(echo "$output")
+}
+
+@test "check-rules cached output matches reference" {
+    cache_dir="$(mktemp -d)"
+    run your5e check-rules --cache-dir "$cache_dir" docs/rules/directives/hit_die.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/hit_die.no-context.txt <(echo "$output")
+
+    run your5e check-rules --cache-dir "$cache_dir" docs/rules/directives/hit_die.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/hit_die.no-context.txt <(echo "$output")
+    rm -rf "$cache_dir"
+}
+
+@test "check-rules without cache output matches reference" {
+    run your5e check-rules --no-cache docs/rules/directives/hit_die.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/hit_die.no-context.txt <(echo "$output")
+}
+
+@test "check-rules reads from stdin" {
+    run bash -c "your5e check-rules - < docs/rules/directives/hit_die.md"
+    [ $status -eq 1 ]
+    diff -u <(sed 's|^docs/rules/directives/hit_die.md:|<stdin>:|' tests/rules/directives/hit_die.no-context.txt) <(echo "$output")
+}
+
+@test "check-rules output from the daemon matches reference" {
+    socket="$(mktemp -d)/your5e.sock"
+    your5e daemon --socket "$socket" > /dev/null &
+    daemon=$!
+    while [ ! -S "$socket" ]; do sleep 0.1; done
+
+    run your5e check-rules --socket "$socket" docs/rules/directives/hit_die.md docs/rules/directives/ability_score.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/multiple-files.txt <(echo "$output")
+
+    # a second time, from the parsed files kept in memory
+    run your5e check-rules --socket "$socket" docs/rules/directives/hit_die.md docs/rules/directives/ability_score.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/multiple-files.txt <(echo "$output")
+
+    kill $daemon
+    wait $daemon || true
+    [ ! -S "$socket" ]
+}
+
+@test "check-rules from the daemon keeps no files open" {
+    dir="$(mktemp -d)"
+    for n in $(seq 300); do
+        printf -- "- Hit Die _d7_\n" > "$dir/$n.md"
+    done
+    socket="$dir/your5e.sock"
+    # more files with errors than the daemon could keep open at once
+    (ulimit -n 128; exec your5e daemon --socket "$socket" > /dev/null 2>&1) &
+    daemon=$!
+    while [ ! -S "$socket" ]; do sleep 0.1; done
+
+    # the second time, from the parsed files kept in memory
+    your5e check-rules --socket "$socket" "$dir" > "$dir/first" || true
+    your5e check-rules --socket "$socket" "$dir" > "$dir/second" || true
+    kill $daemon
+    wait $daemon || true
+
+    for output in "$dir/first" "$dir/second"; do
+        [ "$(grep -c ': 1 errors$' "$output")" -eq 300 ]
+        [ "$(grep -c "Error reading file" "$output")" -eq 0 ]
+    done
+    rm -rf "$dir"
+}
+
+@test "check-rules without a daemon checks files itself" {
+    run your5e check-rules --socket "$(mktemp -d)/missing.sock" docs/rules/directives/hit_die.md
+    [ $status -eq 1 ]
+    diff -u tests/rules/directives/hit_die.no-context.txt <(echo "$output")
+}
+
+@test "check-rules --watch reports files as they change" {
+    dir="$(mktemp -d)"
+    mkdir "$dir/rules"
+    cp tests/rules/all_good.md "$dir/rules/fighter.md"
+    your5e check-rules --watch "$dir/rules" > "$dir/output" &
+    watcher=$!
+    sleep 1
+
+    cp docs/rules/directives/hit_die.md "$dir/rules/fighter.md"
+    for _ in $(seq 50); do
+        grep -q "errors" "$dir/output" && break
+        sleep 0.1
+    done
+    kill $watcher
+    wait $watcher || true
+
+    diff -u <(echo; sed "s|^docs/rules/directives/hit_die.md:|$dir/rules/fighter.md:|" tests/rules/directives/hit_die.no-context.txt) "$dir/output"
+    rm -rf "$dir"
+}
+
+@test "check-rules --watch-interval polls for changes" {
+    dir="$(mktemp -d)"
+    mkdir "$dir/rules"
+    your5e check-rules --watch --watch-interval 0.1 "$dir/rules/wizard.md" > "$dir/output" &
+    watcher=$!
+    sleep 1
+
+    cp tests/rules/all_good.md "$dir/rules/wizard.md"
+    for _ in $(seq 50); do
+        grep -q "errors" "$dir/output" && break
+        sleep 0.1
+    done
+    kill $watcher
+    wait $watcher || true
+
+    diff -u <(echo "Error: '$dir/rules/wizard.md' not found"; echo; echo "$dir/rules/wizard.md: 0 errors") "$dir/output"
+    rm -rf "$dir"
+}
+
+@test "compile-rules writes a bundle of clean rules" {
+    dir="$(mktemp -d)"
+    run your5e compile-rules tests/rules/all_good.md -o "$dir/rules.bundle"
+    [ "$status" -eq 0 ]
+    [[ "$output" == "$dir/rules.bundle: "*" directives from 1 files" ]]
+    [ -f "$dir/rules.bundle" ]
+    rm -rf "$dir"
+}
+
+@test "compile-rules reports errors and writes nothing" {
+    dir="$(mktemp -d)"
+    run your5e compile-rules docs/rules/directives/hit_die.md -o "$dir/rules.bundle"
+    [ "$status" -eq 1 ]
+    [[ "$output" == *"Not writing '$dir/rules.bundle', as the rules have errors."* ]]
+    [ ! -e "$dir/rules.bundle" ]
+    rm -rf "$dir"
+}
@@ -4,7 +4,7 @@ import toml
 
 from your5e.rules import RuleParser
 from your5e.rules.directives import AbilityScore
-from .utils import into_dicts
+from .utils import into_dicts, new_and_new_many
 
 
 class TestAbilityScore:
@@ -439,6 +439,33 @@ class TestAbilityScore:
             },
         ]
 
+    def test_new_many_matches_new(self):
+        content = textwrap.dedent(
+            """\
+            - Ability Score _Strength_ 13
+            - Ability Score _dexterity_ +2
+            - Ability Score _Wisdom_ -1
+            - Ability Score _Charisma_ 19
+            - Ability Score _Might_ 10
+            - Ability Score _Strength_ x
+            - Ability Score
+                - _Ability_ Constitution
+                - _Override_ +2, maximum 22
+            - Ability Score
+                - _Ability_ Intelligence
+                - _Value_ 12
+                - _Override_ 12
+            - Ability Score
+                - _Value_ 12
+            - Ability Score
+                - _Ability_ Strength
+            """
+        )
+        one_by_one, together = new_and_new_many(AbilityScore, content)
+        assert together == one_by_one
+        assert any(errors for _, errors in together)
+        assert any(directive for directive, _ in together)
+
     def test_description_against_reference_toml(self):
         result, errors = RuleParser().parse_rules_file(
             "docs/rules/directives/ability_score.md"
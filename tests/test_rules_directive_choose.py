@@ -299,6 +299,43 @@ class TestChoose:
             },
         ]
 
+    def test_nested_choose_uses_the_same_parser(self):
+        class CountingParser(RuleParser):
+            blocks = 0
+
+            def parse_block(self, line_number, block):
+                self.blocks += 1
+                return super().parse_block(line_number, block)
+
+        content = textwrap.dedent(
+            """\
+            - Choose _1_
+                - _Option_ weapons
+                  - Choose _1_
+                  \t- _Option_ martial
+                  \t\t- Inventory _add_ Longsword
+                - _Option_ armour
+                    - Inventory _add_ Chain Mail
+                    - Hit Die _d7_
+            """
+        )
+        parser = CountingParser()
+        result, errors = parser.parse_rules(content)
+        assert parser.blocks == 5
+        assert into_dicts(result) == []
+        assert errors == [
+            {"line": 2, "text": 'Die "d7" is not a standard die.'},
+        ]
+
+        result, errors = parser.parse_rules(content.replace("_d7_", "_d8_"))
+        assert errors == []
+        weapons, armour = result[0].options
+        assert weapons.directives[0].options[0].directives[0].id == "inventory_1"
+        assert [directive.id for directive in armour.directives] == [
+            "inventory_1",
+            "hitdie_2",
+        ]
+
     def test_invalid_count(self):
         content = textwrap.dedent(
             """\
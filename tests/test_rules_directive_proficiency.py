@@ -4,7 +4,7 @@ import toml
 
 from your5e.rules import RuleParser
 from your5e.rules.directives import Proficiency
-from .utils import into_dicts
+from .utils import into_dicts, new_and_new_many
 
 
 class TestProficiency:
@@ -200,6 +200,29 @@ class TestProficiency:
             },
         ]
 
+    def test_new_many_matches_new(self):
+        content = textwrap.dedent(
+            """\
+            - Proficiency _Weapon_ Longbow
+            - Proficiency _saving throw_ Dexterity
+            - Proficiency _Language_ Elvish
+            - Proficiency
+                - _Type_ Skill
+                - _Value_ Athletics
+            - Proficiency
+                - _Type_ Tool
+            - Proficiency
+                - _Value_ Athletics
+            - Proficiency
+                - _Type_ Armor
+                - _Value_
+            """
+        )
+        one_by_one, together = new_and_new_many(Proficiency, content)
+        assert together == one_by_one
+        assert any(errors for _, errors in together)
+        assert any(directive for directive, _ in together)
+
     def test_description_against_reference_toml(self):
         result, errors = RuleParser().parse_rules_file(
             "docs/rules/directives/proficiency.md"
@@ -4,7 +4,7 @@ import toml
 
 from your5e.rules import RuleParser
 from your5e.rules.directives import Register
-from .utils import into_dicts
+from .utils import into_dicts, new_and_new_many
 
 
 class TestRegister:
@@ -270,6 +270,29 @@ class TestRegister:
             },
         ]
 
+    def test_new_many_matches_new(self):
+        content = textwrap.dedent(
+            """\
+            - Register _Skill_ Acrobatics (Dexterity)
+            - Register _ability score_ Dexterity
+            - Register _Spell_ Fire Bolt
+            - Register
+                - _Type_ Roll
+                - _Name_ Initiative
+            - Register
+                - _Type_ Roll
+            - Register
+                - _Name_ Initiative
+            - Register
+                - _Type_
+                - _Name_ Initiative
+            """
+        )
+        one_by_one, together = new_and_new_many(Register, content)
+        assert together == one_by_one
+        assert any(errors for _, errors in together)
+        assert any(directive for directive, _ in together)
+
     def test_description_against_reference_toml(self):
         result, errors = RuleParser().parse_rules_file(
             "docs/rules/directives/register.md"
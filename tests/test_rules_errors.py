@@ -0,0 +1,69 @@
+import pickle
+
+from your5e.rules import RuleParser
+from your5e.rules.errors import MESSAGES, ParseError
+
+
+class TestParseError:
+    def test_behaves_as_the_dict_it_replaces(self):
+        error = ParseError(3, "non-standard-die", (7,))
+        assert error == {"line": 3, "text": 'Die "d7" is not a standard die.'}
+        assert error != {"line": 4, "text": 'Die "d7" is not a standard die.'}
+        assert error["line"] == 3
+        assert error["text"] == 'Die "d7" is not a standard die.'
+        assert dict(error) == {"line": 3, "text": 'Die "d7" is not a standard die.'}
+
+    def test_message_is_only_formatted_when_asked_for(self):
+        # a message that cannot be formatted would raise if it were
+        error = ParseError(1, "missing-argument")
+        assert error.code == "missing-argument"
+        assert error.line == 1
+
+    def test_pickles(self):
+        error = ParseError(2, "unknown-directive", ("Spell",), (2, 7))
+        assert pickle.loads(pickle.dumps(error)) == error
+
+    def test_every_code_reported_has_a_message(self):
+        _, errors = RuleParser().parse_rules_file("docs/rules/directives/hit_die.md")
+        assert errors
+        for error in errors:
+            assert error.code in MESSAGES
+
+    def test_spans(self):
+        _, errors = RuleParser().parse_rules("- Hit Die\n    - oops\n-  Spell _Fire_\n")
+        assert [(error.code, error.span) for error in errors] == [
+            ("missing-argument", None),
+            ("argument-without-key", (4, 10)),
+            ("unknown-directive", (3, 8)),
+        ]
+        assert errors[2]["text"] == "Unknown directive: Spell"
+
+    def test_spans_of_arguments(self):
+        # each line is an error, spanning the value in brackets
+        for content in [
+            "- Ability Score _[Might]_ 13",
+            "- Ability Score\n    - _Ability_ [Might]\n    - _Value_ 13",
+            "- Ability Score _Strength_ [19]",
+            "- Ability Score\n    - _Ability_ Strength\n    - _Override_  [+2, most]",
+            "- Proficiency _[Language]_ Elvish",
+            "- Proficiency\n    - _Type_ [Language]\n    - _Value_ Elvish",
+            "- Register _[Spell]_ Fire Bolt",
+            "- Register\n    - __Type__ [Spell]\n    - _Name_ Fire Bolt",
+            "- Inventory _[borrow]_ Rope",
+            "- Inventory\n    - _Action_ [borrow]\n    - _Item_ Rope",
+            "- Inventory\n    - _Action_ add\n    - _Item_ Rope\n    - _Count_ [many]",
+            "- Inventory\n\t- _Action_ add\n\t- _Item_ Rope\n\t- _Count_ [-5]",
+            "- Resource\n    - _Name_ Rage\n    - _Uses_ 2\n    - _Renew_ [week]",
+            "-   Hit Die   **[d7]**",
+            "- Hit Die _d8_ [9]",
+            "- Choose\n    - _Count_ [few]\n    - _Option_ A\n        - Language _A_",
+        ]:
+            lines = content.split("\n")
+            line = next(line for line in lines if "[" in line)
+            content = content.replace("[", "").replace("]", "")
+            _, errors = RuleParser().parse_rules(content)
+
+            assert len(errors) == 1, content
+            start, end = errors[0].span
+            assert errors[0].line == lines.index(line) + 1, content
+            assert (start, end) == (line.index("["), line.index("]") - 1), content
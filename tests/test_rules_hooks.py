@@ -0,0 +1,143 @@
+import io
+import json
+
+from your5e.rules import DirectiveExtract, RuleParser
+from your5e.rules.hooks import Counters, Hooks, TimingHistogram, TraceExporter
+
+RULES = """\
+# Languages
+
+- Language _Sylvan_
+
+- Choose _1_ Language
+    - _Option_ Elvish
+        - Language _Elvish_
+    - _Option_ Dwarvish
+        - Language _Dwarvish_
+
+- Unknown Directive
+- Hit Die
+"""
+
+
+class Recorder(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def on_block_start(self, line, lines):
+        self.events.append(("block", line, lines[0]))
+
+    def on_directive(self, line, directive):
+        self.events.append(("directive", line, directive.DIRECTIVE_NAME))
+
+    def on_error(self, error):
+        self.events.append(("error", error["line"], error["code"]))
+
+    def on_file_done(self, file, directives, errors):
+        self.events.append(("done", file, len(directives), len(errors)))
+
+
+EVENTS = [
+    ("block", 3, "- Language _Sylvan_"),
+    ("directive", 3, "Language"),
+    ("block", 5, "- Choose _1_ Language"),
+    ("directive", 5, "Choose"),
+    ("block", 11, "- Unknown Directive"),
+    ("error", 11, "unknown-directive"),
+    ("block", 12, "- Hit Die"),
+    ("error", 12, "missing-argument"),
+    ("done", None, 2, 2),
+]
+
+
+class TestHooks:
+    def test_events_in_order(self):
+        recorder = Recorder()
+        result = RuleParser(hooks=[recorder]).parse_rules(RULES)
+        assert result == RuleParser().parse_rules(RULES)
+        assert recorder.events == EVENTS
+
+    def test_events_when_stopping_at_errors(self):
+        recorder = Recorder()
+        RuleParser(hooks=[recorder]).parse_rules(RULES, max_errors=1, file="a.md")
+        assert recorder.events == EVENTS[:6] + [("done", "a.md", 2, 1)]
+
+    def test_events_from_a_stream(self):
+        recorder = Recorder()
+        stream = io.StringIO(RULES)
+        list(RuleParser(hooks=[recorder]).iter_rules(stream, file="a.md"))
+        assert recorder.events == EVENTS[:-1] + [("done", "a.md", 0, 0)]
+
+    def test_extract(self):
+        recorder = Recorder()
+        DirectiveExtract(hooks=[recorder]).extract(RULES, "a.md")
+        assert recorder.events == [
+            event for event in EVENTS[:-1] if event[0] == "block"
+        ] + [("done", "a.md", 0, 0)]
+
+    def test_counters(self):
+        counters = Counters()
+        parser = RuleParser(hooks=[counters])
+        parser.parse_rules(RULES)
+        parser.parse_rules(RULES)
+        assert counters.files == 2
+        assert counters.blocks == 8
+        assert counters.directives == {"Language": 2, "Choose": 2}
+        assert counters.errors == {"unknown-directive": 2, "missing-argument": 2}
+
+    def test_timing_histogram(self):
+        histogram = TimingHistogram()
+        RuleParser(hooks=[histogram]).parse_rules(RULES)
+        assert {name: sum(b.values()) for name, b in histogram.buckets.items()} == {
+            "Language": 1,
+            "Choose": 1,
+            "invalid": 2,
+        }
+        output = io.StringIO()
+        histogram.write(output)
+        assert output.getvalue().startswith("Choose\n  <= ")
+
+
+class TestTraceExporter:
+    def trace(self):
+        trace = TraceExporter()
+        parser = RuleParser(hooks=[trace])
+        parser.parse_rules(RULES, file="a.md")
+        parser.parse_rules(RULES, file="b.md")
+        return trace
+
+    def test_chrome_trace(self):
+        output = io.StringIO()
+        self.trace().write(output)
+        events = json.loads(output.getvalue())["traceEvents"]
+
+        assert [(e["name"], e["cat"]) for e in events[:5]] == [
+            ("Language", "block"),
+            ("Choose", "block"),
+            ("invalid", "block"),
+            ("invalid", "block"),
+            ("a.md", "file"),
+        ]
+        assert events[3]["args"] == {"line": 12, "errors": ["missing-argument"]}
+        assert events[4]["args"] == {"directives": 2, "errors": 2}
+        for event in events[:4]:
+            assert events[4]["ts"] <= event["ts"]
+            assert event["ts"] + event["dur"] <= events[4]["ts"] + events[4]["dur"]
+
+    def test_speedscope(self):
+        output = io.StringIO()
+        self.trace().write(output, format="speedscope")
+        document = json.loads(output.getvalue())
+
+        frames = [frame["name"] for frame in document["shared"]["frames"]]
+        assert frames == ["a.md", "Language", "Choose", "invalid", "b.md"]
+        events = document["profiles"][0]["events"]
+        # each file opens around its blocks, which are not nested
+        assert [(e["type"], frames[e["frame"]]) for e in events[:4]] == [
+            ("O", "a.md"),
+            ("O", "Language"),
+            ("C", "Language"),
+            ("O", "Choose"),
+        ]
+        assert [e["at"] for e in events] == sorted(e["at"] for e in events)
+        assert len(events) == 20
@@ -0,0 +1,147 @@
+import random
+import textwrap
+
+import pytest
+
+from your5e.rules import RuleParser
+from your5e.rules.directives import DirectivePool
+from your5e.rules.incremental import IncrementalParser
+from .utils import into_dicts
+
+
+CONTENT = textwrap.dedent(
+    """\
+    # Fighter
+
+    - Hit Die _d10_
+    - Language _Common_
+
+    ## Equipment
+    - Choose _1_
+        - _Option_ chain mail
+            - Inventory _add_ Chain Mail
+        - _Option_ leather armor
+            - Inventory _add_ Leather Armor
+    - Hit Die
+        - _die_ d8
+        - _id_ hitdie_13
+    - Hit Die _d7_
+    """
+)
+
+
+def full_parse(content):
+    result, errors = RuleParser().parse_rules(content)
+    return into_dicts(result), errors
+
+
+def check(parser, results):
+    result, errors = results
+    assert (into_dicts(result), errors) == full_parse(parser.content)
+
+
+class TestIncrementalParser:
+    def test_parse_matches_full_parse(self):
+        parser = IncrementalParser()
+        check(parser, parser.parse(CONTENT))
+        assert parser.content == CONTENT
+
+    def test_edit_inside_a_section(self):
+        parser = IncrementalParser()
+        parser.parse(CONTENT)
+
+        result, errors = parser.edit(2, 3, "- Hit Die _d12_\n")
+        check(parser, (result, errors))
+        assert result[0].die == 12
+
+    def test_lines_after_an_edit_are_moved(self):
+        parser = IncrementalParser()
+        before, _ = parser.parse(CONTENT)
+        choose = before[2]
+
+        result, errors = parser.edit(1, 1, "\n\n")
+        check(parser, (result, errors))
+        # untouched sections keep their directives, with new ids
+        assert result[2] is choose
+        assert [directive.id for directive in result] == [
+            "hitdie_5",
+            "language_6",
+            "choose_9",
+            "hitdie_13",
+        ]
+        assert errors == [{"line": 17, "text": 'Die "d7" is not a standard die.'}]
+
+    def test_edits_with_a_pool(self):
+        # the nested Language counts lines from its option, so has the
+        # same id as (and is shared with) the Language above it
+        content = textwrap.dedent(
+            """\
+            # Intro
+
+            # Languages
+            - Language _Common_
+            - Choose _1_
+                - _Option_ common
+                    - Language _Elvish_
+                    - Language _Dwarvish_
+                    - Language _Giant_
+                    - Language _Common_
+            """
+        )
+        pool = DirectivePool()
+        parser = IncrementalParser(RuleParser(pool=pool))
+        before, _ = parser.parse(content)
+        nested = before[1].options[0].directives[3]
+        assert nested is before[0]
+
+        result, errors = parser.edit(1, 1, "Some text.\n")
+        assert (into_dicts(result), errors) == full_parse(parser.content)
+        assert result[0].id == "language_5"
+        assert result[1].options[0].directives[3].id == "language_4"
+        assert result[0] is pool.share(result[0])
+
+    def test_adding_and_removing_headings(self):
+        parser = IncrementalParser()
+        parser.parse(CONTENT)
+
+        # a heading in the middle of the list splits it into two sections
+        check(parser, parser.edit(3, 3, "# Language\n"))
+        # text under the heading means no directives until the next heading
+        check(parser, parser.edit(4, 4, "Fighters speak Common.\n"))
+        # removing the headings joins the sections again
+        check(parser, parser.edit(3, 5, ""))
+        check(parser, parser.edit(5, 6, "- Break\n"))
+        assert parser.content == CONTENT.replace("## Equipment", "- Break")
+
+    def test_removing_everything(self):
+        parser = IncrementalParser()
+        parser.parse(CONTENT)
+
+        assert parser.edit(0, len(parser), "") == ([], [])
+        assert parser.content == ""
+        check(parser, parser.edit(0, 0, "- Hit Die _d10_"))
+
+    def test_edit_outside_document(self):
+        parser = IncrementalParser()
+        parser.parse(CONTENT)
+
+        with pytest.raises(ValueError):
+            parser.edit(3, 2, "")
+        with pytest.raises(ValueError):
+            parser.edit(0, len(parser) + 1, "")
+
+    def test_random_edits_match_full_parse(self):
+        with open("tests/rules/example.md", "r") as f:
+            content = f.read()
+        pieces = CONTENT.split("\n") + ["Some text.", "    ## Heading", "- Break"]
+        shuffle = random.Random(5)
+
+        parser = IncrementalParser()
+        parser.parse(content)
+        for _ in range(200):
+            start = shuffle.randint(0, len(parser))
+            end = shuffle.randint(start, min(start + 3, len(parser)))
+            text = "".join(
+                f"{shuffle.choice(pieces)}\n" for _ in range(shuffle.randint(0, 3))
+            )
+            check(parser, parser.edit(start, end, text))
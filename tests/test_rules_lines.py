@@ -0,0 +1,92 @@
+import textwrap
+
+from your5e.rules.lines import (
+    ARGUMENT,
+    BLANK,
+    BREAK,
+    COMMENT,
+    DIRECTIVE,
+    HEADING,
+    TEXT,
+    LineIndex,
+    classify,
+    nested,
+)
+
+
+class TestClassify:
+    def test_directive_lines(self):
+        assert classify("- Hit Die _d10_") == (DIRECTIVE, 0, "- Hit Die _d10_")
+        assert classify("- Comment not a directive") == (
+            COMMENT,
+            0,
+            "- Comment not a directive",
+        )
+        assert classify("- # also a comment") == (COMMENT, 0, "- # also a comment")
+        assert classify("- Break\n") == (BREAK, 0, "- Break")
+
+    def test_argument_lines(self):
+        assert classify("    - _die_ d10") == (ARGUMENT, 4, "- _die_ d10")
+        assert classify("  - comment ignored") == (COMMENT, 2, "- comment ignored")
+        assert classify("\t- # ignored") == (COMMENT, 1, "- # ignored")
+        # breaks only count as directives
+        assert classify("    - Break") == (ARGUMENT, 4, "- Break")
+
+    def test_other_lines(self):
+        assert classify("") == (BLANK, 0, "")
+        assert classify("    \n") == (BLANK, 0, "")
+        assert classify("# Fighter") == (HEADING, 0, "# Fighter")
+        assert classify("  ## Equipment") == (HEADING, 2, "## Equipment")
+        assert classify("Fighters get a d10.") == (TEXT, 0, "Fighters get a d10.")
+        assert classify("-not a list") == (TEXT, 0, "-not a list")
+        assert classify("- ") == (TEXT, 0, "-")
+
+
+class TestLineIndex:
+    def test_index(self):
+        content = textwrap.dedent(
+            """\
+            # Fighter
+
+            - Hit Die
+                - _die_ d10
+            Text.
+            """
+        )
+        lines = LineIndex.from_content(content)
+
+        assert len(lines) == 6
+        assert list(lines.kinds) == [HEADING, BLANK, DIRECTIVE, ARGUMENT, TEXT, BLANK]
+        assert list(lines.indents) == [0, 0, 0, 4, 0, 0]
+        assert lines.stripped[3] == "- _die_ d10"
+        assert lines[3] == "    - _die_ d10"
+        assert lines[2:4] == ["- Hit Die", "    - _die_ d10"]
+
+
+class TestNested:
+    def test_dedents_records(self):
+        lines = LineIndex(
+            [
+                "    - _Option_ a",
+                "        - Hit Die _d10_",
+                "    - comment on the option",
+                "    - Break",
+            ]
+        )
+        assert nested(list(lines.records())) == [
+            ("    - _Option_ a", DIRECTIVE, 0, "- _Option_ a"),
+            ("        - Hit Die _d10_", ARGUMENT, 4, "- Hit Die _d10_"),
+            ("    - comment on the option", COMMENT, 0, "- comment on the option"),
+            ("    - Break", BREAK, 0, "- Break"),
+        ]
+
+    def test_only_common_whitespace_is_removed(self):
+        lines = LineIndex(["  \t- Hit Die", "  \t  - _die_ d10", "    - Hit Die"])
+        records = nested(list(lines.records()))
+        assert [record[2] for record in records] == [1, 3, 2]
+        assert [record[1] for record in records] == [ARGUMENT, ARGUMENT, ARGUMENT]
+
+        # records already relative to an outer margin
+        inner = nested(nested(list(lines.records()))[:2])
+        assert [record[2] for record in inner] == [0, 2]
+        assert inner[0][1] == DIRECTIVE
@@ -0,0 +1,92 @@
+import io
+import pickle
+import time
+
+from your5e.rules import RuleParser
+from your5e.rules.incremental import IncrementalParser
+from your5e.rules.profile import Profile, ProfilingParser
+
+RULES = """
+- Hit Die _d8_
+
+- Language _Sylvan_
+
+- Choose _1_ Language
+    - _Option_ Elvish
+        - Language _Elvish_
+    - _Option_ Dwarvish
+        - Language _Dwarvish_
+
+- Unknown Directive
+"""
+
+
+class TestProfile:
+    def test_inner_phases_are_not_counted_twice(self):
+        profile = Profile()
+
+        def outer():
+            profile.timed("inner", time.sleep, 0.02)
+
+        profile.timed("outer", outer)
+        assert profile.phases["inner"][0] == 1
+        assert profile.phases["inner"][1] >= 0.02
+        assert profile.phases["outer"][1] < 0.02
+
+    def test_merge(self):
+        profile = Profile()
+        for _ in range(2):
+            other = Profile()
+            other.timed("scan", len, "")
+            other.timed("validate", len, "", directive="Hit Die", calls=3)
+            other.add_file("rules.md", 0.5, 0.25)
+            profile.merge(pickle.loads(pickle.dumps(other)))
+
+        assert profile.phases["scan"][0] == 2
+        assert profile.phases["validate"][0] == 6
+        assert profile.directives["Hit Die"][0] == 6
+        assert profile.files == [("rules.md", 0.5, 0.25)] * 2
+
+    def test_write(self):
+        profile = Profile()
+        profile.timed("validate", len, "", directive="Hit Die")
+        profile.add_file("fast.md", 0.1, 0.1)
+        profile.add_file("slow.md", 0.3, 0.2)
+        output = io.StringIO()
+        profile.write(output, slowest=1)
+
+        lines = output.getvalue().split("\n")
+        assert lines[1].startswith("validate ")
+        assert lines[4].startswith("Hit Die ")
+        assert lines[7].startswith("slow.md ")
+        assert lines[8].split() == ["2", "files", "0.4000", "0.3000"]
+
+
+class TestProfilingParser:
+    def test_same_results_as_rule_parser(self):
+        profile = Profile()
+        assert ProfilingParser(profile).parse_rules(RULES) == (
+            RuleParser().parse_rules(RULES)
+        )
+
+        assert list(profile.phases) == ["scan", "dispatch", "validate"]
+        # the blocks of the document and of the Choose's options
+        assert profile.phases["dispatch"][0] == 6
+        assert profile.phases["validate"][0] == 5
+        assert profile.directives["Hit Die"][0] == 1
+        assert profile.directives["Language"][0] == 3
+        assert profile.directives["Choose"][0] == 1
+
+    def test_finds_blocks_as_rule_parser(self):
+        lines = RULES.split("\n")
+        parser = ProfilingParser(Profile())
+        assert list(parser.directive_blocks(lines, 2)) == list(
+            RuleParser().directive_blocks(lines, 2)
+        )
+        assert parser.next_directive_block(lines, 4) == (
+            RuleParser().next_directive_block(lines, 4)
+        )
+
+    def test_incremental(self):
+        incremental = IncrementalParser(ProfilingParser(Profile()))
+        assert incremental.parse(RULES) == RuleParser().parse_rules(RULES)
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from your5e.rules.shorthand import SHORTHAND_FORMAT, split_shorthand
+
+
+def regex_split(text):
+    match = SHORTHAND_FORMAT.match(text)
+    if match is None:
+        return None
+    return match.group("directive"), match.group("key"), match.group("value")
+
+
+LONG = " and ".join(["Ornate silver longsword of the northern reaches"] * 3)
+
+
+class TestSplitShorthand:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("Hit Die", None),
+            ("Language _Sylvan_", ("Language", "Sylvan", None)),
+            (f"Inventory _add_ {LONG}", ("Inventory", "add", LONG)),
+            (f"Inventory *add* {LONG}", ("Inventory", "add", LONG)),
+            (f"Set __snake_case__ {LONG}", ("Set", "snake_case", LONG)),
+            (f"Choice _First Choice_{LONG}", ("Choice", "First Choice", None)),
+            (f"Set _a_ b_c_ {LONG}", ("Set", "a_ b_c", LONG)),
+            (f"Inventory _ add_ {LONG}", None),
+            ("Inventory _" + "word " * 40, None),
+        ],
+    )
+    def test_splits(self, text, expected):
+        assert split_shorthand(text) == expected == regex_split(text)
+
+    def test_exactly_as_the_regular_expression(self):
+        # lines made of the pieces that decide where a name or key ends
+        pieces = ["a", "Die", "é", "1", " ", "  ", "\t", "_", "__", "*", "**", "-"]
+        generator = random.Random(5)
+        for _ in range(20000):
+            text = "".join(
+                generator.choice(pieces) for _ in range(generator.randint(1, 40))
+            )
+            assert split_shorthand(text) == regex_split(text), repr(text)
@@ -0,0 +1,74 @@
+import pickle
+import textwrap
+
+import pytest
+
+from your5e.rules import RuleParser
+from your5e.rules.cache import ParseCache
+from your5e.rules.source import MappedFile, line_offsets, read_rules
+
+
+CONTENT = textwrap.dedent(
+    """\
+    # Fighter
+
+    - Hit Die _d10_
+    - Language _Dragonic_ 🐉
+    - Hit Die _d3_
+    """
+)
+
+
+def write(tmp_path, data):
+    path = tmp_path / "rules.md"
+    path.write_bytes(data)
+    return str(path)
+
+
+class TestMappedFile:
+    def test_lines_match_split(self, tmp_path):
+        lines = MappedFile(write(tmp_path, CONTENT.encode()))
+        assert list(lines) == CONTENT.split("\n")
+        assert len(lines) == len(CONTENT.split("\n"))
+        assert lines[3] == "- Language _Dragonic_ 🐉"
+        assert lines[-1] == ""
+        assert lines[1:3] == ["", "- Hit Die _d10_"]
+
+    def test_empty_file(self, tmp_path):
+        lines = MappedFile(write(tmp_path, b""))
+        assert list(lines) == [""]
+
+    def test_close(self, tmp_path):
+        lines = MappedFile(write(tmp_path, CONTENT.encode()))
+        lines.close()
+        assert lines.data.closed
+        # an empty file has no mapping to close
+        MappedFile(write(tmp_path, b"")).close()
+
+    def test_pickles_by_path(self, tmp_path):
+        lines = MappedFile(write(tmp_path, CONTENT.encode()))
+        assert list(pickle.loads(pickle.dumps(lines))) == list(lines)
+
+    def test_line_offsets(self):
+        assert list(line_offsets(b"a\n\nbc\n")) == [0, 2, 3, 6]
+
+
+class TestReadRules:
+    def test_parses_the_same_as_text(self, tmp_path):
+        content = read_rules(write(tmp_path, CONTENT.encode()))
+        assert isinstance(content, MappedFile)
+        assert RuleParser().parse_lines(content) == RuleParser().parse_rules(CONTENT)
+
+    def test_carriage_returns_are_read_as_text(self, tmp_path):
+        content = read_rules(write(tmp_path, CONTENT.replace("\n", "\r\n").encode()))
+        assert content == CONTENT
+
+    def test_invalid_text_raises_as_reading_would(self, tmp_path):
+        path = write(tmp_path, b"- Hit Die _d10_\n\xff\n")
+        with pytest.raises(UnicodeDecodeError):
+            read_rules(path)
+
+    def test_cache_key_matches_text(self, tmp_path):
+        cache = ParseCache(tmp_path / "cache")
+        content = read_rules(write(tmp_path, CONTENT.encode()))
+        assert cache.key(content) == cache.key(CONTENT)
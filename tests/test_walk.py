@@ -0,0 +1,81 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from your5e.walk import walk_rules
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for name in [
+        "a.md",
+        "a-b.md",
+        "B.md",
+        "a/z.md",
+        "a/notes.txt",
+        ".hidden/h.md",
+        "build/out.md",
+        "docs/intro.md",
+        "docs/drafts/draft.md",
+        "docs/secret.md",
+    ]:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("- Hit Die: d8\n")
+    return tmp_path
+
+
+def relative(files, root):
+    return [Path(file).relative_to(root).as_posix() for file in files]
+
+
+class TestWalkRules:
+    def test_same_order_as_sorted_rglob(self, tree):
+        (tree / "linked").symlink_to(tree / "docs")
+        expected = [str(path) for path in sorted(tree.rglob("*.md"))]
+        assert list(walk_rules(str(tree))) == expected
+
+    def test_paths_are_as_pathlib_gives_them(self, tree, monkeypatch):
+        monkeypatch.chdir(tree)
+        assert list(walk_rules(".", include=["*.txt"])) == ["a/notes.txt"]
+        assert list(walk_rules("./docs/", exclude=["drafts"])) == [
+            "docs/intro.md",
+            "docs/secret.md",
+        ]
+
+    def test_include_and_exclude(self, tree):
+        files = walk_rules(
+            str(tree), include=["*.md", "a/*.txt"], exclude=["build", "docs/s*"]
+        )
+        assert relative(files, tree) == [
+            ".hidden/h.md",
+            "B.md",
+            "a/notes.txt",
+            "a/z.md",
+            "a-b.md",
+            "a.md",
+            "docs/drafts/draft.md",
+            "docs/intro.md",
+        ]
+
+    def test_gitignore(self, tree):
+        subprocess.run(["git", "init", "-q", str(tree)], check=True)
+        (tree / ".gitignore").write_text("build/\n.*\n/a.md\n")
+        (tree / "docs" / ".gitignore").write_text("*\n!*/\n!intro.md\n")
+        (tree / ".git" / "info" / "exclude").write_text("B.md\n")
+
+        expected = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard", "*.md"],
+            cwd=tree,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        files = relative(walk_rules(str(tree), gitignore=True), tree)
+        assert sorted(files) == sorted(expected)
+        assert files == ["a/z.md", "a-b.md", "docs/intro.md"]
+
+        # .gitignore files above the directory walked still apply
+        files = walk_rules(str(tree / "docs"), gitignore=True)
+        assert relative(files, tree) == ["docs/intro.md"]
@@ -1,3 +1,25 @@
 # parser returns objects, tests compare the dict form
 def into_dicts(result):
     return [item.asdict() if hasattr(item, "asdict") else item for item in result]
+
+
+def new_and_new_many(cls, content):
+    # what new() and new_many() return for the blocks of content that are
+    # directives of `cls`, each given their own copy of the arguments
+    from your5e.rules import RuleParser
+    from your5e.rules.lines import LineIndex
+
+    parser = RuleParser()
+    records = []
+    for index, block in parser.scan_blocks(LineIndex.from_content(content).records()):
+        info, args, errors = parser.block_arguments(index + 1, block)
+        if info is not None and info["class"] is cls and not errors:
+            records.append((index + 1, args))
+
+    def copies():
+        return [
+            (line, {key: dict(arg) for key, arg in args.items()})
+            for line, args in records
+        ]
+
+    return [cls.new(line, args) for line, args in copies()], cls.new_many(copies())
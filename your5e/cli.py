@@ -1,34 +1,70 @@
 import argparse
+import importlib
 import sys
 from typing import List, Optional
 
-from .commands.check_rules import CheckRulesCommand
+# each command's module is only imported when that command is used, so that
+# starting (and showing help) does not pay for every command's imports
+COMMANDS = {
+    "check-rules": (
+        "check_rules:CheckRulesCommand",
+        "Check rules files for parsing errors",
+    ),
+    "compile-rules": (
+        "compile_rules:CompileRulesCommand",
+        "Compile checked rules files into a bundle that loads quickly",
+    ),
+    "daemon": (
+        "daemon:DaemonCommand",
+        "Keep parsed rules in memory to answer check-rules quickly",
+    ),
+    "lsp": (
+        "lsp:LspCommand",
+        "Run a language server for rules files over stdin/stdout",
+    ),
+}
 
 
-def create_parser() -> argparse.ArgumentParser:
+def load_command(name: str):
+    module_name, class_name = COMMANDS[name][0].split(":")
+    module = importlib.import_module(f".commands.{module_name}", __package__)
+    return getattr(module, class_name)
+
+
+def create_parser(command: Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    The command line parser, with the arguments of `command` (of every
+    command, when None) added.
+    """
     parser = argparse.ArgumentParser(
         prog="your5e", description="A D&D 5e rules parser and utility tool"
     )
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
-    CheckRulesCommand.add_parser(subparsers)
+    for name, (_, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        if command is None or name == command:
+            load_command(name).add_arguments(subparser)
 
     return parser
 
 
 def main(args: Optional[List[str]] = None) -> int:
-    parser = create_parser()
-
     if args is None:
         args = sys.argv[1:]
 
+    # the command is the first argument that is not an option, as the
+    # only options before it are for help
+    command = next((arg for arg in args if not arg.startswith("-")), "")
+    parser = create_parser(command)
+
     parsed_args = parser.parse_args(args)
     if not parsed_args.command:
         parser.print_help()
         return 1
 
-    if parsed_args.command == "check-rules":
-        return CheckRulesCommand.run(parsed_args)
+    if parsed_args.command in COMMANDS:
+        return load_command(parsed_args.command).run(parsed_args)
 
     print(f"Unknown command: {parsed_args.command}")
     return 1
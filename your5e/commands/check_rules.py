@@ -1,23 +1,40 @@
 import argparse
+import os
 import sys
+import time
+from collections import deque
+from functools import partial
+from itertools import chain, islice
 from pathlib import Path
 from pprint import pprint
+from typing import Optional
 
 from ..rules import RuleParser
+from ..rules.cache import ParseCache, default_cache_dir
+from ..rules.profile import Profile, ProfilingParser
+from ..rules.source import content_lines, read_rules
+from ..walk import DEFAULT_INCLUDE, walk_rules
+from .formats import REPORTS
+
+
+def file_signature(file):
+    # what changes when a file is written, or replaced by another
+    try:
+        stat = os.stat(file)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
 
 
 class CheckRulesCommand:
     @classmethod
-    def add_parser(cls, subparsers) -> argparse.ArgumentParser:
-        parser = subparsers.add_parser(
-            "check-rules",
-            help="Check rules files for parsing errors",
-        )
+    def add_arguments(cls, parser: argparse.ArgumentParser):
         parser.add_argument(
             "files",
             nargs="+",
             help="Rules files or directories to check",
         )
+        cls.add_walk_arguments(parser)
         parser.add_argument(
             "--verbose",
             action="store_true",
@@ -34,65 +51,496 @@ class CheckRulesCommand:
             action="store_true",
             help="Output the parsed rules structure for debugging",
         )
-        return parser
+        parser.add_argument(
+            "--format",
+            choices=["text", *REPORTS],
+            default="text",
+            help=(
+                "Output format: text for people, or JSON (ndjson, one record "
+                "per line as each file is checked) with timings and counts "
+                "for other programs; --verbose, --context and --debug only "
+                "apply to text (default: text)"
+            ),
+        )
+        parser.add_argument(
+            "--fail-fast",
+            action="store_true",
+            help="Stop checking at the first error",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            help="Stop checking after this many errors",
+        )
+        parser.add_argument(
+            "--jobs",
+            "-j",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of files to check in parallel (default: number of CPUs)",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Parse every file, ignoring previously cached results",
+        )
+        parser.add_argument(
+            "--cache-dir",
+            default=default_cache_dir(),
+            help="Where to cache parsed results (default: %(default)s)",
+        )
+        parser.add_argument(
+            "--watch",
+            action="store_true",
+            help="Keep checking files as they change, until interrupted",
+        )
+        parser.add_argument(
+            "--watch-interval",
+            type=float,
+            help=(
+                "Look for changes every this many seconds, rather than "
+                "being told of them (the default, where supported)"
+            ),
+        )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help=(
+                "Write to stderr where the time went, by phase of checking "
+                "and type of directive, and the slowest files (parses every "
+                "file, ignoring the cache and any daemon)"
+            ),
+        )
+        parser.add_argument(
+            "--no-daemon",
+            action="store_true",
+            help="Check the files here, even if a daemon is running",
+        )
+        parser.add_argument(
+            "--socket",
+            help="Unix socket of the daemon to ask (default: as for your5e daemon)",
+        )
+
+    @classmethod
+    def add_walk_arguments(cls, parser: argparse.ArgumentParser):
+        parser.add_argument(
+            "--include",
+            action="append",
+            metavar="GLOB",
+            help=(
+                "Check files in directories matching this pattern, of their "
+                "name or (with a /) their path in the directory; may be "
+                "given more than once (default: *.md)"
+            ),
+        )
+        parser.add_argument(
+            "--exclude",
+            action="append",
+            default=[],
+            metavar="GLOB",
+            help=(
+                "Skip files and directories matching this pattern, as for "
+                "--include; may be given more than once"
+            ),
+        )
+        parser.add_argument(
+            "--gitignore",
+            action="store_true",
+            help="Skip files and directories that git ignores",
+        )
 
     @classmethod
     def run(cls, args: argparse.Namespace) -> int:
-        exit_code = 0
+        if args.max_errors is not None and args.max_errors < 1:
+            print("Error: --max-errors must be at least 1")
+            return 1
 
         if args.files[0] == "-":
-            content = sys.stdin.read()
-            return cls.validate_content(
-                "<stdin>", content, args.verbose, args.context, args.debug
+            if args.format != "text":
+                return cls.check_stdin(args)
+            if args.context > 0:
+                # showing context around errors needs all of the content
+                content = sys.stdin.read()
+                return cls.validate_content(
+                    "<stdin>",
+                    content,
+                    args.verbose,
+                    args.context,
+                    args.debug,
+                    cls.error_budget(args),
+                )
+            return cls.validate_stream(
+                "<stdin>", sys.stdin, args.verbose, args.debug, cls.error_budget(args)
             )
 
-        found_files = []
-        for path_str in args.files:
+        if not (args.no_daemon or args.watch or args.profile):
+            from .daemon import forward_to_daemon
+
+            daemon_exit_code = forward_to_daemon(args)
+            if daemon_exit_code is not None:
+                return daemon_exit_code
+
+        # messages about missing files stay out of the JSON
+        found_files = cls.iter_files(
+            args.files,
+            output=sys.stdout if args.format == "text" else sys.stderr,
+            **cls.walk_options(args),
+        )
+        if args.watch:
+            found_files = list(found_files)
+        else:
+            # files are checked as they are found, while looking for more
+            first_file = next(found_files, None)
+            if first_file is None:
+                if args.format != "text":
+                    # still a document (or summary) for the reader to parse
+                    REPORTS[args.format]().finish()
+                return 1
+            found_files = chain([first_file], found_files)
+
+        exit_code = cls.check_files(args, found_files)
+        if args.watch:
+            return cls.watch(args, found_files)
+        return exit_code
+
+    @classmethod
+    def walk_options(cls, args) -> dict:
+        return {
+            "include": args.include or DEFAULT_INCLUDE,
+            "exclude": args.exclude,
+            "gitignore": args.gitignore,
+        }
+
+    @classmethod
+    def find_files(cls, paths, report_missing=True, output=None, **walk_options):
+        return list(cls.iter_files(paths, report_missing, output, **walk_options))
+
+    @classmethod
+    def iter_files(cls, paths, report_missing=True, output=None, **walk_options):
+        """
+        Yields the files given, and those in the directories given, as
+        they are found. Files given by name are never left out.
+
+        Paths that do not exist are reported before any file is yielded,
+        so the messages come before the results of checking any files.
+        """
+        existing = []
+        for path_str in paths:
             if path_str == "-":
                 # silently ignore if it appears after files
                 continue
 
             path = Path(path_str)
             if not path.exists():
-                print(f"Error: '{path_str}' not found")
+                if report_missing:
+                    print(f"Error: '{path_str}' not found", file=output)
                 continue
+            existing.append((path, path_str))
 
+        for path, path_str in existing:
             if path.is_file():
-                found_files.append(str(path))
+                yield str(path)
             elif path.is_dir():
-                md_files = list(path.rglob("*.md"))
-                found_files.extend(str(f) for f in sorted(md_files))
+                yield from walk_rules(path_str, **walk_options)
 
-        if not found_files:
+    @classmethod
+    def error_budget(cls, args) -> Optional[int]:
+        """How many errors to report before stopping, if not all of them."""
+        if args.fail_fast:
             return 1
+        return args.max_errors
 
-        for count, file in enumerate(found_files):
-            try:
-                with open(file, "r") as f:
-                    content = f.read()
-            except Exception as e:
-                print(f"Error reading file '{file}': {e}")
-                exit_code = 1
-                continue
+    @classmethod
+    def check_stdin(cls, args) -> int:
+        budget = cls.error_budget(args)
+        report = REPORTS[args.format]()
+        start = time.perf_counter()
+        result_objects, errors = RuleParser().parse_rules(sys.stdin.read(), budget)
+        errors = errors[:budget]
+        report.file("<stdin>", time.perf_counter() - start, result_objects, errors)
+        report.finish(stopped=budget is not None and len(errors) >= budget)
+        return 1 if errors else 0
 
-            file_exit_code = cls.validate_content(
-                file, content, args.verbose, args.context, args.debug
-            )
-            if file_exit_code != 0:
-                exit_code = file_exit_code
+    @classmethod
+    def check_files(cls, args, found_files, report_clean=False) -> int:
+        exit_code = 0
+        budget = cls.error_budget(args)
+        error_count = 0
+        stopped = False
+        text = args.format == "text"
+        report = None if text else REPORTS[args.format]()
+        profile = Profile() if args.profile else None
 
-            # space out between multiple files
-            if count < len(found_files) - 1 and file_exit_code != 0:
-                print()
+        # only the text reporting needs the content of the file, and then
+        # only to show context around any errors
+        parse_file = partial(
+            cls.parse_file_timed,
+            keep_content=text and args.context > 0,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            max_errors=budget,
+            profile=args.profile,
+        )
+
+        # files may still be being found, so look ahead only far enough
+        # to know whether there is more than one
+        files = iter(found_files)
+        first_files = list(islice(files, 2))
+        files = chain(first_files, files)
+
+        if args.jobs > 1 and len(first_files) > 1:
+            # only pay for importing multiprocessing when it is used
+            from concurrent.futures import ProcessPoolExecutor
 
+            jobs = args.jobs
+            if isinstance(found_files, list):
+                jobs = min(jobs, len(found_files))
+            executor = ProcessPoolExecutor(max_workers=jobs)
+            results = cls.ordered_results(executor, parse_file, files, jobs * 4)
+        else:
+            executor = None
+            results = ((file, parse_file(file)) for file in files)
+
+        # a file with errors is spaced out from whatever comes after it,
+        # which is not known until it comes
+        space_out = False
+        try:
+            for file, result in results:
+                if space_out:
+                    print()
+                    space_out = False
+
+                seconds, (content, result_objects, errors), file_profile = result
+                if profile:
+                    profile.merge(file_profile)
+                if isinstance(errors, Exception):
+                    exit_code = 1
+                    error_count += 1
+                    stopped = budget is not None and error_count >= budget
+                    if report:
+                        report.read_error(file, errors)
+                    else:
+                        print(f"Error reading file '{file}': {errors}")
+                        if stopped:
+                            print()
+                            print(f"Stopped after {error_count} errors.")
+                    if stopped:
+                        break
+                    continue
+
+                if budget is not None:
+                    errors = errors[: budget - error_count]
+                error_count += len(errors)
+                stopped = budget is not None and error_count >= budget
+
+                if report:
+                    cls.timed_report(
+                        profile,
+                        report.file,
+                        file,
+                        seconds,
+                        result_objects,
+                        errors,
+                    )
+                    if errors:
+                        exit_code = 1
+                    if stopped:
+                        break
+                    continue
+
+                file_exit_code = cls.timed_report(
+                    profile,
+                    cls.report,
+                    file,
+                    content,
+                    result_objects,
+                    errors,
+                    args.verbose,
+                    args.context,
+                    args.debug,
+                )
+                if file_exit_code != 0:
+                    exit_code = file_exit_code
+                elif report_clean and not (args.verbose or args.debug):
+                    print(f"{file}: 0 errors")
+
+                space_out = file_exit_code != 0
+
+                if stopped:
+                    print()
+                    print(f"Stopped after {error_count} errors.")
+                    break
+        finally:
+            if executor:
+                # files not yet started are not checked at all, once
+                # enough errors have been found
+                executor.shutdown(cancel_futures=True)
+
+        if report:
+            report.finish(stopped)
+        if profile:
+            profile.write(sys.stderr)
         return exit_code
 
+    @classmethod
+    def timed_report(cls, profile, report, *args):
+        if profile is None:
+            return report(*args)
+        return profile.timed("report", report, *args)
+
+    @classmethod
+    def ordered_results(cls, executor, parse_file, files, window):
+        """
+        Yields each of `files` with the result of parsing it in `executor`,
+        in the order the files come, as they come: no more than `window`
+        files are waiting to be parsed (or reported) at once.
+        """
+        pending = deque()
+        for file in files:
+            pending.append((file, executor.submit(parse_file, file)))
+            # report what is done without waiting on what is not
+            while pending and (len(pending) > window or pending[0][1].done()):
+                file, future = pending.popleft()
+                yield file, future.result()
+        while pending:
+            file, future = pending.popleft()
+            yield file, future.result()
+
+    @classmethod
+    def watch(cls, args, found_files) -> int:
+        """
+        Checks files again as they change, until interrupted, printing
+        only the results of the files that changed (or were added).
+        """
+        from ..watch import PollingWatcher, create_watcher
+
+        signatures = {file: file_signature(file) for file in found_files}
+        if args.watch_interval is not None:
+            watcher = PollingWatcher(args.files, args.watch_interval)
+        else:
+            watcher = create_watcher(args.files)
+
+        try:
+            while True:
+                sys.stdout.flush()
+                watcher.wait()
+
+                found_files = cls.find_files(
+                    args.files, report_missing=False, **cls.walk_options(args)
+                )
+                changed_files = []
+                new_signatures = {}
+                for file in found_files:
+                    new_signatures[file] = file_signature(file)
+                    if new_signatures[file] != signatures.get(file):
+                        changed_files.append(file)
+                signatures = new_signatures
+
+                if changed_files:
+                    if args.format == "text":
+                        print()
+                    cls.check_files(args, changed_files, report_clean=True)
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            watcher.close()
+
+    @classmethod
+    def parse_file_timed(cls, file, profile=False, **kwargs):
+        """
+        Parses `file`, returning how long that took, the result of
+        `parse_file`, and with `profile`, where the time went.
+        """
+        if not profile:
+            start = time.perf_counter()
+            result = cls.parse_file(file, **kwargs)
+            return time.perf_counter() - start, result, None
+
+        file_profile = Profile()
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        result = cls.parse_file(file, profile=file_profile, **kwargs)
+        seconds = time.perf_counter() - start
+        file_profile.add_file(file, seconds, time.process_time() - cpu_start)
+        return seconds, result, file_profile
+
+    @classmethod
+    def parse_file(
+        cls, file, keep_content=True, cache_dir=None, max_errors=None, profile=None
+    ):
+        try:
+            if profile:
+                content = profile.timed("read", read_rules, file)
+            else:
+                content = read_rules(file)
+        except Exception as e:
+            return None, None, e
+
+        if profile:
+            # the time of parsing is what is being measured, not the cache
+            parser = ProfilingParser(profile)
+            if isinstance(content, str):
+                result_objects, errors = parser.parse_rules(content, max_errors)
+            else:
+                result_objects, errors = parser.parse_lines(content, max_errors)
+        elif cache_dir:
+            result_objects, errors = ParseCache(cache_dir).parse_rules(
+                RuleParser(), content, max_errors
+            )
+        elif isinstance(content, str):
+            result_objects, errors = RuleParser().parse_rules(content, max_errors)
+        else:
+            result_objects, errors = RuleParser().parse_lines(content, max_errors)
+        if not keep_content or not errors:
+            content = None
+        return content, result_objects, errors
+
     @classmethod
     def validate_content(
-        cls, filename, content, verbose, lines_of_context, debug_output
+        cls, filename, content, verbose, lines_of_context, debug_output, max_errors=None
     ):
-        result_objects, errors = RuleParser().parse_rules(content)
+        result_objects, errors = RuleParser().parse_rules(content, max_errors)
+        return cls.report(
+            filename,
+            content,
+            result_objects,
+            errors[:max_errors],
+            verbose,
+            lines_of_context,
+            debug_output,
+        )
 
+    @classmethod
+    def validate_stream(cls, filename, stream, verbose, debug_output, max_errors=None):
+        result_objects = []
+        errors = []
+        for directive, block_errors in RuleParser().iter_rules(stream):
+            if directive is not None:
+                result_objects.append(directive)
+            errors.extend(block_errors)
+            if max_errors is not None and len(errors) >= max_errors:
+                break
+
+        return cls.report(
+            filename,
+            None,
+            result_objects,
+            sorted(errors, key=lambda e: e["line"])[:max_errors],
+            verbose,
+            0,
+            debug_output,
+        )
+
+    @classmethod
+    def report(
+        cls,
+        filename,
+        content,
+        result_objects,
+        errors,
+        verbose,
+        lines_of_context,
+        debug_output,
+    ):
         if debug_output:
             if result_objects:
                 debug_data = [directive.asdict() for directive in result_objects]
@@ -118,8 +566,9 @@ class CheckRulesCommand:
         if not errors:
             return 0
 
-        content_lines = content.split("\n")
-        lines = "", *content_lines
+        # read only the lines shown, which for a mapped file are decoded
+        # as they are needed
+        lines = content_lines(content)
         errors_grouped = []
         current_group = []
 
@@ -147,13 +596,14 @@ class CheckRulesCommand:
                 if lines_of_context > 0:
                     group_error_lines.add(line)
 
-            if content_lines and lines_of_context > 0:
+            if lines and lines_of_context > 0:
                 start_line = max(0, group[0]["line"] - lines_of_context)
-                end_line = min(len(lines) - 1, group[-1]["line"] + lines_of_context)
+                end_line = min(len(lines), group[-1]["line"] + lines_of_context)
 
                 for line in range(start_line, end_line + 1):
                     marker = ">" if line in group_error_lines else " "
-                    print(f"      {marker:2s} {line:4d}: {lines[line]}")
+                    text = lines[line - 1] if line > 0 else ""
+                    print(f"      {marker:2s} {line:4d}: {text}")
 
                 if count < len(errors_grouped) - 1:
                     print()
@@ -0,0 +1,82 @@
+import argparse
+
+from ..rules import RuleParser
+from ..rules.bundle import Bundle, located_directives
+from ..rules.source import read_rules
+from .check_rules import CheckRulesCommand
+
+
+class CompileRulesCommand:
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser):
+        parser.add_argument(
+            "files",
+            nargs="+",
+            help="Rules files or directories to compile",
+        )
+        CheckRulesCommand.add_walk_arguments(parser)
+        parser.add_argument(
+            "--output",
+            "-o",
+            required=True,
+            help="Where to write the bundle",
+        )
+        parser.add_argument(
+            "--context",
+            type=int,
+            default=0,
+            help="Number of lines of context to show around errors (default: 0)",
+        )
+
+    @classmethod
+    def run(cls, args: argparse.Namespace) -> int:
+        found_files = CheckRulesCommand.find_files(
+            args.files, **CheckRulesCommand.walk_options(args)
+        )
+        if not found_files:
+            return 1
+
+        # a bundle only holds rules that check cleanly, so every file
+        # is checked before deciding whether to write it
+        exit_code = 0
+        parser = RuleParser()
+        located = []
+        for file in found_files:
+            try:
+                content = read_rules(file)
+            except Exception as e:
+                print(f"Error reading file '{file}': {e}")
+                exit_code = 1
+                continue
+
+            file_located, errors = located_directives(parser, content)
+            if errors:
+                if exit_code:
+                    print()
+                CheckRulesCommand.report(
+                    file,
+                    content,
+                    [directive for _, directive in file_located],
+                    errors,
+                    False,
+                    args.context,
+                    False,
+                )
+                exit_code = 1
+            located.append(file_located)
+
+        if exit_code:
+            print(f"Not writing '{args.output}', as the rules have errors.")
+            return exit_code
+
+        bundle = Bundle.compile(found_files, located)
+        try:
+            bundle.write(args.output)
+        except OSError as e:
+            print(f"Error writing bundle '{args.output}': {e}")
+            return 1
+        print(
+            f"{args.output}: {len(bundle.directives)} directives "
+            f"from {len(found_files)} files"
+        )
+        return 0
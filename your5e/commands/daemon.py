@@ -0,0 +1,218 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+import tempfile
+from typing import Optional
+
+from .. import __version__
+from ..rules.cache import source_version
+from ..rules.source import MappedFile
+from .check_rules import CheckRulesCommand, file_signature
+
+
+def default_socket_path() -> str:
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = private_temp_dir()
+    return os.path.join(runtime_dir, "your5e.sock")
+
+
+def private_temp_dir() -> str:
+    """
+    A directory in the temp dir that only this user can use, as
+    XDG_RUNTIME_DIR would be. Anyone could have made it first (and put a
+    socket of their own in it), so unless it is a directory, not a link,
+    owned by this user and closed to everyone else, raises PermissionError.
+    """
+    path = os.path.join(tempfile.gettempdir(), f"your5e-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    else:
+        # whatever the umask took away
+        os.chmod(path, 0o700)
+
+    info = os.lstat(path)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or stat.S_IMODE(info.st_mode) != 0o700
+    ):
+        raise PermissionError(
+            f"'{path}' is not a directory only this user can use; "
+            "give --socket or set XDG_RUNTIME_DIR"
+        )
+    return path
+
+
+def daemon_version() -> str:
+    # the daemon only answers clients running exactly the same code
+    return f"{__version__}:{source_version()}"
+
+
+def forward_to_daemon(args: argparse.Namespace) -> Optional[int]:
+    """
+    Asks a running daemon to check the rules files, printing its output
+    and returning the exit code, or None if no daemon could do so.
+    """
+    request = {
+        "version": daemon_version(),
+        "cwd": os.getcwd(),
+        "args": vars(args),
+    }
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(1)
+            # no daemon is asked through a directory others could control
+            client.connect(args.socket or default_socket_path())
+            # checking many files cold can take a while
+            client.settimeout(None)
+            client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with client.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+    if "error" in response:
+        return None
+    sys.stderr.write(response.get("error_output", ""))
+    sys.stdout.write(response["output"])
+    sys.stdout.flush()
+    return response["exit_code"]
+
+
+class DaemonCheckRulesCommand(CheckRulesCommand):
+    """
+    check-rules as run by the daemon, keeping the results of each file in
+    memory for as long as the file is unchanged.
+    """
+
+    parsed = {}
+
+    @classmethod
+    def parse_file(cls, file, keep_content=True, cache_dir=None, max_errors=None):
+        signature = file_signature(file)
+        if signature is None:
+            return super().parse_file(file, keep_content, cache_dir, max_errors)
+
+        path = os.path.abspath(file)
+        cached = cls.parsed.get(path)
+        if cached is not None and cached[0] == signature:
+            content, result_objects, errors = cached[1]
+        else:
+            content, result_objects, errors = super().parse_file(
+                file, True, cache_dir, max_errors
+            )
+            if isinstance(content, MappedFile):
+                # kept as its lines rather than a mapping, which would hold
+                # the file open for as long as the daemon runs
+                lines = list(content)
+                content.close()
+                content = lines
+            # only whole results are kept, not those of a parse stopped early
+            if not isinstance(errors, Exception) and (
+                max_errors is None or len(errors) < max_errors
+            ):
+                cls.parsed[path] = (signature, (content, result_objects, errors))
+
+        if not keep_content:
+            content = None
+        return content, result_objects, errors
+
+
+class DaemonCommand:
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser):
+        parser.add_argument(
+            "--socket",
+            help=(
+                "Unix socket to listen on "
+                "(default: your5e.sock in $XDG_RUNTIME_DIR or a private temp dir)"
+            ),
+        )
+
+    @classmethod
+    def run(cls, args: argparse.Namespace) -> int:
+        try:
+            path = args.socket or default_socket_path()
+        except PermissionError as e:
+            print(f"Error: {e}")
+            return 1
+
+        # only one daemon per socket, but a socket left behind by
+        # a daemon that has gone away can be replaced
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(path)
+            except OSError:
+                pass
+            else:
+                print(f"Error: a daemon is already listening on '{path}'")
+                return 1
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+        # stopping the daemon still cleans up the socket
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        version = daemon_version()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(path)
+            server.listen()
+            print(f"Listening on '{path}'", flush=True)
+            try:
+                # requests are handled one at a time, as each changes
+                # into the client's working directory
+                while True:
+                    connection, _ = server.accept()
+                    with connection:
+                        cls.handle(connection, version)
+            except KeyboardInterrupt:
+                return 0
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+
+    @classmethod
+    def handle(cls, connection: socket.socket, version: str):
+        try:
+            with connection.makefile("rb") as f:
+                request = json.loads(f.readline())
+            if request.get("version") != version:
+                response = {"error": "The daemon is running a different your5e."}
+            else:
+                response = cls.check_rules(request)
+            connection.sendall(json.dumps(response).encode("utf-8") + b"\n")
+        except (OSError, ValueError):
+            # a client that went away, or did not send a request
+            pass
+
+    @classmethod
+    def check_rules(cls, request: dict) -> dict:
+        args = argparse.Namespace(**request["args"])
+        # changed files are parsed here, rather than in processes that
+        # would not keep what they parse
+        args.jobs = 1
+        args.no_daemon = True
+        output = io.StringIO()
+        error_output = io.StringIO()
+        try:
+            os.chdir(request["cwd"])
+            with contextlib.redirect_stdout(output):
+                with contextlib.redirect_stderr(error_output):
+                    exit_code = DaemonCheckRulesCommand.run(args)
+        except Exception as e:
+            return {"error": str(e)}
+        return {
+            "output": output.getvalue(),
+            "error_output": error_output.getvalue(),
+            "exit_code": exit_code,
+        }
@@ -0,0 +1,114 @@
+import json
+import sys
+import time
+from typing import Any, Dict, List
+
+
+def error_record(error) -> Dict[str, Any]:
+    record = {"line": error["line"], "code": error.get("code"), "text": error["text"]}
+    span = getattr(error, "span", None)
+    if span is not None:
+        record["span"] = list(span)
+    return record
+
+
+class Report:
+    """
+    check-rules results for other programs to read, written as each file
+    is checked rather than gathered up, so memory use does not grow with
+    the number of files.
+    """
+
+    def __init__(self, output=None):
+        self.output = output or sys.stdout
+        self.started = time.perf_counter()
+        self.files = 0
+        self.errors = 0
+        self.directives = 0
+        self.parse_seconds = 0.0
+
+    def write(self, text: str):
+        self.output.write(text)
+
+    def file(self, file: str, seconds: float, directives: List[Any], errors: List[Any]):
+        self.files += 1
+        self.errors += len(errors)
+        self.directives += len(directives)
+        self.parse_seconds += seconds
+        self.write_file(
+            {
+                "file": file,
+                "errors": [error_record(error) for error in errors],
+                "directives": len(directives),
+                "seconds": round(seconds, 6),
+            }
+        )
+        # each file is passed on as soon as it is done
+        self.output.flush()
+
+    def read_error(self, file: str, exception: Exception):
+        self.files += 1
+        self.errors += 1
+        self.write_file({"file": file, "error": str(exception)})
+        self.output.flush()
+
+    def summary(self, stopped: bool) -> Dict[str, Any]:
+        return {
+            "files": self.files,
+            "errors": self.errors,
+            "directives": self.directives,
+            "parse_seconds": round(self.parse_seconds, 6),
+            "seconds": round(time.perf_counter() - self.started, 6),
+            "stopped": stopped,
+        }
+
+    def write_file(self, record: Dict[str, Any]):
+        raise NotImplementedError
+
+    def finish(self, stopped: bool = False):
+        raise NotImplementedError
+
+
+class NdjsonReport(Report):
+    """
+    One JSON object per line: each error, then the file it was found in,
+    and a summary once every file is checked.
+    """
+
+    def write_file(self, record: Dict[str, Any]):
+        if "errors" in record:
+            errors = record["errors"]
+            for error in errors:
+                self.write(
+                    json.dumps({"type": "error", "file": record["file"], **error})
+                    + "\n"
+                )
+            record["errors"] = len(errors)
+        self.write(json.dumps({"type": "file", **record}) + "\n")
+
+    def finish(self, stopped: bool = False):
+        self.write(json.dumps({"type": "summary", **self.summary(stopped)}) + "\n")
+        self.output.flush()
+
+
+class JsonReport(Report):
+    """A single JSON document, of every file and a summary."""
+
+    def __init__(self, output=None):
+        super().__init__(output)
+        self.write('{"files": [')
+        self.separator = ""
+
+    def write_file(self, record: Dict[str, Any]):
+        self.write(self.separator + json.dumps(record))
+        self.separator = ", "
+
+    def finish(self, stopped: bool = False):
+        self.write(f'], "summary": {json.dumps(self.summary(stopped))}}}\n')
+        self.output.flush()
+
+
+REPORTS = {
+    "ndjson": NdjsonReport,
+    "json": JsonReport,
+}
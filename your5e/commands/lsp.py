@@ -0,0 +1,337 @@
+import argparse
+import json
+import os
+import select
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from ..rules.incremental import IncrementalParser
+
+# https://microsoft.github.io/language-server-protocol/specifications/lsp/3.17/
+TEXT_DOCUMENT_SYNC_INCREMENTAL = 2
+SEVERITY_ERROR = 1
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+
+
+class MessageReader:
+    """
+    Reads JSON-RPC messages (each a Content-Length header and a JSON body)
+    straight from a file descriptor, so that it can tell whether there is
+    more input waiting without blocking on it.
+    """
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.buffer = b""
+        self.eof = False
+
+    def fill(self) -> bool:
+        data = os.read(self.fd, 65536)
+        if not data:
+            self.eof = True
+            return False
+        self.buffer += data
+        return True
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Whether input arrived (or ended) within the timeout."""
+        if self.buffer or self.eof:
+            return True
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(readable)
+
+    def read(self) -> Optional[Any]:
+        """
+        Returns the next message, or None at the end of the input;
+        a body that is not JSON, or a header whose length is not a number,
+        is returned as the exception.
+        """
+        while b"\r\n\r\n" not in self.buffer:
+            if not self.fill():
+                return None
+        header, self.buffer = self.buffer.split(b"\r\n\r\n", 1)
+
+        length = 0
+        for line in header.decode("ascii", "replace").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                try:
+                    length = int(value)
+                except ValueError as e:
+                    return e
+
+        while len(self.buffer) < length:
+            if not self.fill():
+                return None
+        body, self.buffer = self.buffer[:length], self.buffer[length:]
+
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            return e
+
+
+def utf16_index(line: str, character: int) -> int:
+    """
+    Converts an LSP character offset (in UTF-16 code units) into an index
+    into the Python string.
+    """
+    if line.isascii():
+        return min(character, len(line))
+    units = 0
+    for index, char in enumerate(line):
+        if units >= character:
+            return index
+        units += 2 if ord(char) > 0xFFFF else 1
+    return len(line)
+
+
+def utf16_length(line: str) -> int:
+    if line.isascii():
+        return len(line)
+    return len(line.encode("utf-16-le")) // 2
+
+
+class Document:
+    """
+    An open document: its text is updated as each change arrives, but the
+    changed lines are only given to the parser when it is next validated.
+    """
+
+    def __init__(self, uri: str, text: str, version: Optional[int] = None):
+        self.uri = uri
+        self.version = version
+        self.lines = text.split("\n")
+        self.parser = IncrementalParser()
+        self.edits = []
+        self.reparse = True
+
+    def change(self, change: Dict[str, Any]):
+        if "range" not in change:
+            self.lines = change["text"].split("\n")
+            self.edits = []
+            self.reparse = True
+            return
+
+        start = self.position(change["range"]["start"])
+        end = self.position(change["range"]["end"])
+        prefix = self.lines[start[0]][: start[1]]
+        suffix = self.lines[end[0]][end[1] :]
+        new_lines = (prefix + change["text"] + suffix).split("\n")
+
+        self.lines[start[0] : end[0] + 1] = new_lines
+        if not self.reparse:
+            self.edits.append((start[0], end[0] + 1, "\n".join(new_lines) + "\n"))
+
+    def position(self, position: Dict[str, int]) -> tuple:
+        line = min(max(position["line"], 0), len(self.lines) - 1)
+        if position["line"] > line:
+            # past the end of the document is the end of its last line
+            return line, len(self.lines[line])
+        return line, utf16_index(self.lines[line], position["character"])
+
+    def validate(self) -> List[Dict[str, Any]]:
+        if self.reparse:
+            _, errors = self.parser.parse("\n".join(self.lines))
+            self.reparse = False
+        else:
+            errors = None
+            for edit in self.edits:
+                _, errors = self.parser.edit(*edit)
+            if errors is None:
+                _, errors = self.parser.results()
+        self.edits = []
+        return errors
+
+    def diagnostics(self) -> List[Dict[str, Any]]:
+        diagnostics = []
+        for error in self.validate():
+            # errors from inside some directives count from the directive
+            # rather than the document, so keep them within the document
+            line = min(max(error["line"], 1), len(self.lines)) - 1
+            text = self.lines[line]
+            start, end = 0, len(text)
+            span = getattr(error, "span", None)
+            if span and span[1] <= len(text):
+                start, end = span
+
+            diagnostic = {
+                "range": {
+                    "start": {"line": line, "character": utf16_length(text[:start])},
+                    "end": {"line": line, "character": utf16_length(text[:end])},
+                },
+                "severity": SEVERITY_ERROR,
+                "source": "your5e",
+                "message": error["text"],
+            }
+            # directives from plugins may still report errors as dicts
+            code = getattr(error, "code", None)
+            if code:
+                diagnostic["code"] = code
+            diagnostics.append(diagnostic)
+        return diagnostics
+
+
+class LanguageServer:
+    """
+    A language server for rules files, publishing their parse errors as
+    diagnostics. Changes to a document are only validated once there is
+    no more input waiting, and then no sooner than `debounce` seconds
+    after the last change, so a burst of changes is validated once.
+    """
+
+    def __init__(self, input_fd: int, output, debounce: float = 0.0):
+        self.reader = MessageReader(input_fd)
+        self.output = output
+        self.debounce = debounce
+        self.documents: Dict[str, Document] = {}
+        self.changed = set()
+        self.deadline = None
+        self.shutdown = False
+
+    def serve(self) -> int:
+        while True:
+            timeout = None
+            if self.changed:
+                timeout = max(self.deadline - time.monotonic(), 0)
+            if not self.reader.wait(timeout):
+                self.publish_changed()
+                continue
+
+            message = self.reader.read()
+            if message is None:
+                # the client went away without asking to exit
+                return 1
+            if isinstance(message, Exception):
+                self.respond(None, error=(PARSE_ERROR, str(message)))
+                continue
+            if not isinstance(message, dict):
+                self.respond(None, error=(INVALID_REQUEST, "Invalid request."))
+                continue
+            if message.get("method") == "exit":
+                return 0 if self.shutdown else 1
+            self.handle(message)
+
+    def handle(self, message: Dict[str, Any]):
+        method = message.get("method")
+        params = message.get("params") or {}
+        handler = getattr(self, "on_" + str(method).replace("/", "_"), None)
+
+        if "id" not in message:
+            # notifications the server does not understand are ignored,
+            # and one that fails (eg missing its params) leaves the
+            # server running, with nothing to reply to but the log
+            if handler:
+                try:
+                    handler(params)
+                except Exception as e:
+                    print(f"Error handling {method}: {e!r}", file=sys.stderr)
+            return
+
+        if handler is None:
+            self.respond(
+                message["id"], error=(METHOD_NOT_FOUND, f"Unknown method: {method}")
+            )
+            return
+        try:
+            result = handler(params)
+        except Exception as e:
+            self.respond(message["id"], error=(INTERNAL_ERROR, repr(e)))
+            return
+        self.respond(message["id"], result=result)
+
+    def respond(self, id, result=None, error=None):
+        message = {"jsonrpc": "2.0", "id": id}
+        if error:
+            code, text = error
+            message["error"] = {"code": code, "message": text}
+        else:
+            message["result"] = result
+        self.send(message)
+
+    def notify(self, method: str, params: Dict[str, Any]):
+        self.send({"jsonrpc": "2.0", "method": method, "params": params})
+
+    def send(self, message: Dict[str, Any]):
+        body = json.dumps(message).encode("utf-8")
+        self.output.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        self.output.flush()
+
+    def publish(self, document: Document):
+        self.notify(
+            "textDocument/publishDiagnostics",
+            {
+                "uri": document.uri,
+                "version": document.version,
+                "diagnostics": document.diagnostics(),
+            },
+        )
+
+    def publish_changed(self):
+        for uri in sorted(self.changed):
+            if uri in self.documents:
+                self.publish(self.documents[uri])
+        self.changed.clear()
+
+    def on_initialize(self, params):
+        return {
+            "capabilities": {
+                "textDocumentSync": {
+                    "openClose": True,
+                    "change": TEXT_DOCUMENT_SYNC_INCREMENTAL,
+                },
+            },
+            "serverInfo": {"name": "your5e"},
+        }
+
+    def on_shutdown(self, params):
+        self.shutdown = True
+        return None
+
+    def on_textDocument_didOpen(self, params):
+        item = params["textDocument"]
+        document = Document(item["uri"], item["text"], item.get("version"))
+        self.documents[document.uri] = document
+        self.changed.discard(document.uri)
+        self.publish(document)
+
+    def on_textDocument_didChange(self, params):
+        document = self.documents.get(params["textDocument"]["uri"])
+        if document is None:
+            return
+        document.version = params["textDocument"].get("version")
+        for change in params["contentChanges"]:
+            document.change(change)
+        self.changed.add(document.uri)
+        self.deadline = time.monotonic() + self.debounce
+
+    def on_textDocument_didClose(self, params):
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        self.changed.discard(uri)
+        self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+
+class LspCommand:
+    @classmethod
+    def add_arguments(cls, parser: argparse.ArgumentParser):
+        parser.add_argument(
+            "--debounce",
+            type=int,
+            default=0,
+            help=(
+                "Milliseconds to wait after a change before checking "
+                "the document again (default: 0)"
+            ),
+        )
+
+    @classmethod
+    def run(cls, args: argparse.Namespace) -> int:
+        server = LanguageServer(
+            sys.stdin.fileno(), sys.stdout.buffer, debounce=args.debounce / 1000
+        )
+        return server.serve()
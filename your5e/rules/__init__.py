@@ -1,8 +1,26 @@
-from typing import Dict, List, Any, Tuple
-import inspect
-import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Tuple
+
+from .directives import DIRECTIVES, DirectivePool
+from .errors import ParseError
+from .hooks import Hooks
+from .lines import (
+    ARGUMENT,
+    BLANK,
+    COMMENT,
+    BREAK,
+    DIRECTIVE,
+    HEADING,
+    TEXT,
+    LineIndex,
+    Record,
+    classify,
+    nested,
+)
+from .shorthand import SHORTHAND_FORMAT, split_shorthand  # noqa: F401
 
-from .directives import DIRECTIVES
+# how many blocks are parsed together, when validating directives in batches
+BATCH_BLOCKS = 64
 
 
 def extract_key_value(text: str):
@@ -23,18 +41,10 @@ def extract_key_value(text: str):
     return None
 
 
-SHORTHAND_FORMAT = re.compile(
-    r"""
-        ^
-        (?P<directive> \w+ (?: \s+ \w+ )* )
-        \s+
-        (?P<marker> \*\* | __ | [*_] )  # opening emphasis
-        (?P<key> \w+ (?: \s+ \w+ )* )
-        (?P=marker)                     # closing marker
-        (?: \s+ (?P<value> .+ ))?       # value (optional)
-    """,
-    re.VERBOSE,
-)
+def value_span(line: str, stripped: str, value: str) -> Tuple[int, int]:
+    # the columns of an argument's value, which ends its line
+    end = len(line) - len(line.lstrip()) + len(stripped)
+    return end - len(value), end
 
 
 class DirectivePosition:
@@ -59,158 +69,421 @@ class DirectivePosition:
 
         return True
 
-    def next_directive_block(
-        self, lines: List[str], index: int
-    ) -> Tuple[int, List[str]] | None:
-        while index < len(lines):
-            line = lines[index]
+    def directive_blocks(
+        self, lines: List[str] | LineIndex, index: int = 0
+    ) -> Iterator[Tuple[int, List[str]]]:
+        """
+        Yields each directive block from `index` onwards in a single forward
+        pass, as the line number of its first line and its raw lines.
+        """
+        if not isinstance(lines, LineIndex):
+            lines = LineIndex(lines)
+
+        for start_index, block in self.scan_blocks(
+            lines.records(index), index, self.allowed_at(lines, index)
+        ):
+            yield start_index, [record[0] for record in block]
+
+    def allowed_at(self, lines: LineIndex, index: int) -> bool:
+        # whether a directive could start at `index`, from what came before
+        for lookback in range(index - 1, -1, -1):
+            if lines.kinds[lookback] == HEADING:
+                return True
+            if lines.kinds[lookback] == TEXT:
+                return False
+        return True
 
-            if not line.startswith("- ") or not self.directive_position(lines, index):
-                index += 1
-                continue
+    def scan_blocks(
+        self, records: Iterable[Record], index: int = 0, allowed: bool = True
+    ) -> Iterator[Tuple[int, List[Record]]]:
+        """
+        Yields each directive block as the index of its first line and its
+        line records, from any iterable of records, including one being read
+        from a file as it goes.
+
+        Rather than looking backwards from every list item, whether a
+        directive is allowed is tracked as the lines go by: it is at the start
+        of the file and after a heading, it stays so through blank lines and
+        lists of directives, and any other text ends it.
+        """
+        block = None
+        block_start = index
+        skipping = False
+
+        for index, record in enumerate(records, index):
+            line, kind, indent, _ = record
+
+            if block is not None:
+                # block continues through indented arguments, and ends
+                # on blank lines, a new directive, or any other text
+                if indent and (kind == ARGUMENT or kind == COMMENT):
+                    block.append(record)
+                    continue
+                yield block_start, block
+                block = None
 
-            directive_name = line[2:].strip().lower()
-            if directive_name.startswith("comment") or directive_name.startswith("#"):
-                # ignored
-                index += 1
-                continue
-            if directive_name.startswith("break"):
-                # skips the rest of this section
-                while index < len(lines):
-                    if lines[index].strip().startswith("#"):
-                        break
-                    index += 1
+            if skipping:
+                # a break skips the rest of this section
+                if kind != HEADING:
+                    continue
+                skipping = False
+
+            if kind == HEADING:
+                allowed = True
+            elif kind == TEXT:
+                allowed = False
+                # the very first line is always a valid position,
+                # even for an otherwise empty list item
+                if index == 0 and line.startswith("- "):
+                    kind = DIRECTIVE
+
+            if indent or not (allowed or index == 0):
                 continue
 
-            start_index = index
-            index += 1
-
-            while index < len(lines):
-                line = lines[index]
-                stripped = line.strip()
-
-                if (
-                    # block ends on blank lines,
-                    stripped == ""
-                    # a new directive,
-                    or line.startswith("- ")
-                    # or any non-argument text
-                    or not stripped.startswith("- ")
-                ):
-                    break
+            if kind == BREAK:
+                skipping = True
+            elif kind == DIRECTIVE:
+                block_start = index
+                block = [record]
 
-                index += 1
+        if block is not None:
+            yield block_start, block
 
-            return (
-                start_index,
-                lines[start_index:index],
-            )
-
-        return None
+    def next_directive_block(
+        self, lines: List[str], index: int
+    ) -> Tuple[int, List[str]] | None:
+        return next(self.directive_blocks(lines, index), None)
 
 
 class RuleParser(DirectivePosition):
+    def __init__(
+        self, pool: Optional[DirectivePool] = None, hooks: Iterable[Hooks] = ()
+    ):
+        # when given a pool, identical directives share one instance
+        self.pool = pool
+        self.hooks = list(hooks)
+
     def parse_rules(
         self,
         content: str,
+        max_errors: Optional[int] = None,
+        file: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        if max_errors is not None:
+            # only the lines up to where parsing stops need classifying
+            return self.parse_lines(content.split("\n"), max_errors, file)
+        return self.parse_records(LineIndex.from_content(content).records(), file=file)
+
+    def parse_lines(
+        self,
+        lines: Iterable[str],
+        max_errors: Optional[int] = None,
+        file: Optional[str] = None,
     ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Parses content given as its lines (without their newlines), from
+        any iterable that yields them, such as a `MappedFile`, without
+        holding all of them at once.
+        """
+        return self.parse_records(
+            ((line, *classify(line)) for line in lines), max_errors, file
+        )
+
+    def parse_records(
+        self,
+        records: Iterable[Record],
+        max_errors: Optional[int] = None,
+        file: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Parses every directive block, or with `max_errors`, stops after
+        the block that brings the errors found to at least that many.
+        `file` is only passed on to any hooks, as the file parsed.
+        """
         result = []
         errors = []
-        lines = content.split("\n")
 
-        last_index = 0
-        while True:
-            block_info = self.next_directive_block(lines, last_index)
-            if block_info is None:
+        blocks = self.scan_blocks(records)
+        if self.hooks:
+            # watched block by block, so events come in the order of the
+            # blocks (checked once, so that without hooks nothing is added
+            # to parsing each block)
+            parsed = self.parse_hooked(blocks)
+        elif max_errors is None and self.batchable():
+            # directives of a type are validated together, but not when
+            # stopping at an error limit, which is decided block by block
+            parsed = (
+                parsed_block
+                for batch in iter(lambda: list(islice(blocks, BATCH_BLOCKS)), [])
+                for parsed_block in self.parse_batch(batch)
+            )
+        else:
+            parsed = (self.parse_block(index + 1, block) for index, block in blocks)
+
+        for directive_obj, block_errors in parsed:
+            if directive_obj is not None:
+                result.append(directive_obj)
+            errors.extend(block_errors)
+            if max_errors is not None and len(errors) >= max_errors:
                 break
 
-            index, block_lines = block_info
-            last_index = index + len(block_lines)
-            directive = block_lines[0][2:].strip()
-            parse_error = False
+        errors.sort(key=lambda e: e["line"])
+        if self.hooks:
+            self.file_done(file, result, errors)
+        return result, errors
+
+    def parse_hooked(
+        self, blocks: Iterable[Tuple[int, List[Record]]]
+    ) -> Iterator[Tuple[Any, List[Dict[str, Any]]]]:
+        hooks = self.hooks
+        for index, block in blocks:
             line_number = index + 1
+            lines = [record[0] for record in block]
+            for hook in hooks:
+                hook.on_block_start(line_number, lines)
+
+            directive_obj, errors = self.parse_block(line_number, block)
+            for error in errors:
+                for hook in hooks:
+                    hook.on_error(error)
+            if directive_obj is not None:
+                for hook in hooks:
+                    hook.on_directive(line_number, directive_obj)
+            yield directive_obj, errors
+
+    def file_done(self, file, directives, errors):
+        for hook in self.hooks:
+            hook.on_file_done(file, directives, errors)
+
+    def parse_nested(
+        self,
+        records: List[Record],
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Parses the lines nested inside a directive (eg the directives of a
+        Choose option) as a document of their own, with line numbers and
+        generated ids counting from its first line.
+        """
+        result = []
+        errors = []
+
+        for index, block in self.scan_blocks(nested(records)):
+            directive_obj, block_errors = self.parse_block(index + 1, block)
+            if directive_obj is not None:
+                result.append(directive_obj)
+            errors.extend(block_errors)
+
+        return result, sorted(errors, key=lambda e: e["line"])
 
-            shorthand_match = SHORTHAND_FORMAT.match(directive)
-            if shorthand_match:
-                directive = shorthand_match.group("directive")
-                key = shorthand_match.group("key")
-                value = shorthand_match.group("value") or ""
-
-            directive_info = DIRECTIVES.get(directive.lower())
-            if not directive_info:
-                errors.append(
-                    {
-                        "line": line_number,
-                        "text": f"Unknown directive: {directive}",
-                    }
+    def iter_rules(
+        self,
+        stream: Iterable[str],
+        file: Optional[str] = None,
+    ) -> Iterator[Tuple[Any, List[Dict[str, Any]]]]:
+        """
+        Reads lines from a file handle (or any iterable of lines) and yields
+        the directive (or None) and errors from each block as it completes,
+        so only one block at a time is held in memory.
+
+        Errors are sorted within each block, not across the whole file.
+        Hooks are told the file is done once every block has been read,
+        without the directives and errors, which are not kept.
+        """
+        records = (
+            (line, *classify(line)) for line in (line.rstrip("\n") for line in stream)
+        )
+        blocks = self.scan_blocks(records)
+        if self.hooks:
+            parsed = self.parse_hooked(blocks)
+        else:
+            parsed = (self.parse_block(index + 1, block) for index, block in blocks)
+        for directive_obj, block_errors in parsed:
+            yield directive_obj, sorted(block_errors, key=lambda e: e["line"])
+        if self.hooks:
+            self.file_done(file, [], [])
+
+    def parse_block(
+        self,
+        line_number: int,
+        block: List[Record],
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        directive_info, args, errors = self.block_arguments(line_number, block)
+        if directive_info is None:
+            return None, errors
+        return self.block_result(
+            self.validate(directive_info, line_number, args, block), errors
+        )
+
+    def batchable(self) -> bool:
+        # a subclass that parses or validates blocks its own way (eg to
+        # time them) would be bypassed by parse_batch
+        cls = type(self)
+        return (
+            cls.parse_block is RuleParser.parse_block
+            and cls.validate is RuleParser.validate
+        )
+
+    def parse_batch(
+        self,
+        blocks: List[Tuple[int, List[Record]]],
+    ) -> List[Tuple[Any, List[Dict[str, Any]]]]:
+        """
+        Parses blocks (as yielded by `scan_blocks`) as `parse_block` does,
+        but with the directives of each type validated together by their
+        class's `new_many`, returning the result of each block in order.
+        """
+        results = [None] * len(blocks)
+        groups = {}
+
+        for position, (index, block) in enumerate(blocks):
+            line_number = index + 1
+            directive_info, args, errors = self.block_arguments(line_number, block)
+            if directive_info is None:
+                results[position] = (None, errors)
+                continue
+            if directive_info["wants_content"]:
+                results[position] = self.block_result(
+                    self.validate(directive_info, line_number, args, block), errors
                 )
                 continue
 
             directive_class = directive_info["class"]
+            if directive_class not in groups:
+                groups[directive_class] = ([], [])
+            positions, records = groups[directive_class]
+            positions.append(position)
+            records.append((line_number, args))
+            # the errors found so far, until the directive is validated
+            results[position] = errors
+
+        for directive_class, (positions, records) in groups.items():
+            for position, validated in zip(
+                positions, directive_class.new_many(records)
+            ):
+                results[position] = self.block_result(validated, results[position])
+        return results
+
+    def block_result(
+        self,
+        validated: Tuple[Any, List[Dict[str, Any]]],
+        errors: List[Dict[str, Any]],
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        # a block with errors in its arguments is no directive, even when
+        # what arguments it has are valid
+        directive_obj, invalid = validated
+        if errors or invalid:
+            errors.extend(invalid)
+            return None, errors
+        if self.pool is not None:
+            directive_obj = self.pool.share(directive_obj)
+        return directive_obj, errors
+
+    def block_arguments(
+        self,
+        line_number: int,
+        block: List[Record],
+    ) -> Tuple[Optional[dict], Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Works out which directive a block is, and its arguments, returning
+        the directive's registry entry (None if the block is not a known
+        directive), the arguments and any errors in them.
+        """
+        errors = []
+        directive = block[0][3][2:].lstrip()
 
-            # check for a directive that supports nested directives (eg Choose)
-            sig = inspect.signature(directive_class.new)
-            wants_content = "raw_lines" in sig.parameters
-
-            args = {}
-            if shorthand_match:
-                # shorthand is formatted key/value, but the key might not be
-                # "key" and value might not be "value"" (eg Resource fills in
-                # the "name" and "uses" keys for its shorthand)
-                shorthand_key = getattr(directive_info["class"], "SHORTHAND_KEY", "key")
-                shorthand_value = getattr(
-                    directive_info["class"], "SHORTHAND_VALUE", "value"
-                )
+        shorthand = split_shorthand(directive)
+        if shorthand:
+            directive, key, value = shorthand
 
-                args = {shorthand_key: {"value": key, "line": line_number}}
-                if value:
-                    args[shorthand_value] = {"value": value, "line": line_number}
+        # the column of the name, after the "- " and any spaces
+        line = block[0][0]
+        start = len(line) - len(line.lstrip()) + 2
+        start += len(line[start:]) - len(line[start:].lstrip())
 
-            if wants_content:
-                directive_obj, invalid = directive_class.new(
-                    line_number, args, raw_lines=block_lines
-                )
-            else:
-                if shorthand_match and len(block_lines) > 1:
-                    if any(
-                        line
-                        and not line.startswith("- #")
-                        and not line.lower().startswith("- comment")
-                        for line in (line.strip() for line in block_lines[1:])
-                    ):
-                        errors.append(
-                            {
-                                "line": line_number,
-                                "text": "No arguments when using shorthand notation.",
-                            }
+        directive_info = DIRECTIVES.get(directive.lower())
+        if not directive_info:
+            return (
+                None,
+                {},
+                [
+                    ParseError(
+                        line_number,
+                        "unknown-directive",
+                        (directive,),
+                        (start, start + len(directive)),
+                    )
+                ],
+            )
+
+        args = {}
+        if shorthand:
+            # shorthand is formatted key/value, but the key might not be
+            # "key" and value might not be "value"" (eg Resource fills in
+            # the "name" and "uses" keys for its shorthand)
+            shorthand_key = directive_info["shorthand_key"]
+            shorthand_value = directive_info["shorthand_value"]
+
+            # the key follows the name and its opening marker, and the value
+            # is the rest of the line
+            key_start = line.find(key, start + len(directive))
+            args = {
+                shorthand_key: {
+                    "value": key,
+                    "line": line_number,
+                    "span": (key_start, key_start + len(key)),
+                }
+            }
+            if value:
+                args[shorthand_value] = {
+                    "value": value,
+                    "line": line_number,
+                    "span": value_span(line, block[0][3], value),
+                }
+
+        if directive_info["wants_content"]:
+            # the rest of the block is the directive's to make sense of
+            return directive_info, args, errors
+
+        if shorthand and len(block) > 1:
+            if any(kind != COMMENT for _, kind, _, _ in block[1:]):
+                errors.append(ParseError(line_number, "shorthand-arguments"))
+        elif not shorthand:
+            for count, (line, _, _, stripped) in enumerate(block[1:], 1):
+                key_value_pair = extract_key_value(stripped)
+                if key_value_pair:
+                    key, value = key_value_pair
+                else:
+                    start = len(line) - len(line.lstrip())
+                    errors.append(
+                        ParseError(
+                            line_number + count,
+                            "argument-without-key",
+                            span=(start, start + len(stripped)),
                         )
-                        parse_error = True
-                elif not shorthand_match:
-                    for count, line in enumerate(block_lines[1:], 1):
-                        key_value_pair = extract_key_value(line.strip())
-                        if key_value_pair:
-                            key, value = key_value_pair
-                        else:
-                            errors.append(
-                                {
-                                    "line": line_number + count,
-                                    "text": "Argument has no key.",
-                                }
-                            )
-                            parse_error = True
-                            continue
-
-                        # last occurence wins
-                        args[key] = {"value": value, "line": line_number + count}
-
-                directive_obj, invalid = directive_class.new(line_number, args)
-
-            if parse_error or invalid:
-                errors.extend(invalid)
-            else:
-                result.append(directive_obj)
+                    )
+                    continue
 
-        return result, sorted(errors, key=lambda e: e["line"])
+                # last occurence wins
+                args[key] = {
+                    "value": value,
+                    "line": line_number + count,
+                    "span": value_span(line, stripped, value),
+                }
+
+        return directive_info, args, errors
+
+    def validate(
+        self,
+        directive_info: dict,
+        line_number: int,
+        args: Dict[str, Any],
+        block: List[Record],
+    ) -> Tuple[Any, List[Dict[str, Any]]]:
+        directive_class = directive_info["class"]
+        # check for a directive that supports nested directives (eg Choose)
+        if directive_info["wants_content"]:
+            return directive_class.new(line_number, args, block=block, parser=self)
+        return directive_class.new(line_number, args)
 
     def parse_rules_file(
         self,
@@ -218,36 +491,40 @@ class RuleParser(DirectivePosition):
     ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
         with open(file_path, "r") as f:
             content = f.read()
-        return self.parse_rules(content)
+        return self.parse_rules(content, file=file_path)
 
 
 class DirectiveExtract(DirectivePosition):
-    def extract(self, markdown_content: str) -> Tuple[str, str]:
-        lines = markdown_content.split("\n")
+    def __init__(self, hooks: Iterable[Hooks] = ()):
+        # only told of blocks starting, and files done, as nothing is parsed
+        self.hooks = list(hooks)
+
+    def extract(
+        self, markdown_content: str, file: Optional[str] = None
+    ) -> Tuple[str, str]:
+        lines = LineIndex.from_content(markdown_content)
+        kinds = lines.kinds
         markdown_lines = []
         directive_lines = []
         last_index = 0
+        section_start = 0
 
-        while True:
-            block_info = self.next_directive_block(lines, last_index)
-            if block_info is None:
-                break
-
-            index, block_lines = block_info
+        for index, block_lines in self.directive_blocks(lines):
+            for hook in self.hooks:
+                hook.on_block_start(index + 1, block_lines)
             directive_lines.extend(block_lines)
 
             # any blank lines between a header and the end of the
-            # directives are not to be copied
-            section_start = 0
-            for lookback in range(index, -1, -1):
-                if lines[lookback].strip().startswith("#"):
+            # directives are not to be copied; only the lines since the
+            # previous block can contain a newer header
+            for lookback in range(index, last_index - 1, -1):
+                if kinds[lookback] == HEADING:
                     section_start = lookback
                     break
             for copy in range(last_index, index):
-                line = lines[copy]
-                if section_start <= copy and line.strip() == "":
+                if section_start <= copy and kinds[copy] == BLANK:
                     continue
-                markdown_lines.append(line)
+                markdown_lines.append(lines[copy])
 
             last_index = index + len(block_lines)
 
@@ -262,9 +539,11 @@ class DirectiveExtract(DirectivePosition):
         if directives and not directives.endswith("\n"):
             directives += "\n"
 
+        for hook in self.hooks:
+            hook.on_file_done(file, [], [])
         return markdown, directives
 
     def extract_file(self, file_path: str) -> Tuple[str, str]:
         with open(file_path, "r") as f:
             content = f.read()
-        return self.extract(content)
+        return self.extract(content, file_path)
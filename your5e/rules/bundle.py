@@ -0,0 +1,220 @@
+import contextlib
+import hashlib
+import json
+import marshal
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import __version__
+from . import RuleParser
+from .cache import source_version
+from .directives import DIRECTIVES, Directive, DirectivePool
+from .lines import classify
+from .source import content_lines
+
+MAGIC = b"your5e-bundle\n"
+# changed whenever the layout of bundles changes
+FORMAT_VERSION = 1
+
+
+class BundleError(Exception):
+    pass
+
+
+class StaleBundleError(BundleError):
+    pass
+
+
+def content_hash(files: List[str], base: str = ".") -> str:
+    """
+    A hash of the names and content of rules files, with relative names
+    read from `base`; a missing file counts as different to any content.
+    """
+    digest = hashlib.sha256()
+    for file in files:
+        digest.update(file.encode("utf-8", "surrogateescape") + b"\0")
+        try:
+            with open(os.path.join(base, file), "rb") as f:
+                data = f.read()
+        except OSError:
+            digest.update(b"\1")
+            continue
+        digest.update(b"\0%d\0" % len(data))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def located_directives(
+    parser: RuleParser, content
+) -> Tuple[List[Tuple[int, Directive]], List[Dict[str, Any]]]:
+    """
+    Parses rules content as `RuleParser.parse_rules` does, with each
+    directive returned alongside the line it starts on.
+    """
+    located = []
+    errors = []
+    records = ((line, *classify(line)) for line in content_lines(content))
+
+    for index, block in parser.scan_blocks(records):
+        directive, block_errors = parser.parse_block(index + 1, block)
+        if directive is not None:
+            located.append((index + 1, directive))
+        errors.extend(block_errors)
+
+    return located, sorted(errors, key=lambda e: e["line"])
+
+
+class Bundle:
+    """
+    The validated directives of a set of rules files, in the order they
+    appear, with the file and line each came from in `locations`.
+
+    Bundles record the hash of the files they were compiled from, relative
+    to the directory they were compiled in, so that a bundle that no longer
+    matches those files can be detected (files added since are not).
+    """
+
+    def __init__(
+        self,
+        files: List[str],
+        directives: List[Directive],
+        locations: List[Tuple[str, int]],
+        content_hash: str,
+        base: str = ".",
+        parser_version: Optional[str] = None,
+    ):
+        self.files = files
+        self.directives = directives
+        self.locations = locations
+        self.content_hash = content_hash
+        self.base = base
+        self.parser_version = parser_version or bundle_parser_version()
+
+    @classmethod
+    def compile(cls, files: List[str], located: List[List[Tuple[int, Directive]]]):
+        """A bundle of the directives found in each of `files`."""
+        directives = []
+        locations = []
+        for file, file_located in zip(files, located):
+            for line, directive in file_located:
+                directives.append(directive)
+                locations.append((file, line))
+        return cls(
+            files, directives, locations, content_hash(files), os.path.abspath(".")
+        )
+
+    def is_stale(self) -> bool:
+        return (
+            self.parser_version != bundle_parser_version()
+            or content_hash(self.files, self.base) != self.content_hash
+        )
+
+    def header(self) -> dict:
+        return {
+            "format": FORMAT_VERSION,
+            "your5e": self.parser_version,
+            "marshal": marshal.version,
+            "content_hash": self.content_hash,
+            "base": self.base,
+            "files": self.files,
+        }
+
+    def write(self, path: str):
+        payload = {
+            "directives": [
+                (
+                    file_index,
+                    line,
+                    directive.DIRECTIVE_NAME.lower(),
+                    directive.bundle_fields(),
+                )
+                for directive, (file_index, line) in zip(
+                    self.directives, self.file_indexes()
+                )
+            ],
+        }
+        data = (
+            MAGIC
+            + json.dumps(self.header()).encode("utf-8")
+            + b"\n"
+            + marshal.dumps(payload, marshal.version)
+        )
+
+        # write then rename, so that a bundle being loaded is never
+        # partially written
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+
+    def file_indexes(self) -> List[Tuple[int, int]]:
+        indexes = {file: index for index, file in enumerate(self.files)}
+        return [(indexes[file], line) for file, line in self.locations]
+
+
+def bundle_parser_version() -> str:
+    # directives are recreated from their fields, so a bundle can only be
+    # loaded by the same directive classes that compiled it
+    return f"{__version__}:{source_version()}"
+
+
+def load_bundle(
+    path: str, check: bool = True, pool: Optional[DirectivePool] = None
+) -> Bundle:
+    """
+    Loads a bundle written by `Bundle.write`, recreating its directives
+    without parsing any rules, raising StaleBundleError when the rules it
+    was compiled from have changed (unless `check` is False). Identical
+    directives share one instance when given a pool.
+    """
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise BundleError(f"'{path}' is not a rules bundle.")
+        try:
+            header = json.loads(f.readline())
+        except ValueError:
+            raise BundleError(f"'{path}' has a corrupt header.")
+        try:
+            compatible = (
+                header["format"] == FORMAT_VERSION
+                and header["marshal"] == marshal.version
+            )
+            files = list(header["files"])
+            base = header["base"]
+            expected_hash = header["content_hash"]
+            parser_version = header["your5e"]
+        except (KeyError, TypeError):
+            raise BundleError(f"'{path}' has a corrupt header.")
+        if not compatible:
+            raise BundleError(f"'{path}' was written by an incompatible your5e.")
+        if check and parser_version != bundle_parser_version():
+            raise StaleBundleError(f"'{path}' was compiled by a different your5e.")
+        if check and content_hash(files, base) != expected_hash:
+            raise StaleBundleError(f"'{path}' is older than its rules files.")
+        try:
+            # much quicker than marshal.load, which reads a little at a time
+            payload = marshal.loads(f.read())
+        except (EOFError, ValueError, TypeError):
+            raise BundleError(f"'{path}' is corrupt.")
+
+    classes = {}
+    directives = []
+    locations = []
+    try:
+        for file_index, line, name, fields in payload["directives"]:
+            if name not in classes:
+                classes[name] = DIRECTIVES[name]["class"].from_bundle_fields
+            directive = classes[name](fields)
+            if pool is not None:
+                directive = pool.share(directive)
+            directives.append(directive)
+            locations.append((files[file_index], line))
+    except (KeyError, IndexError, TypeError, ValueError):
+        raise BundleError(f"'{path}' is corrupt.")
+
+    return Bundle(files, directives, locations, expected_hash, base, parser_version)
@@ -0,0 +1,95 @@
+import hashlib
+import os
+import pickle
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import __version__
+from .source import MappedFile
+
+
+def default_cache_dir() -> str:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "your5e", "parse")
+
+
+@lru_cache(maxsize=None)
+def source_version() -> str:
+    """
+    A hash of the parser and directive module sources, so that cached
+    results are not used after any of the code producing them changes.
+    """
+    digest = hashlib.sha256()
+    package = Path(__file__).parent
+    for source in sorted(package.rglob("*.py")):
+        digest.update(str(source.relative_to(package)).encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Results of `RuleParser.parse_rules` stored on disk, keyed by a hash
+    of the content, the your5e version and the parser sources.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or default_cache_dir())
+        self.version = f"{__version__}:{source_version()}"
+
+    def key(self, content) -> str:
+        digest = hashlib.sha256(self.version.encode())
+        digest.update(b"\0")
+        if isinstance(content, MappedFile):
+            # the same key as for the text, without decoding it
+            digest.update(content.data)
+        else:
+            digest.update(content.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.pickle"
+
+    def get(self, content: str) -> Optional[Tuple[List[Any], List[Dict[str, Any]]]]:
+        try:
+            with open(self.path(self.key(content)), "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # missing, unreadable or corrupt entries are all just a miss
+            return None
+
+    def set(self, content: str, result: Tuple[List[Any], List[Dict[str, Any]]]):
+        path = self.path(self.key(content))
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        except OSError:
+            # a cache that cannot be written to is not an error
+            return
+
+        # write then rename, so that concurrent readers never see
+        # a partially written entry
+        try:
+            with os.fdopen(handle, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except OSError:
+            os.unlink(temp_path)
+
+    def parse_rules(self, parser, content, max_errors: Optional[int] = None):
+        result = self.get(content)
+        if result is None:
+            if isinstance(content, MappedFile):
+                result = parser.parse_lines(content, max_errors)
+            elif max_errors is not None:
+                result = parser.parse_rules(content, max_errors)
+            else:
+                result = parser.parse_rules(content)
+            # a parse that may have stopped early is not the whole result
+            if max_errors is None or len(result[1]) < max_errors:
+                self.set(content, result)
+        return result
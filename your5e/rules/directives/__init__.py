@@ -1,12 +1,51 @@
 import importlib
 import inspect
 import pkgutil
-from dataclasses import asdict as dc_asdict
+from collections.abc import Mapping
 from dataclasses import dataclass
+from sys import intern
 from typing import Optional
 
-
-@dataclass
+UNIVERSAL_KEYS = frozenset({"id", "name", "comment"})
+
+# per-class details the parser needs, worked out once rather than
+# reflecting on the class every time a directive is created
+_metadata = {}
+
+
+def directive_metadata(cls) -> dict:
+    if cls not in _metadata:
+        _metadata[cls] = {
+            # directives that support nested directives (eg Choose)
+            # take the line records of their block and the parser
+            "wants_content": "block" in inspect.signature(cls.new).parameters,
+            "fields": tuple(
+                name
+                for name in inspect.signature(cls.__init__).parameters
+                if name != "self"
+            ),
+            "shorthand_key": getattr(cls, "SHORTHAND_KEY", "key"),
+            "shorthand_value": getattr(cls, "SHORTHAND_VALUE", "value"),
+            "universal_keys": UNIVERSAL_KEYS,
+            "interned_fields": getattr(cls, "INTERNED_FIELDS", ()),
+        }
+    return _metadata[cls]
+
+
+def validated(cls, records: list, valid: list) -> list:
+    """
+    What `new` returns for each (line, args) record, given which of them
+    `new_many` found valid: those are created together, and the others are
+    left to `new` to report their errors.
+    """
+    created = iter(cls.create_many([r for r, ok in zip(records, valid) if ok]))
+    return [
+        (next(created), []) if ok else cls.new(line, args)
+        for (line, args), ok in zip(records, valid)
+    ]
+
+
+@dataclass(slots=True)
 class Directive:
     id: str = ""
     name: Optional[str] = None
@@ -19,55 +58,90 @@ class Directive:
 
     @classmethod
     def create_object(cls, args_data: dict, line_number: int):
-        import inspect
-
-        universal_keys = {"id", "name", "comment"}
-        universal_args = {}
-        directive_args = {}
-
-        for key, arg in args_data.items():
-            value = arg["value"]
-            if key in universal_keys:
-                universal_args[key] = value
-            else:
-                directive_args[key] = value
-
-        if "id" not in universal_args:
-            universal_args["id"] = cls.generate_id(line_number)
+        return cls.create_many([(line_number, args_data)])[0]
 
-        sig = inspect.signature(cls.__init__)
-        kwargs = {}
-
-        for param_name in sig.parameters:
-            if param_name == "self":
-                continue
-            elif param_name in universal_args:
-                kwargs[param_name] = universal_args[param_name]
-            else:
-                kwargs[param_name] = directive_args.get(param_name)
+    @classmethod
+    def new_many(cls, records: list) -> list:
+        """
+        Validates the arguments of many directives of this class, given as
+        (line, args) records, returning what `new` would for each, in order.
+        Classes override this to check each argument of all of the records
+        at once, leaving `new` to report the errors of those that fail.
+        """
+        return [cls.new(line, args) for line, args in records]
 
-        return cls(**kwargs)
+    @classmethod
+    def create_many(cls, records: list) -> list:
+        """
+        Creates a directive from the arguments of each of many (line, args)
+        records, with the class's details looked up once for all of them.
+        """
+        metadata = directive_metadata(cls)
+        fields = metadata["fields"]
+        interned_fields = metadata["interned_fields"]
+
+        created = []
+        for line_number, args_data in records:
+            # every universal key is a field of every directive, and any
+            # other argument that is not a field is ignored
+            kwargs = {}
+            for field in fields:
+                arg = args_data.get(field)
+                kwargs[field] = None if arg is None else arg["value"]
+
+            if "id" not in args_data:
+                kwargs["id"] = cls.generate_id(line_number)
+
+            # values that repeat across many directives (ability names,
+            # proficiency types, languages...) are shared rather than each
+            # kept as its own slice of a line
+            for field in interned_fields:
+                value = kwargs[field]
+                if type(value) is str:
+                    kwargs[field] = intern(value)
+
+            created.append(cls(**kwargs))
+        return created
 
     def asdict(self) -> dict:
-        data = dc_asdict(self)
-        return self._transform_dict(data)
+        return self._transform_dict(self._fields_dict())
+
+    def _fields_dict(self) -> dict:
+        # field values are plain strings and numbers, so there is no need
+        # for the recursive deep copy made by dataclasses.asdict
+        return {
+            field: getattr(self, field)
+            for field in directive_metadata(self.__class__)["fields"]
+        }
 
     def _transform_dict(self, data: dict) -> dict:
         return data
 
+    def bundle_fields(self) -> dict:
+        """
+        The fields to store in a compiled rules bundle, untransformed so
+        that `from_bundle_fields` recreates exactly the same directive.
+        """
+        return self._fields_dict()
+
+    @classmethod
+    def from_bundle_fields(cls, data: dict):
+        return cls(**data)
+
     def __str__(self) -> str:
         return f"{self.DIRECTIVE_KEY} ..."
 
     def to_markdown(self) -> str:
         """Convert directive object back to Markdown format."""
         # Get directive-specific fields (excluding universal ones)
-        universal_keys = {"id", "name", "comment"}
+        metadata = directive_metadata(self.__class__)
+        universal_keys = metadata["universal_keys"]
         data = self.asdict()
         directive_fields = {k: v for k, v in data.items() if k not in universal_keys}
 
         # Check if we can use shorthand format
-        shorthand_key = getattr(self.__class__, "SHORTHAND_KEY", "key")
-        shorthand_value = getattr(self.__class__, "SHORTHAND_VALUE", "value")
+        shorthand_key = metadata["shorthand_key"]
+        shorthand_value = metadata["shorthand_value"]
 
         # Check all fields (both directive-specific and universal)
         all_fields = data.copy()
@@ -181,13 +255,44 @@ class Directive:
         return []
 
 
-# discover directive modules dynamically
-_available_classes = []
-DIRECTIVES = {}
-for importer, modname, ispkg in pkgutil.iter_modules(__path__, __name__ + "."):
-    if not ispkg:
-        try:
-            module = importlib.import_module(modname)
+# directive names, as written in rules files, and the class providing each,
+# so that a module is only imported once its directive is first used
+# (tests check this matches what discover_directives finds)
+MANIFEST = {
+    "ability score": "ability_score:AbilityScore",
+    "action": "action:Action",
+    "bonus action": "action:BonusAction",
+    "reaction": "action:Reaction",
+    "choice": "choice:Choice",
+    "choose": "choose:Choose",
+    "featureless": "featureless:Featureless",
+    "hit die": "hit_die:HitDie",
+    "inventory": "inventory:Inventory",
+    "language": "language:Language",
+    "proficiency": "proficiency:Proficiency",
+    "register": "register:Register",
+    "resource": "resource:Resource",
+    "set": "set:Set",
+}
+_manifest_classes = {
+    target.split(":")[1]: target.split(":")[0] for target in MANIFEST.values()
+}
+
+
+def discover_directives(package: str) -> dict:
+    """
+    Imports every module of a package, returning the directive classes
+    found in them keyed by their lowercased DIRECTIVE_NAME.
+    """
+    found = {}
+    for importer, modname, ispkg in pkgutil.iter_modules(
+        importlib.import_module(package).__path__, package + "."
+    ):
+        if not ispkg:
+            try:
+                module = importlib.import_module(modname)
+            except ImportError:
+                continue
             for name, obj in inspect.getmembers(module):
                 if (
                     inspect.isclass(obj)
@@ -195,18 +300,106 @@ for importer, modname, ispkg in pkgutil.iter_modules(__path__, __name__ + "."):
                     and hasattr(obj, "DIRECTIVE_KEY")
                     and obj != Directive
                 ):
-                    globals()[name] = obj
-                    _available_classes.append(name)
-                    DIRECTIVES[obj.DIRECTIVE_NAME.lower()] = {
-                        "class": obj,
-                        "key": obj.DIRECTIVE_KEY,
-                    }
-        except ImportError:
-            pass
+                    found[obj.DIRECTIVE_NAME.lower()] = obj
+    return found
+
+
+class DirectiveRegistry(Mapping):
+    """
+    The directives by lowercased name, importing the module of each from
+    the manifest only when it is first looked up.
+
+    Names not in the manifest fall back to importing every module of this
+    package and of any plugin packages, once, to look for the directive.
+    """
+
+    def __init__(self, manifest: dict):
+        self.manifest = manifest
+        self.entries = {}
+        self.plugin_packages = []
+        self.discovered = False
+
+    def register(self, cls):
+        self.entries[cls.DIRECTIVE_NAME.lower()] = {
+            "class": cls,
+            "key": cls.DIRECTIVE_KEY,
+            **directive_metadata(cls),
+        }
+
+    def add_plugin_package(self, package: str):
+        self.plugin_packages.append(package)
+        self.discovered = False
+
+    def discover(self):
+        for package in [__name__] + self.plugin_packages:
+            for name, cls in discover_directives(package).items():
+                if name not in self.manifest and name not in self.entries:
+                    self.register(cls)
+        self.discovered = True
+
+    def __getitem__(self, name: str) -> dict:
+        if name not in self.entries:
+            if name in self.manifest:
+                module_name, class_name = self.manifest[name].split(":")
+                module = importlib.import_module(f"{__name__}.{module_name}")
+                self.register(getattr(module, class_name))
+            elif not self.discovered:
+                self.discover()
+        return self.entries[name]
+
+    def __iter__(self):
+        if not self.discovered:
+            self.discover()
+        yield from self.manifest
+        yield from (name for name in self.entries if name not in self.manifest)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+DIRECTIVES = DirectiveRegistry(MANIFEST)
+
+
+class DirectivePool:
+    """
+    Identical directives, shared as a single instance: `share` returns
+    the instance already in the pool equal to the directive given, or adds
+    that directive to the pool.
+
+    Directives that hold others (eg Choose) are never shared. The instances
+    are shared by everything parsed with the pool, so must not be changed.
+    """
+
+    def __init__(self):
+        self.instances = {}
+
+    def share(self, directive: Directive) -> Directive:
+        cls = directive.__class__
+        metadata = directive_metadata(cls)
+        if metadata["wants_content"]:
+            return directive
+        key = (cls, *[getattr(directive, field) for field in metadata["fields"]])
+        try:
+            return self.instances.setdefault(key, directive)
+        except TypeError:
+            # a field with a value that cannot be compared this way
+            return directive
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+
+def __getattr__(name: str):
+    # directive classes are imported from their modules when first used
+    if name in _manifest_classes:
+        module = importlib.import_module(f"{__name__}.{_manifest_classes[name]}")
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = [
     "Directive",
     "DirectiveParseError",
     "DIRECTIVES",
-] + _available_classes
+    "DirectivePool",
+] + list(_manifest_classes)
@@ -2,7 +2,8 @@ from dataclasses import dataclass
 from typing import Optional
 import re
 
-from . import Directive
+from . import Directive, validated
+from ..errors import ParseError
 
 
 VALUE_FORMAT = re.compile(
@@ -36,13 +37,24 @@ OVERRIDE_FORMAT = re.compile(
     """,
     re.VERBOSE | re.IGNORECASE,
 )
+ABILITIES = frozenset(
+    {
+        "strength",
+        "dexterity",
+        "constitution",
+        "intelligence",
+        "wisdom",
+        "charisma",
+    }
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class AbilityScore(Directive):
     DIRECTIVE_NAME = "Ability Score"
     DIRECTIVE_KEY = "ability_score"
     SHORTHAND_KEY = "ability"
+    INTERNED_FIELDS = ("ability", "value")
 
     ability: str = ""
     value: Optional[str] = None
@@ -58,29 +70,15 @@ class AbilityScore(Directive):
     ) -> tuple[Optional["AbilityScore"], list]:
         # required arguments
         if "ability" not in args:
-            return None, [
-                {
-                    "line": line,
-                    "text": 'Required "ability" argument is missing.',
-                }
-            ]
+            return None, [ParseError(line, "missing-argument", ("ability",))]
 
         # valid ability?
         ability_value = args["ability"]["value"]
-        valid_abilities = {
-            "strength",
-            "dexterity",
-            "constitution",
-            "intelligence",
-            "wisdom",
-            "charisma",
-        }
-        if ability_value.lower() not in valid_abilities:
+        if ability_value.lower() not in ABILITIES:
             return None, [
-                {
-                    "line": args["ability"]["line"],
-                    "text": f'"{ability_value}" is not an ability.',
-                }
+                ParseError.of_argument(
+                    args["ability"], "not-an-ability", (ability_value,)
+                )
             ]
         args["ability"]["value"] = ability_value.lower()
 
@@ -88,29 +86,16 @@ class AbilityScore(Directive):
         has_value = "value" in args
         has_override = "override" in args
         if not has_value and not has_override:
-            return None, [
-                {
-                    "line": line,
-                    "text": 'Either "value" or "override" must be specified.',
-                }
-            ]
+            return None, [ParseError(line, "missing-value-or-override")]
         if has_value and has_override:
-            return None, [
-                {
-                    "line": line,
-                    "text": 'Only one of "value" and "override" can be specified.',
-                }
-            ]
+            return None, [ParseError(line, "value-and-override")]
 
         if has_value:
             value = args["value"]["value"]
             match = VALUE_FORMAT.match(value)
             if not match:
                 return None, [
-                    {
-                        "line": args["value"]["line"],
-                        "text": f'Value "{value}" is not a valid score or ' "modifier.",
-                    }
+                    ParseError.of_argument(args["value"], "invalid-score", (value,))
                 ]
 
             if match.group("sign") == "+":
@@ -122,10 +107,9 @@ class AbilityScore(Directive):
                 value = int(match.group("number"))
                 if value < 3 or value > 18:
                     return None, [
-                        {
-                            "line": args["value"]["line"],
-                            "text": f'Value "{value}" is out of range (3-18).',
-                        }
+                        ParseError.of_argument(
+                            args["value"], "score-out-of-range", (value,)
+                        )
                     ]
 
         if has_override:
@@ -133,11 +117,9 @@ class AbilityScore(Directive):
             match = OVERRIDE_FORMAT.match(override)
             if not match:
                 return None, [
-                    {
-                        "line": args["override"]["line"],
-                        "text": f'Override "{override}" is not a valid score or '
-                        "modifier.",
-                    }
+                    ParseError.of_argument(
+                        args["override"], "invalid-override", (override,)
+                    )
                 ]
 
             groups = match.groupdict()
@@ -146,13 +128,11 @@ class AbilityScore(Directive):
                 constraint_int = int(groups["constraint_value"])
                 if constraint_int < 1 or constraint_int > 30:
                     return None, [
-                        {
-                            "line": args["override"]["line"],
-                            "text": (
-                                f'Override "{groups["constraint"]} {constraint_int}" '
-                                "is out of range (1-30)."
-                            ),
-                        }
+                        ParseError.of_argument(
+                            args["override"],
+                            "override-out-of-range",
+                            (f'{groups["constraint"]} {constraint_int}',),
+                        )
                     ]
 
                 args[groups["constraint"].lower()] = {
@@ -171,11 +151,11 @@ class AbilityScore(Directive):
                     value_i = int(groups["value"])
                     if value_i < 1 or value_i > 30:
                         return None, [
-                            {
-                                "line": args["override"]["line"],
-                                "text": f'Override "{value_i}" is out of range '
-                                "(1-30).",
-                            }
+                            ParseError.of_argument(
+                                args["override"],
+                                "override-out-of-range",
+                                (value_i,),
+                            )
                         ]
                     args["override"]["value"] = groups["value"]
 
@@ -192,6 +172,38 @@ class AbilityScore(Directive):
 
         return cls.create_object(args, line), []
 
+    @classmethod
+    def new_many(cls, records: list) -> list:
+        # only scores given as a value are checked here; overrides are
+        # rarer, and left to new()
+        abilities = [args.get("ability") for _, args in records]
+        values = [
+            None if "override" in args else args.get("value") for _, args in records
+        ]
+        matches = [
+            None if value_arg is None else VALUE_FORMAT.match(value_arg["value"])
+            for value_arg in values
+        ]
+        valid = [
+            ability_arg is not None
+            and match is not None
+            and ability_arg["value"].lower() in ABILITIES
+            and (match.group("sign") or 3 <= int(match.group("number")) <= 18)
+            for ability_arg, match in zip(abilities, matches)
+        ]
+
+        # the arguments of valid scores, as new() leaves them
+        for (_, args), match, ok in zip(records, matches, valid):
+            if not ok:
+                continue
+            args["ability"]["value"] = args["ability"]["value"].lower()
+            if match.group("sign") == "+":
+                args["maximum"] = {"value": "20", "line": args["value"]["line"]}
+            elif match.group("sign") == "-":
+                args["minimum"] = {"value": "1", "line": args["value"]["line"]}
+
+        return validated(cls, records, valid)
+
     def __str__(self) -> str:
         ability_name = self.ability.capitalize()
 
@@ -2,10 +2,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 from . import Directive
+from ..errors import ParseError
 
 
-@dataclass
+@dataclass(slots=True)
 class BaseAction(Directive):
+    INTERNED_FIELDS = ("uses", "effect", "amount", "roll")
+
     name: str = ""
     description: str = ""
     uses: Optional[str] = None
@@ -22,19 +25,9 @@ class BaseAction(Directive):
         # required arguments
         errors = []
         if "name" not in args or not args["name"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "name" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("name",)))
         if "description" not in args or not args["description"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "description" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("description",)))
         if errors:
             return None, errors
 
@@ -44,19 +37,19 @@ class BaseAction(Directive):
         return f"{self.DIRECTIVE_NAME}: {self.name}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Action(BaseAction):
     DIRECTIVE_NAME = "Action"
     DIRECTIVE_KEY = "action"
 
 
-@dataclass
+@dataclass(slots=True)
 class BonusAction(BaseAction):
     DIRECTIVE_NAME = "Bonus Action"
     DIRECTIVE_KEY = "bonus_action"
 
 
-@dataclass
+@dataclass(slots=True)
 class Reaction(BaseAction):
     DIRECTIVE_NAME = "Reaction"
     DIRECTIVE_KEY = "reaction"
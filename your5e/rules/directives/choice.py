@@ -2,14 +2,16 @@ from dataclasses import dataclass
 from typing import Optional
 
 from . import Directive
+from ..errors import ParseError
 
 
-@dataclass
+@dataclass(slots=True)
 class Choice(Directive):
     DIRECTIVE_NAME = "Choice"
     DIRECTIVE_KEY = "choice"
     SHORTHAND_KEY = "name"
     SHORTHAND_VALUE = "choice"
+    INTERNED_FIELDS = ("choice",)
 
     choice: str = ""
 
@@ -22,19 +24,9 @@ class Choice(Directive):
         # required arguments
         errors = []
         if "name" not in args or not args["name"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "name" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("name",)))
         if "choice" not in args or not args["choice"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "choice" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("choice",)))
         if errors:
             return None, errors
 
@@ -1,17 +1,18 @@
 from dataclasses import dataclass
 from typing import Optional, List
-import textwrap
 
 from . import Directive
+from ..errors import ParseError
+from ..lines import Record, nested
 
 
-@dataclass
+@dataclass(slots=True)
 class ChooseOption:
     name: str
     directives: List[Directive]
 
 
-@dataclass
+@dataclass(slots=True)
 class Choose(Directive):
     DIRECTIVE_NAME = "Choose"
     DIRECTIVE_KEY = "choose"
@@ -31,70 +32,91 @@ class Choose(Directive):
         cls,
         line: int,
         args: dict,
-        raw_lines: Optional[List[str]] = None,
+        block: Optional[List[Record]] = None,
+        parser=None,
     ) -> tuple[Optional["Choose"], list]:
+        if parser is None:
+            from .. import RuleParser
+
+            parser = RuleParser()
+
         directive_args, options_start_index = get_arguments(
-            raw_lines[1:],
+            block[1:],
             line,
         )
         args.update(directive_args)
 
         # required arguments
         if "count" not in args or not args["count"]["value"]:
-            return None, [
-                {
-                    "line": line,
-                    "text": 'Required "count" argument is missing.',
-                }
-            ]
+            return None, [ParseError(line, "missing-argument", ("count",))]
         try:
             args["count"]["value"] = int(args["count"]["value"])
             if args["count"]["value"] < 1:
                 raise ValueError()
         except ValueError:
             return None, [
-                {
-                    "line": args["count"]["line"],
-                    "text": (
-                        f'Count "{args["count"]["value"]}" should be a '
-                        "positive integer."
-                    ),
-                }
+                ParseError.of_argument(
+                    args["count"], "invalid-count", (args["count"]["value"],)
+                )
             ]
 
         options, option_errors = get_options(
-            raw_lines[options_start_index:], line + options_start_index
+            block[options_start_index:], line + options_start_index, parser
         )
         if option_errors:
             return None, option_errors
         if len(options) < args["count"]["value"]:
-            return None, [
-                {
-                    "line": line,
-                    "text": "Not enough options to choose from.",
-                }
-            ]
+            return None, [ParseError(line, "not-enough-options")]
         obj = cls.create_object(args, line)
         obj.options = options
         return obj, []
 
-    def _transform_dict(self, data: dict) -> dict:
-        if "options" in data and data["options"]:
-            options_dicts = []
-            for option in data["options"]:
-                if isinstance(option, ChooseOption):
-                    option_dict = {
-                        "name": option.name,
-                        "directives": [
-                            directive.asdict() for directive in option.directives
-                        ],
-                    }
-                else:
-                    option_dict = option
-                options_dicts.append(option_dict)
-            data["options"] = options_dicts
+    def _fields_dict(self) -> dict:
+        # slotted dataclasses are recreated, so super() cannot be used
+        data = Directive._fields_dict(self)
+        # nested directives are included as their fields, untransformed
+        data["options"] = [
+            {
+                "name": option.name,
+                "directives": [
+                    directive._fields_dict() for directive in option.directives
+                ],
+            }
+            for option in self.options
+        ]
+        return data
+
+    def bundle_fields(self) -> dict:
+        data = Directive._fields_dict(self)
+        # nested directives keep their names, to know what to recreate
+        data["options"] = [
+            {
+                "name": option.name,
+                "directives": [
+                    (directive.DIRECTIVE_NAME.lower(), directive.bundle_fields())
+                    for directive in option.directives
+                ],
+            }
+            for option in self.options
+        ]
         return data
 
+    @classmethod
+    def from_bundle_fields(cls, data: dict):
+        from . import DIRECTIVES
+
+        options = [
+            ChooseOption(
+                option["name"],
+                [
+                    DIRECTIVES[name]["class"].from_bundle_fields(fields)
+                    for name, fields in option["directives"]
+                ],
+            )
+            for option in data["options"]
+        ]
+        return cls(**{**data, "options": options})
+
     def to_markdown(self) -> str:
         """Convert Choose directive back to Markdown format."""
         # Determine if we can use shorthand
@@ -140,71 +162,62 @@ class Choose(Directive):
         )
 
 
-def get_arguments(lines: List[str], line_number: int) -> tuple[dict, int]:
-    from .. import extract_key_value
+def get_arguments(block: List[Record], line_number: int) -> tuple[dict, int]:
+    from .. import extract_key_value, value_span
 
     args = {}
-    for index, line in enumerate(lines):
-        kv = extract_key_value(line.strip())
+    for index, (line, _, _, stripped) in enumerate(block):
+        kv = extract_key_value(stripped)
         if kv and kv[0] == "option":
             return args, index + 1
         elif kv:
-            args[kv[0]] = {"line": index, "value": kv[1]}
+            args[kv[0]] = {
+                "line": line_number + 1 + index,
+                "value": kv[1],
+                "span": value_span(line, stripped, kv[1]),
+            }
 
     # no options found
-    return args, len(lines)
+    return args, len(block)
 
 
-def get_options(lines: List[str], base_line: int) -> tuple[List[ChooseOption], list]:
-    from .. import RuleParser, extract_key_value
+def get_options(
+    block: List[Record], base_line: int, parser
+) -> tuple[List[ChooseOption], list]:
+    from .. import extract_key_value
 
-    parser = RuleParser()
     options = []
     errors = []
     index = 0
 
-    # dedent the lines for next_directive_block to work
-    lines = textwrap.dedent("\n".join(lines)).split("\n")
+    # the options as if dedented, so the least indented lines are at zero
+    lines = nested(block)
 
     while index < len(lines):
         actual_line = base_line + index
-        line = lines[index]
-        kv = extract_key_value(line)
+        _, _, indent, stripped = lines[index]
+        # only unindented lines can be arguments or options
+        kv = extract_key_value(stripped) if not indent else None
         if kv and kv[0] == "option":
-            block_index, block_lines = parser.next_directive_block(lines, index)
-            directives, directive_errors = parser.parse_rules(
-                # dedent the lines for next_directive_block to work
-                textwrap.dedent("\n".join(block_lines[1:]))
-            )
+            # an option holds all of the more indented lines below it
+            end = index + 1
+            while end < len(lines) and lines[end][2]:
+                end += 1
+            directives, directive_errors = parser.parse_nested(lines[index + 1 : end])
             if directive_errors:
                 errors.extend(directive_errors)
             elif not directives:
-                errors.append(
-                    {
-                        "line": actual_line,
-                        "text": ("Option must contain at least one directive."),
-                    }
-                )
+                errors.append(ParseError(actual_line, "empty-option"))
             else:
                 options.append(ChooseOption(name=kv[1], directives=directives))
 
-            index = block_index + len(block_lines)
+            index = end
         else:
-            index += 1
             if len(options):
                 if kv:
-                    errors.append(
-                        {
-                            "line": actual_line,
-                            "text": "Arguments come before options.",
-                        }
-                    )
-                elif line.strip().startswith("- "):
-                    errors.append(
-                        {
-                            "line": actual_line,
-                            "text": "Directives must be inside option.",
-                        }
-                    )
+                    errors.append(ParseError(actual_line, "argument-after-option"))
+                else:
+                    errors.append(ParseError(actual_line, "directive-outside-option"))
+            index += 1
 
     return options, errors
@@ -4,7 +4,7 @@ from typing import Optional
 from . import Directive
 
 
-@dataclass
+@dataclass(slots=True)
 class Featureless(Directive):
     DIRECTIVE_NAME = "Featureless"
     DIRECTIVE_KEY = "featureless"
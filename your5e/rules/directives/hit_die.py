@@ -2,9 +2,13 @@ from dataclasses import dataclass
 from typing import Optional
 
 from . import Directive
+from ..errors import ParseError
 
+# only polyhedrals
+STANDARD_DICE = frozenset({4, 6, 8, 10, 12, 20})
 
-@dataclass
+
+@dataclass(slots=True)
 class HitDie(Directive):
     DIRECTIVE_NAME = "Hit Die"
     DIRECTIVE_KEY = "hit_die"
@@ -21,12 +25,7 @@ class HitDie(Directive):
     ) -> tuple[Optional["HitDie"], list]:
         # required arguments
         if "die" not in args:
-            return None, [
-                {
-                    "line": line,
-                    "text": 'Required "die" argument is missing.',
-                }
-            ]
+            return None, [ParseError(line, "missing-argument", ("die",))]
 
         # valid die?
         die_value = args["die"]["value"]
@@ -36,19 +35,12 @@ class HitDie(Directive):
             parsed_die = int(die_value[1:])
         except ValueError:
             return None, [
-                {
-                    "line": args["die"]["line"],
-                    "text": f'Die "{die_value}" is not a die.',
-                }
+                ParseError.of_argument(args["die"], "not-a-die", (die_value,))
             ]
 
-        # only polyhedrals
-        if parsed_die not in {4, 6, 8, 10, 12, 20}:
+        if parsed_die not in STANDARD_DICE:
             return None, [
-                {
-                    "line": args["die"]["line"],
-                    "text": f'Die "d{parsed_die}" is not a standard die.',
-                }
+                ParseError.of_argument(args["die"], "non-standard-die", (parsed_die,))
             ]
         args["die"]["value"] = parsed_die
 
@@ -60,17 +52,15 @@ class HitDie(Directive):
                 args["value"]["value"] = parsed_value
             except ValueError:
                 return None, [
-                    {
-                        "line": args["value"]["line"],
-                        "text": f'Value "{value_str}" is not a number.',
-                    }
+                    ParseError.of_argument(
+                        args["value"], "value-not-a-number", (value_str,)
+                    )
                 ]
             if parsed_value < 1 or parsed_value > args["die"]["value"]:
                 return None, [
-                    {
-                        "line": args["value"]["line"],
-                        "text": f'Value "{parsed_value}" is out of range.',
-                    }
+                    ParseError.of_argument(
+                        args["value"], "value-out-of-range", (parsed_value,)
+                    )
                 ]
         else:
             args["value"] = {
@@ -2,14 +2,18 @@ from dataclasses import dataclass
 from typing import Optional
 
 from . import Directive
+from ..errors import ParseError
 
+INVENTORY_ACTIONS = frozenset({"add", "remove"})
 
-@dataclass
+
+@dataclass(slots=True)
 class Inventory(Directive):
     DIRECTIVE_NAME = "Inventory"
     DIRECTIVE_KEY = "inventory"
     SHORTHAND_KEY = "action"
     SHORTHAND_VALUE = "item"
+    INTERNED_FIELDS = ("action", "item")
 
     action: str = ""
     item: str = ""
@@ -24,29 +28,16 @@ class Inventory(Directive):
         # required arguments
         errors = []
         if "action" not in args or not args["action"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "action" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("action",)))
         if "item" not in args or not args["item"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "item" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("item",)))
         if errors:
             return None, errors
 
         # validate action
-        if args["action"]["value"].lower() not in ["add", "remove"]:
+        if args["action"]["value"].lower() not in INVENTORY_ACTIONS:
             return None, [
-                {
-                    "line": args["action"]["line"],
-                    "text": 'Action is either "add" or "remove".',
-                }
+                ParseError.of_argument(args["action"], "invalid-inventory-action")
             ]
 
         if "count" in args:
@@ -56,11 +47,11 @@ class Inventory(Directive):
                 count_value = 0
             if count_value < 1:
                 return None, [
-                    {
-                        "line": args["count"]["line"],
-                        "text": f'Count "{args["count"]["value"]}" '
-                        "should be a positive integer.",
-                    }
+                    ParseError.of_argument(
+                        args["count"],
+                        "invalid-count",
+                        (args["count"]["value"],),
+                    )
                 ]
 
             args["count"]["value"] = count_value
@@ -2,13 +2,15 @@ from dataclasses import dataclass
 from typing import Optional
 
 from . import Directive
+from ..errors import ParseError
 
 
-@dataclass
+@dataclass(slots=True)
 class Language(Directive):
     DIRECTIVE_NAME = "Language"
     DIRECTIVE_KEY = "language"
     SHORTHAND_KEY = "name"
+    INTERNED_FIELDS = ("name",)
 
     name: str = ""
 
@@ -20,12 +22,7 @@ class Language(Directive):
     ) -> tuple[Optional["Language"], list]:
         # required arguments
         if "name" not in args or not args["name"]["value"]:
-            return None, [
-                {
-                    "line": line,
-                    "text": 'Required "name" argument is missing.',
-                }
-            ]
+            return None, [ParseError(line, "missing-argument", ("name",))]
 
         return cls.create_object(args, line), []
 
@@ -1,14 +1,27 @@
 from dataclasses import dataclass
 from typing import Optional
 
-from . import Directive
+from . import Directive, validated
+from ..errors import ParseError
 
+PROFICIENCY_TYPES = [
+    "armor",
+    "initiative",
+    "saving throw",
+    "skill",
+    "tool",
+    "weapon",
+]
+PROFICIENCY_TYPES_TEXT = ", ".join(PROFICIENCY_TYPES)
+PROFICIENCY_TYPE_NAMES = frozenset(PROFICIENCY_TYPES)
 
-@dataclass
+
+@dataclass(slots=True)
 class Proficiency(Directive):
     DIRECTIVE_NAME = "Proficiency"
     DIRECTIVE_KEY = "proficiency"
     SHORTHAND_KEY = "type"
+    INTERNED_FIELDS = ("type", "value")
 
     type: str = ""
     value: str = ""
@@ -22,42 +35,37 @@ class Proficiency(Directive):
         # required arguments
         errors = []
         if "type" not in args or not args["type"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "type" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("type",)))
         if "value" not in args or not args["value"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "value" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("value",)))
         if errors:
             return None, errors
 
         # validate type
-        proficiency_types = [
-            "armor",
-            "initiative",
-            "saving throw",
-            "skill",
-            "tool",
-            "weapon",
-        ]
-        if args["type"]["value"].lower() not in proficiency_types:
+        if args["type"]["value"].lower() not in PROFICIENCY_TYPE_NAMES:
             return None, [
-                {
-                    "line": args["type"]["line"],
-                    "text": f'Type "{args["type"]["value"]}" should be either '
-                    f'{", ".join(proficiency_types)}.',
-                }
+                ParseError.of_argument(
+                    args["type"],
+                    "invalid-choice",
+                    ("Type", args["type"]["value"], PROFICIENCY_TYPES_TEXT),
+                )
             ]
 
         return cls.create_object(args, line), []
 
+    @classmethod
+    def new_many(cls, records: list) -> list:
+        types = [args.get("type") for _, args in records]
+        values = [args.get("value") for _, args in records]
+        valid = [
+            type_arg is not None
+            and value_arg is not None
+            and value_arg["value"] != ""
+            and type_arg["value"].lower() in PROFICIENCY_TYPE_NAMES
+            for type_arg, value_arg in zip(types, values)
+        ]
+        return validated(cls, records, valid)
+
     def _transform_dict(self, data: dict) -> dict:
         if "type" in data:
             data["type"] = data["type"].lower()
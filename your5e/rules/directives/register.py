@@ -1,15 +1,22 @@
 from dataclasses import dataclass
 from typing import Optional
 
-from . import Directive
+from . import Directive, validated
+from ..errors import ParseError
 
+REGISTER_TYPES = ["Ability Score", "Roll", "Skill"]
+REGISTER_TYPES_TEXT = ", ".join(REGISTER_TYPES)
+# each type by its lowercased name
+REGISTER_TYPE_NAMES = {type_name.lower(): type_name for type_name in REGISTER_TYPES}
 
-@dataclass
+
+@dataclass(slots=True)
 class Register(Directive):
     DIRECTIVE_NAME = "Register"
     DIRECTIVE_KEY = "register"
     SHORTHAND_KEY = "type"
     SHORTHAND_VALUE = "name"
+    INTERNED_FIELDS = ("type",)
 
     type: str = ""
 
@@ -21,45 +28,42 @@ class Register(Directive):
     ) -> tuple[Optional["Register"], list]:
         errors = []
         if "type" not in args or not args["type"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "type" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("type",)))
         if "name" not in args or not args["name"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "name" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("name",)))
         if errors:
             return None, errors
 
         if "type" in args:
-            valid_types = ["Ability Score", "Roll", "Skill"]
             type_value = args["type"]["value"]
             normalized_type = cls._normalize_type(type_value)
-            if normalized_type not in valid_types:
+            if normalized_type not in REGISTER_TYPES:
                 return None, [
-                    {
-                        "line": args["type"]["line"],
-                        "text": f'Type "{type_value}" should be either '
-                        f'{", ".join(valid_types)}.',
-                    }
+                    ParseError.of_argument(
+                        args["type"],
+                        "invalid-choice",
+                        ("Type", type_value, REGISTER_TYPES_TEXT),
+                    )
                 ]
 
         return cls.create_object(args, line), []
 
+    @classmethod
+    def new_many(cls, records: list) -> list:
+        types = [args.get("type") for _, args in records]
+        names = [args.get("name") for _, args in records]
+        valid = [
+            type_arg is not None
+            and name_arg is not None
+            and name_arg["value"] != ""
+            and type_arg["value"].lower() in REGISTER_TYPE_NAMES
+            for type_arg, name_arg in zip(types, names)
+        ]
+        return validated(cls, records, valid)
+
     @staticmethod
     def _normalize_type(type_value: str) -> str:
-        type_mapping = {
-            "ability score": "Ability Score",
-            "roll": "Roll",
-            "skill": "Skill",
-        }
-        return type_mapping.get(type_value.lower(), type_value)
+        return REGISTER_TYPE_NAMES.get(type_value.lower(), type_value)
 
     def _transform_dict(self, data: dict) -> dict:
         if "type" in data and data["type"]:
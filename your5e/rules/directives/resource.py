@@ -2,14 +2,19 @@ from dataclasses import dataclass
 from typing import Optional
 
 from . import Directive
+from ..errors import ParseError
 
+RENEW_PERIODS = ["rest", "long rest", "dawn"]
+RENEW_PERIODS_TEXT = ", ".join(RENEW_PERIODS)
 
-@dataclass
+
+@dataclass(slots=True)
 class Resource(Directive):
     DIRECTIVE_NAME = "Resource"
     DIRECTIVE_KEY = "resource"
     SHORTHAND_KEY = "name"
     SHORTHAND_VALUE = "uses"
+    INTERNED_FIELDS = ("uses", "renew", "regain")
 
     name: str = ""
     uses: str = ""
@@ -25,32 +30,21 @@ class Resource(Directive):
         # required arguments
         errors = []
         if "name" not in args or not args["name"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "name" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("name",)))
         if "uses" not in args or not args["uses"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "uses" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("uses",)))
         if errors:
             return None, errors
 
         # validate renew value
         if "renew" in args:
-            renew_periods = ["rest", "long rest", "dawn"]
-            if args["renew"]["value"].lower() not in renew_periods:
+            if args["renew"]["value"].lower() not in RENEW_PERIODS:
                 return None, [
-                    {
-                        "line": args["renew"]["line"],
-                        "text": f'Renew "{args["renew"]["value"]}" should be either '
-                        f'{", ".join(renew_periods)}.',
-                    }
+                    ParseError.of_argument(
+                        args["renew"],
+                        "invalid-choice",
+                        ("Renew", args["renew"]["value"], RENEW_PERIODS_TEXT),
+                    )
                 ]
 
         return cls.create_object(args, line), []
@@ -2,12 +2,14 @@ from dataclasses import dataclass
 from typing import Optional
 
 from . import Directive
+from ..errors import ParseError
 
 
-@dataclass
+@dataclass(slots=True)
 class Set(Directive):
     DIRECTIVE_NAME = "Set"
     DIRECTIVE_KEY = "set"
+    INTERNED_FIELDS = ("key", "value")
 
     key: str = ""
     value: str = ""
@@ -21,19 +23,9 @@ class Set(Directive):
         # required arguments
         errors = []
         if "key" not in args or not args["key"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "key" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("key",)))
         if "value" not in args or not args["value"]["value"]:
-            errors.append(
-                {
-                    "line": line,
-                    "text": 'Required "value" argument is missing.',
-                }
-            )
+            errors.append(ParseError(line, "missing-argument", ("value",)))
         if errors:
             return None, errors
 
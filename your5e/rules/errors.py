@@ -0,0 +1,113 @@
+from typing import Any, Optional, Tuple
+
+# every error the parser and directives report, by a code that stays the
+# same as long as the error means the same thing (the wording may change)
+MESSAGES = {
+    # the parser
+    "unknown-directive": "Unknown directive: {0}",
+    "shorthand-arguments": "No arguments when using shorthand notation.",
+    "argument-without-key": "Argument has no key.",
+    # arguments common to many directives
+    "missing-argument": 'Required "{0}" argument is missing.',
+    "invalid-choice": '{0} "{1}" should be either {2}.',
+    "invalid-count": 'Count "{0}" should be a positive integer.',
+    # Ability Score
+    "not-an-ability": '"{0}" is not an ability.',
+    "missing-value-or-override": 'Either "value" or "override" must be specified.',
+    "value-and-override": 'Only one of "value" and "override" can be specified.',
+    "invalid-score": 'Value "{0}" is not a valid score or modifier.',
+    "score-out-of-range": 'Value "{0}" is out of range (3-18).',
+    "invalid-override": 'Override "{0}" is not a valid score or modifier.',
+    "override-out-of-range": 'Override "{0}" is out of range (1-30).',
+    # Choose
+    "not-enough-options": "Not enough options to choose from.",
+    "empty-option": "Option must contain at least one directive.",
+    "argument-after-option": "Arguments come before options.",
+    "directive-outside-option": "Directives must be inside option.",
+    # Hit Die
+    "not-a-die": 'Die "{0}" is not a die.',
+    "non-standard-die": 'Die "d{0}" is not a standard die.',
+    "value-not-a-number": 'Value "{0}" is not a number.',
+    "value-out-of-range": 'Value "{0}" is out of range.',
+    # Inventory
+    "invalid-inventory-action": 'Action is either "add" or "remove".',
+}
+
+
+class ParseError:
+    """
+    An error found while parsing, on `line` (and optionally between the
+    columns of `span` on that line).
+
+    The message is only formatted from the code and its arguments when it
+    is asked for, as most errors are only counted or sorted, or thrown away.
+    Errors also behave as the {"line": ..., "text": ...} dicts they replace:
+    `error["text"]` works, and they compare equal to such a dict.
+    """
+
+    __slots__ = ("line", "code", "args", "span")
+
+    def __init__(
+        self,
+        line: int,
+        code: str,
+        args: Tuple[Any, ...] = (),
+        span: Optional[Tuple[int, int]] = None,
+    ):
+        self.line = line
+        self.code = code
+        self.args = args
+        self.span = span
+
+    @classmethod
+    def of_argument(
+        cls, argument: dict, code: str, args: Tuple[Any, ...] = ()
+    ) -> "ParseError":
+        """An error in the value of `argument`, spanning it when known."""
+        return cls(argument["line"], code, args, argument.get("span"))
+
+    @property
+    def text(self) -> str:
+        return MESSAGES[self.code].format(*self.args)
+
+    def __getitem__(self, key: str):
+        if key == "line":
+            return self.line
+        if key == "text":
+            return self.text
+        if key == "code":
+            return self.code
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        # so that dict(error) is the dict the error replaces
+        return ("line", "text")
+
+    def asdict(self) -> dict:
+        data = {"line": self.line, "code": self.code, "text": self.text}
+        if self.span is not None:
+            data["span"] = list(self.span)
+        return data
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ParseError):
+            return (self.line, self.code, self.args, self.span) == (
+                other.line,
+                other.code,
+                other.args,
+                other.span,
+            )
+        if isinstance(other, dict):
+            return other == {"line": self.line, "text": self.text}
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ParseError(line={self.line!r}, code={self.code!r}, text={self.text!r})"
@@ -0,0 +1,235 @@
+import json
+import os
+from collections import Counter
+from time import perf_counter
+from typing import Any, Dict, List, Optional, TextIO
+
+
+class Hooks:
+    """
+    Watches a RuleParser or DirectiveExtract at work. Subclasses override
+    only the events they want; those not overridden do nothing.
+
+    The events are of the blocks of a document, not those nested inside a
+    directive (eg the directives of a Choose's options, which are part of
+    the Choose), and in order: each block starts, then each of its errors,
+    or the directive it is, is reported. Once all of the blocks are done so
+    is the file (given as None when only content was parsed).
+    """
+
+    def on_block_start(self, line: int, lines: List[str]):
+        pass
+
+    def on_directive(self, line: int, directive: Any):
+        pass
+
+    def on_error(self, error: Dict[str, Any]):
+        pass
+
+    def on_file_done(
+        self, file: Optional[str], directives: List[Any], errors: List[Dict[str, Any]]
+    ):
+        pass
+
+
+class Counters(Hooks):
+    """Counts files, blocks, directives by type and errors by code."""
+
+    def __init__(self):
+        self.files = 0
+        self.blocks = 0
+        self.directives = Counter()
+        self.errors = Counter()
+
+    def on_block_start(self, line, lines):
+        self.blocks += 1
+
+    def on_directive(self, line, directive):
+        self.directives[directive.DIRECTIVE_NAME] += 1
+
+    def on_error(self, error):
+        self.errors[error.get("code")] += 1
+
+    def on_file_done(self, file, directives, errors):
+        self.files += 1
+
+    def write(self, output: TextIO):
+        output.write(f"{'files':20s} {self.files:8d}\n")
+        output.write(f"{'blocks':20s} {self.blocks:8d}\n")
+        for name, count in self.directives.most_common():
+            output.write(f"{name:20s} {count:8d}\n")
+        for code, count in self.errors.most_common():
+            output.write(f"{'error ' + str(code):20s} {count:8d}\n")
+
+
+class BlockTimer(Hooks):
+    """
+    Times each block, from its start to the last of its errors or its
+    directive (so not the scanning for the next block), and each file,
+    from the start of its first block to when it is done.
+    """
+
+    def __init__(self):
+        self.block = None
+        self.file_start = None
+
+    def on_block_start(self, line, lines):
+        now = perf_counter()
+        self.end_block()
+        if self.file_start is None:
+            self.file_start = now
+        # the name of what the block is, start, end, errors
+        self.block = ["invalid", line, now, now, []]
+
+    def on_directive(self, line, directive):
+        self.block[0] = directive.DIRECTIVE_NAME
+        self.block[3] = perf_counter()
+
+    def on_error(self, error):
+        self.block[4].append(error.get("code"))
+        self.block[3] = perf_counter()
+
+    def on_file_done(self, file, directives, errors):
+        now = perf_counter()
+        self.end_block()
+        start = now if self.file_start is None else self.file_start
+        self.file_start = None
+        self.file_timed(file, start, now, len(directives), len(errors))
+
+    def end_block(self):
+        if self.block is not None:
+            self.block_timed(*self.block)
+            self.block = None
+
+    def block_timed(self, name, line, start, end, errors):
+        pass
+
+    def file_timed(self, file, start, end, directives, errors):
+        pass
+
+
+class TimingHistogram(BlockTimer):
+    """
+    How many blocks of each type of directive took how long to parse, in
+    buckets of powers of two microseconds.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # name -> bucket -> count, where a bucket counts blocks taking
+        # up to 2 ** bucket microseconds
+        self.buckets: Dict[str, Counter] = {}
+
+    def block_timed(self, name, line, start, end, errors):
+        bucket = int((end - start) * 1_000_000).bit_length()
+        if name not in self.buckets:
+            self.buckets[name] = Counter()
+        self.buckets[name][bucket] += 1
+
+    def write(self, output: TextIO):
+        for name in sorted(self.buckets):
+            buckets = self.buckets[name]
+            output.write(f"{name}\n")
+            for bucket in range(min(buckets), max(buckets) + 1):
+                count = buckets[bucket]
+                output.write(f"  <= {2 ** bucket:8d}us {count:8d}\n")
+
+
+class TraceExporter(BlockTimer):
+    """
+    Records each file and block parsed as a span of time, to be written as
+    Chrome trace events (for chrome://tracing or Perfetto) or in the
+    format of speedscope, either of which shows where the time went.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.started = perf_counter()
+        self.pid = os.getpid()
+        # (start, end, name, category, args), in microseconds
+        self.spans = []
+
+    def microseconds(self, seconds: float) -> float:
+        return round((seconds - self.started) * 1_000_000, 3)
+
+    def block_timed(self, name, line, start, end, errors):
+        args = {"line": line}
+        if errors:
+            args["errors"] = errors
+        self.spans.append(
+            (self.microseconds(start), self.microseconds(end), name, "block", args)
+        )
+
+    def file_timed(self, file, start, end, directives, errors):
+        self.spans.append(
+            (
+                self.microseconds(start),
+                self.microseconds(end),
+                "<content>" if file is None else file,
+                "file",
+                {"directives": directives, "errors": errors},
+            )
+        )
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        return {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start,
+                    "dur": round(end - start, 3),
+                    "pid": self.pid,
+                    "tid": 1,
+                    "args": args,
+                }
+                for start, end, name, category, args in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def speedscope(self) -> Dict[str, Any]:
+        frames = {}
+        events = []
+        open_spans = []
+        # a file's blocks start with (or after) it and end before it
+        for start, end, name, _, _ in sorted(
+            self.spans, key=lambda span: (span[0], -span[1])
+        ):
+            while open_spans and open_spans[-1][0] <= start:
+                close(events, *open_spans.pop())
+            frame = frames.setdefault(name, len(frames))
+            events.append({"type": "O", "frame": frame, "at": start})
+            open_spans.append((end, frame))
+        while open_spans:
+            close(events, *open_spans.pop())
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": name} for name in frames]},
+            "profiles": [
+                {
+                    "type": "evented",
+                    "name": "your5e rules",
+                    "unit": "microseconds",
+                    "startValue": events[0]["at"] if events else 0,
+                    "endValue": events[-1]["at"] if events else 0,
+                    "events": events,
+                }
+            ],
+        }
+
+    def write(self, output: TextIO, format: str = "chrome"):
+        """Writes the spans recorded as JSON, for "chrome" or "speedscope"."""
+        if format == "speedscope":
+            json.dump(self.speedscope(), output)
+        else:
+            json.dump(self.chrome_trace(), output)
+
+
+def close(events: List[Dict[str, Any]], end: float, frame: int):
+    # rounding can put the end of a span just before the end of the last
+    # span inside it, but the events must stay in order
+    at = max(end, events[-1]["at"])
+    events.append({"type": "C", "frame": frame, "at": at})
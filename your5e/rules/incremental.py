@@ -0,0 +1,173 @@
+from bisect import bisect_right
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import RuleParser, extract_key_value
+from .lines import HEADING, Record, classify
+
+
+@dataclass(slots=True)
+class ParsedBlock:
+    start: int
+    records: List[Record]
+    directive: Any
+    errors: List[Dict[str, Any]]
+    # whether the directive's id came from its line number, rather
+    # than being given in the rules
+    generated_id: bool = False
+
+
+@dataclass(slots=True)
+class Section:
+    # from a heading (or the start of the document) to the next heading
+    start: int
+    records: List[Record]
+    blocks: List[ParsedBlock] = field(default_factory=list)
+
+
+class IncrementalParser:
+    """
+    Keeps the last parse of a document, so that an edit only re-parses
+    the sections (the lines from one heading to the next) it touches.
+
+    Directives and errors in the other sections are kept, with their line
+    numbers and generated ids moved to follow the edit; the results are
+    always the same as parsing the whole edited document again. Kept
+    directives are the same objects as before, updated in place, except
+    that those from a DirectivePool are replaced rather than changed.
+    """
+
+    def __init__(self, parser: Optional[RuleParser] = None):
+        self.parser = parser or RuleParser()
+        self.sections: List[Section] = []
+        self.parse("")
+
+    @property
+    def lines(self) -> List[str]:
+        return [record[0] for section in self.sections for record in section.records]
+
+    @property
+    def content(self) -> str:
+        return "\n".join(self.lines)
+
+    def __len__(self) -> int:
+        last = self.sections[-1]
+        return last.start + len(last.records)
+
+    def parse(
+        self,
+        content: str,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        records = [(line, *classify(line)) for line in content.split("\n")]
+        self.sections = self.parse_sections(0, records)
+        return self.results()
+
+    def edit(
+        self,
+        start: int,
+        end: int,
+        text: str,
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Replaces the lines from `start` up to (not including) `end`, counting
+        from zero, with the lines of `text`, and returns the new results.
+
+        Each line of the text ends with a newline, or the end of the text,
+        so "" removes the lines and `start == end` inserts before `start`.
+        """
+        length = len(self)
+        if not 0 <= start <= end <= length:
+            raise ValueError(f"Edit {start}-{end} is outside lines 0-{length}.")
+
+        new_lines = text.split("\n")
+        if text == "" or text.endswith("\n"):
+            new_lines.pop()
+
+        # the lines either side of the edit are included, so that
+        # changing or removing a heading joins the sections around it
+        starts = [section.start for section in self.sections]
+        first = bisect_right(starts, max(start - 1, 0)) - 1
+        last = bisect_right(starts, min(max(end - 1, start - 1, 0), length - 1)) - 1
+        region_start = self.sections[first].start
+
+        old_records = [
+            record
+            for section in self.sections[first : last + 1]
+            for record in section.records
+        ]
+        records = (
+            old_records[: start - region_start]
+            + [(line, *classify(line)) for line in new_lines]
+            + old_records[end - region_start :]
+        )
+        if not records and first == 0 and last == len(self.sections) - 1:
+            # as "".split("\n"), a document always has at least one line
+            records = [("", *classify(""))]
+
+        sections = self.parse_sections(region_start, records)
+        shift = len(records) - len(old_records)
+        for section in self.sections[last + 1 :]:
+            self.shift_section(section, shift)
+        self.sections[first : last + 1] = sections
+
+        return self.results()
+
+    def results(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        result = []
+        errors = []
+        for section in self.sections:
+            for block in section.blocks:
+                if block.directive is not None:
+                    result.append(block.directive)
+                errors.extend(block.errors)
+        return result, sorted(errors, key=lambda e: e["line"])
+
+    def parse_sections(self, start: int, records: List[Record]) -> List[Section]:
+        sections = []
+        for index, record in enumerate(records, start):
+            if record[1] == HEADING or not sections:
+                sections.append(Section(index, []))
+            sections[-1].records.append(record)
+
+        for section in sections:
+            for index, block in self.parser.scan_blocks(section.records, section.start):
+                section.blocks.append(self.parse_block(index, block))
+        return sections
+
+    def parse_block(self, start: int, records: List[Record]) -> ParsedBlock:
+        directive, errors = self.parser.parse_block(start + 1, records)
+        block = ParsedBlock(start, records, directive, errors)
+        if directive is not None:
+            block.generated_id = directive.id == directive.generate_id(
+                start + 1
+            ) and not any(
+                extract_key_value(stripped) == ("id", directive.id)
+                for _, _, _, stripped in records[1:]
+            )
+        return block
+
+    def move_id(self, block: ParsedBlock):
+        directive_id = block.directive.generate_id(block.start + 1)
+        pool = self.parser.pool
+        if pool is None:
+            block.directive.id = directive_id
+        else:
+            # pooled directives are shared, even with those inside a Choose
+            # elsewhere, so one with the new id replaces it
+            block.directive = pool.share(replace(block.directive, id=directive_id))
+
+    def shift_section(self, section: Section, shift: int):
+        if not shift:
+            return
+        section.start += shift
+        for number, block in enumerate(section.blocks):
+            if block.errors:
+                # which errors count lines from the directive, rather than
+                # from within it, is up to the directive, so parse it again
+                section.blocks[number] = self.parse_block(
+                    block.start + shift, block.records
+                )
+                continue
+            block.start += shift
+            if block.generated_id:
+                self.move_id(block)
@@ -0,0 +1,114 @@
+import os
+from array import array
+from itertools import islice
+from typing import Iterator, List, Tuple
+
+# what each line of a document is, as far as the parsers are concerned
+TEXT = 0
+BLANK = 1
+HEADING = 2
+DIRECTIVE = 3
+ARGUMENT = 4
+COMMENT = 5
+BREAK = 6
+
+# a line with its classification: (raw line, kind, indent, stripped)
+Record = Tuple[str, int, int, str]
+
+
+def classify(line: str) -> Tuple[int, int, str]:
+    """
+    Returns the kind of a line, its indentation and its stripped text.
+
+    Unindented list items start directives (or are comments or breaks);
+    indented list items are arguments to the directive above, unless they
+    are comments. An empty list item ("- ") is just text.
+    """
+    stripped = line.strip()
+
+    if not stripped:
+        return BLANK, 0, stripped
+    if stripped.startswith("#"):
+        kind = HEADING
+    elif not stripped.startswith("- "):
+        kind = TEXT
+    else:
+        kind = list_item_kind(stripped, line.startswith("- "))
+
+    return kind, len(line) - len(line.lstrip()), stripped
+
+
+def list_item_kind(stripped: str, unindented: bool) -> int:
+    if unindented:
+        directive_name = stripped[2:].lstrip().lower()
+        if directive_name.startswith("comment") or directive_name.startswith("#"):
+            return COMMENT
+        if directive_name.startswith("break"):
+            return BREAK
+        return DIRECTIVE
+    if stripped.startswith("- #") or stripped.lower().startswith("- comment"):
+        return COMMENT
+    return ARGUMENT
+
+
+def nested(records: List[Record]) -> List[Record]:
+    """
+    Returns the records of lines nested inside a directive block (eg the
+    directives of a Choose option) as if they were a document of their own,
+    without rebuilding the text: indents are reduced by the whitespace
+    common to all of the lines, as `textwrap.dedent` would, and list items
+    left unindented become directives.
+    """
+    if not records:
+        return []
+
+    common = os.path.commonprefix([record[0] for record in records])
+    # the records may already be relative to an outer margin
+    first_line, _, first_indent, _ = records[0]
+    outer_margin = len(first_line) - len(first_line.lstrip()) - first_indent
+    margin = len(common) - len(common.lstrip()) - outer_margin
+
+    return [
+        (line, list_item_kind(stripped, indent == margin), indent - margin, stripped)
+        for line, _, indent, stripped in records
+    ]
+
+
+class LineIndex:
+    """
+    Every line of a document classified once, so that the parsers can read
+    the kind, indentation and stripped text of a line rather than testing
+    the raw text again each time they look at it.
+
+    Indexing and slicing return the raw lines.
+    """
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+        self.kinds = bytearray(len(lines))
+        self.indents = array("L", bytes(array("L").itemsize * len(lines)))
+        self.stripped = []
+
+        for number, line in enumerate(lines):
+            kind, indent, stripped = classify(line)
+            self.kinds[number] = kind
+            self.indents[number] = indent
+            self.stripped.append(stripped)
+
+    @classmethod
+    def from_content(cls, content: str) -> "LineIndex":
+        return cls(content.split("\n"))
+
+    def records(self, start: int = 0) -> Iterator[Record]:
+        return zip(
+            islice(self.lines, start, None),
+            islice(self.kinds, start, None),
+            islice(self.indents, start, None),
+            islice(self.stripped, start, None),
+        )
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, item):
+        return self.lines[item]
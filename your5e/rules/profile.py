@@ -0,0 +1,161 @@
+from time import perf_counter, process_time
+from typing import Dict, List, Optional, TextIO, Tuple
+
+from . import RuleParser
+
+# the phases of checking a file, in the order they happen
+PHASES = ("read", "scan", "dispatch", "validate", "report")
+
+
+class Profile:
+    """
+    Wall and CPU time spent in each phase of checking rules files, in
+    validating each type of directive, and in checking each file.
+
+    Each phase is timed without the phases within it (a Choose is validated
+    without the time taken by the directives in its options), so that the
+    phases add up. Profiles of files checked in other processes are brought
+    together with `merge`.
+    """
+
+    def __init__(self):
+        # name -> [calls, wall seconds, CPU seconds]
+        self.phases: Dict[str, List[float]] = {}
+        self.directives: Dict[str, List[float]] = {}
+        # (file, wall seconds, CPU seconds)
+        self.files: List[Tuple[str, float, float]] = []
+        # the time spent in phases within each phase being timed
+        self.inner: List[List[float]] = []
+
+    def timed(
+        self,
+        phase: str,
+        function,
+        *args,
+        directive: Optional[str] = None,
+        calls: int = 1,
+    ):
+        """
+        Calls `function` with `args`, counting its time (as `calls` calls)
+        to `phase`, and to `directive` if given.
+        """
+        self.inner.append([0.0, 0.0])
+        wall = perf_counter()
+        cpu = process_time()
+        try:
+            return function(*args)
+        finally:
+            wall = perf_counter() - wall
+            cpu = process_time() - cpu
+            inner_wall, inner_cpu = self.inner.pop()
+            if self.inner:
+                self.inner[-1][0] += wall
+                self.inner[-1][1] += cpu
+            wall -= inner_wall
+            cpu -= inner_cpu
+            self.add(self.phases, phase, wall, cpu, calls)
+            if directive is not None:
+                self.add(self.directives, directive, wall, cpu, calls)
+
+    @staticmethod
+    def add(totals: dict, name: str, wall: float, cpu: float, calls: int = 1):
+        if name not in totals:
+            totals[name] = [0, 0.0, 0.0]
+        total = totals[name]
+        total[0] += calls
+        total[1] += wall
+        total[2] += cpu
+
+    def add_file(self, file: str, wall: float, cpu: float):
+        self.files.append((file, wall, cpu))
+
+    def merge(self, other: "Profile"):
+        for totals, other_totals in (
+            (self.phases, other.phases),
+            (self.directives, other.directives),
+        ):
+            for name, (calls, wall, cpu) in other_totals.items():
+                self.add(totals, name, wall, cpu, calls)
+        self.files.extend(other.files)
+
+    def __getstate__(self):
+        # only finished profiles are sent between processes
+        return {
+            "phases": self.phases,
+            "directives": self.directives,
+            "files": self.files,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.inner = []
+
+    def write(self, output: TextIO, slowest: int = 10):
+        """Writes a summary of where the time went, and the slowest files."""
+        rows = [(phase, self.phases[phase]) for phase in PHASES if phase in self.phases]
+        rows += [
+            (phase, totals)
+            for phase, totals in self.phases.items()
+            if phase not in PHASES
+        ]
+        write_table(output, "phase", rows)
+
+        output.write("\n")
+        rows = sorted(self.directives.items(), key=lambda row: -row[1][1])
+        write_table(output, "directive", rows)
+
+        output.write("\n")
+        files = sorted(self.files, key=lambda file: -file[1])[:slowest]
+        output.write(f"{'slowest files':40s} {'wall':>10s} {'cpu':>10s}\n")
+        for file, wall, cpu in files:
+            output.write(f"{file:40s} {wall:10.4f} {cpu:10.4f}\n")
+        wall = sum(file[1] for file in self.files)
+        cpu = sum(file[2] for file in self.files)
+        output.write(f"{f'{len(self.files)} files':40s} {wall:10.4f} {cpu:10.4f}\n")
+
+
+def write_table(output: TextIO, heading: str, rows):
+    output.write(f"{heading:20s} {'calls':>8s} {'wall':>10s} {'cpu':>10s}\n")
+    for name, (calls, wall, cpu) in rows:
+        output.write(f"{name:20s} {calls:8d} {wall:10.4f} {cpu:10.4f}\n")
+
+
+class ProfilingParser(RuleParser):
+    """
+    A RuleParser that records in `profile` the time spent finding blocks
+    (and classifying their lines), working out which directive each is and
+    its arguments, and validating them, by type of directive.
+    """
+
+    def __init__(self, profile: Profile, **kwargs):
+        super().__init__(**kwargs)
+        self.profile = profile
+
+    def parse_rules(self, content, max_errors=None, file=None):
+        # classifying lines as they are scanned, rather than all at once
+        # beforehand, so that it is timed as part of scanning
+        return self.parse_lines(content.split("\n"), max_errors, file)
+
+    def scan_blocks(self, records, index=0, allowed=True):
+        blocks = super().scan_blocks(records, index, allowed)
+        while True:
+            block = self.profile.timed("scan", next, blocks, None)
+            if block is None:
+                return
+            yield block
+
+    def block_arguments(self, line_number, block):
+        return self.profile.timed(
+            "dispatch", super().block_arguments, line_number, block
+        )
+
+    def validate(self, directive_info, line_number, args, block):
+        return self.profile.timed(
+            "validate",
+            super().validate,
+            directive_info,
+            line_number,
+            args,
+            block,
+            directive=directive_info["class"].DIRECTIVE_NAME,
+        )
@@ -0,0 +1,117 @@
+import re
+from typing import Optional, Tuple
+
+SHORTHAND_FORMAT = re.compile(
+    r"""
+        ^
+        (?P<directive> \w+ (?: \s+ \w+ )* )
+        \s+
+        (?P<marker> \*\* | __ | [*_] )  # opening emphasis
+        (?P<key> \w+ (?: \s+ \w+ )* )
+        (?P=marker)                     # closing marker
+        (?: \s+ (?P<value> .+ ))?       # value (optional)
+    """,
+    re.VERBOSE,
+)
+
+WORDS_AND_SPACES = re.compile(r"[\w\s]*")
+SPACES = re.compile(r"\s+")
+# lines shorter than this are quicker to split with the regular expression
+REGEX_LENGTH = 48
+# the spaces before an underscore, which may end a name
+BEFORE_UNDERSCORE = re.compile(r"\s(?=_)")
+
+
+def split_shorthand(text: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    """
+    Splits a directive in shorthand ("Name _key_ value") into its name, key
+    and value (None when there is none), exactly as SHORTHAND_FORMAT matches
+    it, or returns None when it is not in shorthand.
+
+    As an underscore is a word character, the regular expression tries
+    every way of splitting a line with underscores into a name and a key,
+    which on long lines takes time quadratic in their length. Here only the
+    spaces before an underscore are tried as the end of the name, longest
+    name first, and the closing underscores that could end the key are
+    found once for all of them.
+    """
+    if "_" not in text or len(text) < REGEX_LENGTH or "\n" in text:
+        # without underscores the regular expression does not backtrack
+        # further than it must, and on short lines it is quicker however
+        # much it backtracks (it also decides what "." matches)
+        match = SHORTHAND_FORMAT.match(text)
+        if match is None:
+            return None
+        return match.group("directive"), match.group("key"), match.group("value")
+
+    # the name, any key in underscores and its closing marker all fall
+    # within the words and spaces the line starts with
+    end = WORDS_AND_SPACES.match(text).end()
+    if end == 0 or text[0].isspace():
+        return None
+
+    # the longest name is the one before asterisks after all of those
+    if text.startswith("*", end) and text[end - 1].isspace():
+        for marker in ("**", "*"):
+            if text.startswith(marker, end):
+                key_start = end + len(marker)
+                key_end = WORDS_AND_SPACES.match(text, key_start).end()
+                if text.startswith(marker, key_end) and is_key(
+                    text, key_start, key_end
+                ):
+                    return split_at(text, end, marker, key_start, key_end)
+
+    # otherwise the key ends at the last closing marker (the longest key),
+    # wherever the name ends, and the name must end before that
+    closers = [("_", last_closer(text, "_", end))]
+    if "__" in text:
+        closers.insert(0, ("__", last_closer(text, "__", end)))
+    limit = max(closers[0][1], closers[-1][1])
+    starts = [match.end() for match in BEFORE_UNDERSCORE.finditer(text, 0, limit)]
+    for marker_start in reversed(starts):
+        for marker, key_end in closers:
+            if text.startswith(marker, marker_start):
+                key_start = marker_start + len(marker)
+                if is_key(text, key_start, key_end):
+                    return split_at(text, marker_start, marker, key_start, key_end)
+    return None
+
+
+def is_key(text: str, key_start: int, key_end: int) -> bool:
+    # words and spaces, starting and ending with a word
+    return (
+        key_end > key_start
+        and not text[key_start].isspace()
+        and not text[key_end - 1].isspace()
+    )
+
+
+def split_at(text: str, marker_start: int, marker: str, key_start: int, key_end: int):
+    return (
+        text[:marker_start].rstrip(),
+        text[key_start:key_end],
+        shorthand_value(text, key_end + len(marker)),
+    )
+
+
+def last_closer(text: str, marker: str, end: int) -> int:
+    """
+    Where the last `marker` before `end` that follows a word character
+    starts, or -1.
+    """
+    position = text.rfind(marker, 1, end)
+    while position > 0 and text[position - 1].isspace():
+        position = text.rfind(marker, 1, position + len(marker) - 1)
+    return position
+
+
+def shorthand_value(text: str, start: int) -> Optional[str]:
+    # spaces then at least one character, after the closing marker
+    if start >= len(text) or not text[start].isspace():
+        return None
+    value_start = SPACES.match(text, start).end()
+    if value_start < len(text):
+        return text[value_start:]
+    if value_start - start > 1:
+        return text[-1]
+    return None
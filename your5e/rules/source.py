@@ -0,0 +1,136 @@
+import codecs
+import locale
+import mmap
+import os
+from array import array
+from typing import Iterator, List, Union
+
+# encodings where a b"\n" byte is always a newline, so lines can be found
+# without decoding the whole file first
+LINE_SAFE_ENCODINGS = frozenset({"utf-8", "ascii"})
+
+# how much of a file is checked for decoding errors at a time
+CHUNK_SIZE = 1 << 20
+
+
+def line_offsets(data) -> array:
+    """The offset of the start of every line, as `split("\\n")` would find."""
+    offsets = array("Q", [0])
+    find = data.find
+    position = find(b"\n")
+    while position != -1:
+        offsets.append(position + 1)
+        position = find(b"\n", position + 1)
+    return offsets
+
+
+class MappedFile:
+    """
+    The lines of a rules file, as `content.split("\\n")` would give them,
+    read from the file mapped into memory rather than all decoded at once:
+    lines are decoded a piece at a time as they are read, and a table of
+    where each line starts lets any one of them be found by its number.
+    """
+
+    def __init__(self, path: str, encoding: str = "utf-8"):
+        self.path = path
+        self.encoding = encoding
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # an empty file cannot be mapped
+                self.data = b""
+        self._offsets = None
+
+    @property
+    def offsets(self) -> array:
+        # only needed to find lines by number, so not when reading them in order
+        if self._offsets is None:
+            self._offsets = line_offsets(self.data)
+        return self._offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def line(self, index: int) -> str:
+        start = self.offsets[index]
+        if index + 1 < len(self.offsets):
+            end = self.offsets[index + 1] - 1
+        else:
+            end = len(self.data)
+        return self.data[start:end].decode(self.encoding)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.line(number) for number in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self.line(index)
+
+    def __iter__(self) -> Iterator[str]:
+        # decoded a chunk of whole lines at a time, which is much quicker
+        # than a line at a time and still never holds the whole file
+        data = self.data
+        start = 0
+        while True:
+            end = data.rfind(b"\n", start, start + CHUNK_SIZE)
+            if end == -1:
+                end = data.find(b"\n", start + CHUNK_SIZE)
+            if end == -1:
+                yield from data[start:].decode(self.encoding).split("\n")
+                return
+            yield from data[start:end].decode(self.encoding).split("\n")
+            start = end + 1
+
+    def close(self):
+        # the mapping holds its own descriptor of the file open until closed
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __reduce__(self):
+        # a mapping cannot be sent to another process, but the file can
+        # be mapped again there
+        return self.__class__, (self.path, self.encoding)
+
+
+def read_rules(path: str) -> Union[MappedFile, str]:
+    """
+    Opens a rules file as a MappedFile, or reads its content as a string
+    when its lines could not be found from the raw bytes (for files using
+    "\\r" newlines, which reading as text would translate, or an encoding
+    where newline bytes can be part of other characters).
+
+    Either way, errors are the same as reading the file as text would raise.
+    """
+    encoding = locale.getpreferredencoding(False)
+    if codecs.lookup(encoding).name in LINE_SAFE_ENCODINGS:
+        lines = MappedFile(path, codecs.lookup(encoding).name)
+        if lines.data.find(b"\r") == -1 and decodes(lines.data, lines.encoding):
+            return lines
+
+    with open(path, "r") as f:
+        return f.read()
+
+
+def decodes(data, encoding: str) -> bool:
+    # checked a piece at a time, so as not to hold a decoded copy
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        for start in range(0, len(data), CHUNK_SIZE):
+            decoder.decode(data[start : start + CHUNK_SIZE])
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def content_lines(content: Union[MappedFile, List[str], str, None]):
+    """The lines of content that is either text or already lines."""
+    if content is None:
+        return []
+    if isinstance(content, str):
+        return content.split("\n")
+    return content
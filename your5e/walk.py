@@ -0,0 +1,221 @@
+import fnmatch
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_INCLUDE = ("*.md",)
+
+
+def glob_matcher(patterns: Iterable[str]):
+    """
+    A function of a file's name and its path (relative to the directory
+    being walked) that is true when either matches one of `patterns`:
+    patterns containing a "/" match the path, others only the name.
+    """
+    name_patterns = [fnmatch.translate(p) for p in patterns if "/" not in p]
+    path_patterns = [fnmatch.translate(p) for p in patterns if "/" in p]
+    name_match = re.compile("|".join(name_patterns)).match if name_patterns else None
+    path_match = re.compile("|".join(path_patterns)).match if path_patterns else None
+
+    def matches(name: str, path: str) -> bool:
+        return bool(
+            (name_match and name_match(name)) or (path_match and path_match(path))
+        )
+
+    return matches
+
+
+def translate_gitignore(pattern: str) -> str:
+    """A regular expression matching the paths a .gitignore pattern does."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    regex = [] if anchored else ["(?:.*/)?"]
+
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            regex.append("/.+")
+            i += 3
+        elif c == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif c == "?":
+            regex.append("[^/]")
+            i += 1
+        elif c == "[" and "]" in pattern[i + 2 :]:
+            end = pattern.index("]", i + 2)
+            chars = pattern[i + 1 : end]
+            if chars[0] == "!":
+                chars = "^" + chars[1:]
+            regex.append("[" + chars.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            regex.append(re.escape(pattern[i + 1]))
+            i += 2
+        else:
+            regex.append(re.escape(c))
+            i += 1
+    return "".join(regex)
+
+
+class GitIgnore:
+    """
+    The patterns of the .gitignore files that apply to a directory, each
+    matched against paths relative to the directory of its .gitignore
+    (given relative to the top of the work tree, ending in "/" if not "").
+    """
+
+    def __init__(
+        self, rules: Optional[List[Tuple[str, re.Pattern, bool, bool]]] = None
+    ):
+        self.rules = rules or []
+
+    def read(self, file: str, base: str) -> "GitIgnore":
+        """These rules with those in `file` added, if there is one."""
+        try:
+            with open(file, encoding="utf-8", errors="surrogateescape") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return self
+
+        rules = []
+        for line in lines:
+            line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            if line:
+                rules.append(
+                    (
+                        base,
+                        re.compile(translate_gitignore(line)),
+                        negate,
+                        directory_only,
+                    )
+                )
+        return GitIgnore(self.rules + rules) if rules else self
+
+    def ignored(self, path: str, is_dir: bool) -> bool:
+        # the last pattern to match decides
+        ignored = False
+        for base, regex, negate, directory_only in self.rules:
+            if directory_only and not is_dir:
+                continue
+            if not path.startswith(base):
+                continue
+            if regex.fullmatch(path[len(base) :]):
+                ignored = not negate
+        return ignored
+
+
+def work_tree(directory: str) -> Optional[str]:
+    """The top of the git work tree `directory` is in, if it is in one."""
+    directory = os.path.abspath(directory)
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+
+def root_gitignore(root: str) -> Tuple[GitIgnore, str]:
+    """
+    The .gitignore rules (and .git/info/exclude) that apply to `root` from
+    the directories above it in its work tree, and the path of `root`
+    relative to the top of the work tree (ending in "/" if not "").
+    """
+    top = work_tree(root)
+    if top is None:
+        return GitIgnore(), ""
+
+    ignore = GitIgnore().read(os.path.join(top, ".git", "info", "exclude"), "")
+    relative = os.path.relpath(os.path.abspath(root), top)
+    if relative == ".":
+        return ignore, ""
+
+    # the .gitignore of `root` itself is read as it is walked
+    base = ""
+    directory = top
+    for part in relative.split(os.sep):
+        ignore = ignore.read(os.path.join(directory, ".gitignore"), base)
+        directory = os.path.join(directory, part)
+        base += part + "/"
+    return ignore, base
+
+
+def walk_rules(
+    root: str,
+    include: Iterable[str] = DEFAULT_INCLUDE,
+    exclude: Iterable[str] = (),
+    gitignore: bool = False,
+) -> Iterator[str]:
+    """
+    Yields the files under `root` that match `include` and not `exclude`
+    (and that git does not ignore, if `gitignore`), in the order of
+    `sorted(Path(root).rglob(...))`, as each is found rather than once the
+    whole tree has been looked through. Excluded or ignored directories are
+    not looked into; as with rglob, neither are links to directories.
+    """
+    included = glob_matcher(include)
+    excluded = glob_matcher(exclude)
+    root = os.fspath(root)
+    prefix = os.path.join(os.path.normpath(root), "")
+    if prefix == os.path.join(".", ""):
+        # as pathlib, which does not start paths with "./"
+        prefix = ""
+
+    if gitignore:
+        ignore, base = root_gitignore(root)
+    else:
+        ignore, base = None, ""
+
+    yield from _walk(root, prefix, "", included, excluded, ignore, base)
+
+
+def _walk(directory, prefix, relative, included, excluded, ignore, base):
+    if ignore is not None:
+        ignore = ignore.read(os.path.join(directory, ".gitignore"), base + relative)
+
+    try:
+        with os.scandir(directory) as scan:
+            # a directory's files sort by name, with everything in a
+            # subdirectory where the subdirectory's name sorts
+            entries = sorted(scan, key=lambda entry: entry.name)
+    except OSError:
+        return
+
+    for entry in entries:
+        name = entry.name
+        path = relative + name
+        try:
+            is_dir = entry.is_dir()
+            walk_into = is_dir and not entry.is_symlink()
+        except OSError:
+            continue
+
+        if excluded(name, path):
+            continue
+        if ignore is not None and (
+            name == ".git" or ignore.ignored(base + path, is_dir)
+        ):
+            continue
+
+        if walk_into:
+            yield from _walk(
+                entry.path, prefix, path + "/", included, excluded, ignore, base
+            )
+        elif not is_dir and included(name, path):
+            yield prefix + path.replace("/", os.sep)
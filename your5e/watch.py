@@ -0,0 +1,105 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import time
+from typing import List
+
+# from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+
+
+def watched_directories(paths: List[str]) -> List[str]:
+    directories = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, _ in os.walk(path):
+                directories.append(directory)
+        else:
+            # editors often replace a file rather than write to it,
+            # so watch the directory it is in
+            directories.append(os.path.dirname(path) or ".")
+    return directories
+
+
+class PollingWatcher:
+    """Wakes up every `interval` seconds, to look for changes by hand."""
+
+    def __init__(self, paths: List[str], interval: float = 1.0):
+        self.paths = paths
+        self.interval = interval
+
+    def wait(self):
+        time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Sleeps until something changes in the directories of the watched paths,
+    using Linux's inotify through the C library (so without any packages
+    or services), then waits for a moment of quiet so that a burst of
+    changes (such as an editor saving) wakes it only once.
+    """
+
+    def __init__(self, paths: List[str], settle: float = 0.05):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.paths = paths
+        self.settle = settle
+
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.add_watches()
+
+    def add_watches(self):
+        # adding a watch that already exists changes nothing, so new
+        # directories are picked up by adding them all again
+        for directory in watched_directories(self.paths):
+            self.libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), ctypes.c_uint32(WATCH_MASK)
+            )
+
+    def drain(self):
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self):
+        select.select([self.fd], [], [])
+        self.drain()
+        while select.select([self.fd], [], [], self.settle)[0]:
+            self.drain()
+        self.add_watches()
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(paths: List[str], interval: float = 1.0):
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError):
+        # not Linux, or no inotify available
+        return PollingWatcher(paths, interval)